@@ -0,0 +1,40 @@
+"""Replace single-column task and feedback indexes with composite ones
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '002'
+down_revision: Union[str, None] = '001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Queue polling: WHERE status = ? ORDER BY created_at
+    op.create_index('idx_tasks_status_created', 'analysis_tasks', ['status', 'created_at'])
+    # Per-video lookups, optionally filtered by status
+    op.create_index('idx_tasks_video_status', 'analysis_tasks', ['video_id', 'status'])
+    # Feedback for a task in creation order
+    op.create_index('idx_feedback_task_created', 'user_feedback', ['task_id', 'created_at'])
+    
+    # Covered by the leading columns of the composite indexes
+    op.drop_index('idx_tasks_status', table_name='analysis_tasks')
+    op.drop_index('idx_tasks_video_id', table_name='analysis_tasks')
+    op.drop_index('idx_feedback_task_id', table_name='user_feedback')
+
+
+def downgrade() -> None:
+    op.create_index('idx_feedback_task_id', 'user_feedback', ['task_id'])
+    op.create_index('idx_tasks_video_id', 'analysis_tasks', ['video_id'])
+    op.create_index('idx_tasks_status', 'analysis_tasks', ['status'])
+    
+    op.drop_index('idx_feedback_task_created', table_name='user_feedback')
+    op.drop_index('idx_tasks_video_status', table_name='analysis_tasks')
+    op.drop_index('idx_tasks_status_created', table_name='analysis_tasks')
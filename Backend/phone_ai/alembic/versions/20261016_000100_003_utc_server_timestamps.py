@@ -0,0 +1,44 @@
+"""Default timestamps to the database's UTC clock
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-16 00:01:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '003'
+down_revision: Union[str, None] = '002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, column) pairs whose default is the insert time
+_TIMESTAMP_COLUMNS = [
+    ('analysis_tasks', 'created_at'),
+    ('analysis_tasks', 'updated_at'),
+    ('user_feedback', 'created_at'),
+    ('reference_videos', 'created_at'),
+]
+
+
+def upgrade() -> None:
+    # Columns are naive timestamps holding UTC, matching datetime.utcnow()
+    for table, column in _TIMESTAMP_COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            server_default=sa.text("timezone('UTC', now())"),
+        )
+
+
+def downgrade() -> None:
+    for table, column in _TIMESTAMP_COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            server_default=sa.text('CURRENT_TIMESTAMP'),
+        )
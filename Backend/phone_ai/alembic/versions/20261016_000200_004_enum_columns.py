@@ -0,0 +1,93 @@
+"""Store task status, feedback action and motion type as ENUM types
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-16 00:02:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '004'
+down_revision: Union[str, None] = '003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+task_status = postgresql.ENUM(
+    'pending', 'processing', 'completed', 'failed',
+    name='task_status',
+)
+feedback_action = postgresql.ENUM(
+    'accept', 'modify', 'ignore',
+    name='feedback_action',
+)
+motion_type = postgresql.ENUM(
+    'dolly_in', 'dolly_out', 'pan', 'tilt', 'track', 'handheld', 'static',
+    name='motion_type',
+)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    task_status.create(bind)
+    feedback_action.create(bind)
+    motion_type.create(bind)
+    
+    # The type now enforces the allowed statuses
+    op.drop_constraint('valid_status', 'analysis_tasks', type_='check')
+    op.alter_column('analysis_tasks', 'status', server_default=None)
+    op.alter_column(
+        'analysis_tasks', 'status',
+        type_=task_status,
+        postgresql_using='status::task_status',
+    )
+    op.alter_column(
+        'analysis_tasks', 'status',
+        server_default=sa.text("'pending'::task_status"),
+    )
+    
+    op.alter_column(
+        'user_feedback', 'action',
+        type_=feedback_action,
+        postgresql_using='action::feedback_action',
+    )
+    op.alter_column(
+        'reference_videos', 'motion_type',
+        type_=motion_type,
+        postgresql_using='motion_type::motion_type',
+    )
+
+
+def downgrade() -> None:
+    op.alter_column(
+        'reference_videos', 'motion_type',
+        type_=sa.String(50),
+        postgresql_using='motion_type::text',
+    )
+    op.alter_column(
+        'user_feedback', 'action',
+        type_=sa.String(50),
+        postgresql_using='action::text',
+    )
+    
+    op.alter_column('analysis_tasks', 'status', server_default=None)
+    op.alter_column(
+        'analysis_tasks', 'status',
+        type_=sa.String(50),
+        postgresql_using='status::text',
+    )
+    op.alter_column('analysis_tasks', 'status', server_default='pending')
+    op.create_check_constraint(
+        'valid_status',
+        'analysis_tasks',
+        "status IN ('pending', 'processing', 'completed', 'failed')",
+    )
+    
+    bind = op.get_bind()
+    motion_type.drop(bind)
+    feedback_action.drop(bind)
+    task_status.drop(bind)
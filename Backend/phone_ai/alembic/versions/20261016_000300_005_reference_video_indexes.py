@@ -0,0 +1,41 @@
+"""Index reference videos by embedding ID and by motion and subject type
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-16 00:03:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '005'
+down_revision: Union[str, None] = '004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # FAISS ID -> row lookups; NULL embedding IDs are left out of the index
+    op.create_index(
+        'idx_reference_embedding_id',
+        'reference_videos',
+        ['embedding_id'],
+        unique=True,
+        postgresql_where=sa.text('embedding_id IS NOT NULL'),
+    )
+    op.create_index(
+        'idx_reference_motion_subject',
+        'reference_videos',
+        ['motion_type', 'subject_type'],
+    )
+    # Covered by the leading column of idx_reference_motion_subject
+    op.drop_index('idx_reference_motion_type', table_name='reference_videos')
+
+
+def downgrade() -> None:
+    op.create_index('idx_reference_motion_type', 'reference_videos', ['motion_type'])
+    op.drop_index('idx_reference_motion_subject', table_name='reference_videos')
+    op.drop_index('idx_reference_embedding_id', table_name='reference_videos')
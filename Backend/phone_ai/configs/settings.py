@@ -2,7 +2,7 @@
 Application settings and configuration.
 """
 from typing import Optional
-from pydantic import Field, ConfigDict
+from pydantic import Field, ConfigDict, field_validator
 from pydantic_settings import BaseSettings
 
 
@@ -35,6 +35,8 @@ class RedisSettings(BaseSettings):
     port: int = Field(default=6379, alias="REDIS_PORT")
     db: int = Field(default=0, alias="REDIS_DB")
     password: Optional[str] = Field(default=None, alias="REDIS_PASSWORD")
+    result_cache_ttl_s: int = Field(default=3600, alias="RESULT_CACHE_TTL_S")  # 0 disables
+    advice_pubsub: bool = Field(default=False, alias="ADVICE_PUBSUB")  # fan pushed advice out to all workers
     
     @property
     def url(self) -> str:
@@ -65,8 +67,14 @@ class StorageSettings(BaseSettings):
     upload_dir: str = Field(default="./uploads", alias="UPLOAD_DIR")
     frames_dir: str = Field(default="./frames", alias="FRAMES_DIR")
     max_file_size_mb: int = Field(default=500, alias="MAX_FILE_SIZE_MB")
-    allowed_formats: list[str] = ["mp4", "mov", "avi", "mkv"]
+    allowed_formats: frozenset[str] = frozenset({"mp4", "mov", "avi", "mkv"})
     cleanup_days: int = Field(default=7, alias="CLEANUP_DAYS")
+    
+    @field_validator("allowed_formats", mode="before")
+    @classmethod
+    def _normalize_formats(cls, value):
+        """Lower-case the formats so upload checks are a single set lookup."""
+        return frozenset(str(ext).lower() for ext in value)
 
 
 class ProcessingSettings(BaseSettings):
@@ -115,6 +123,8 @@ class SecuritySettings(BaseSettings):
     algorithm: str = "HS256"
     access_token_expire_minutes: int = Field(default=30, alias="ACCESS_TOKEN_EXPIRE_MINUTES")
     rate_limit_per_minute: int = Field(default=100, alias="RATE_LIMIT_PER_MINUTE")
+    rate_limit_backend: str = Field(default="memory", alias="RATE_LIMIT_BACKEND")  # "memory" or "redis"
+    bcrypt_rounds: int = Field(default=12, alias="BCRYPT_ROUNDS")
 
 
 class Settings(BaseSettings):
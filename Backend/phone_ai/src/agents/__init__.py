@@ -25,6 +25,7 @@ from src.agents.heuristic_analyzer import (
 from src.agents.motion_rules import (
     MotionTypeInferrer,
     MotionRulesConfig,
+    infer_motion_batch,
     infer_motion_type_from_heuristics,
 )
 
@@ -49,6 +50,7 @@ from src.agents.prompt_templates import (
 from src.agents.retrieval_agent import (
     RetrievalAgent,
     RetrievalAgentConfig,
+    RunningAggregator,
     create_retrieval_agent,
 )
 
@@ -64,6 +66,7 @@ __all__ = [
     "MotionTypeInferrer",
     "MotionRulesConfig",
     "infer_motion_type_from_heuristics",
+    "infer_motion_batch",
     "MetadataSynthesizerAgent",
     "MetadataSynthesizerConfig",
     "InstructionGeneratorAgent",
@@ -75,5 +78,6 @@ __all__ = [
     "FEW_SHOT_EXAMPLES",
     "RetrievalAgent",
     "RetrievalAgentConfig",
+    "RunningAggregator",
     "create_retrieval_agent",
 ]
@@ -10,7 +10,9 @@ Calculates numerical indicators from extracted features:
 """
 import math
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, Union
+
+import numpy as np
 
 from src.models.data_types import (
     BBox,
@@ -18,9 +20,21 @@ from src.models.data_types import (
     HeuristicOutput,
     OpticalFlowData,
     SubjectTrackingData,
+    bboxes_to_array,
 )
 
 
+# A bbox sequence, or the same boxes already packed by bboxes_to_array
+BBoxes = Union[list[BBox], np.ndarray]
+
+
+def _bbox_areas(bboxes: BBoxes) -> np.ndarray:
+    """Get the area of each bbox in a sequence or (N, 4) bbox array."""
+    if not isinstance(bboxes, np.ndarray):
+        bboxes = bboxes_to_array(bboxes)
+    return bboxes[:, 2] * bboxes[:, 3]
+
+
 @dataclass
 class HeuristicAnalyzerConfig:
     """Configuration for the Heuristic Analyzer Agent."""
@@ -74,7 +88,7 @@ class HeuristicAnalyzerAgent:
 
     def calculate_frame_pct_change(
         self,
-        bbox_sequence: list[BBox]
+        bbox_sequence: BBoxes
     ) -> float:
         """
         Calculate subject area change ratio (frame percentage change).
@@ -84,7 +98,8 @@ class HeuristicAnalyzerAgent:
         changes in subject size (e.g., dolly in/out movements).
         
         Args:
-            bbox_sequence: Sequence of normalized bounding boxes
+            bbox_sequence: Sequence of normalized bounding boxes, or an
+                (N, 4) array of them
             
         Returns:
             Frame percentage change in range [0, 1]
@@ -93,31 +108,23 @@ class HeuristicAnalyzerAgent:
             return 0.0
         
         # Calculate areas for all bounding boxes
-        areas = [bbox.area() for bbox in bbox_sequence]
-        
-        if not areas:
-            return 0.0
-        
-        # Calculate relative changes between consecutive frames
-        changes = []
-        for i in range(1, len(areas)):
-            prev_area = areas[i - 1]
-            curr_area = areas[i]
-            
-            # Avoid division by zero
-            if prev_area > 0:
-                # Relative change: |curr - prev| / prev
-                relative_change = abs(curr_area - prev_area) / prev_area
-                changes.append(relative_change)
-            elif curr_area > 0:
-                # If previous was 0 but current is not, consider it a full change
-                changes.append(1.0)
-        
-        if not changes:
+        areas = _bbox_areas(bbox_sequence)
+        
+        # Relative change |curr - prev| / prev between consecutive frames;
+        # a change from 0 to a positive area counts as a full change, and
+        # frames where both areas are 0 are skipped
+        prev_area = areas[:-1]
+        curr_area = areas[1:]
+        has_prev = prev_area > 0
+        changes = np.abs(curr_area[has_prev] - prev_area[has_prev]) / prev_area[has_prev]
+        appeared = int(np.count_nonzero(~has_prev & (curr_area > 0)))
+        
+        n_changes = len(changes) + appeared
+        if n_changes == 0:
             return 0.0
         
         # Average relative change
-        avg_change = sum(changes) / len(changes)
+        avg_change = (float(changes.sum()) + appeared) / n_changes
         
         # Normalize to [0, 1] range
         # Typical relative changes are small, so we scale up and clamp
@@ -151,27 +158,10 @@ class HeuristicAnalyzerAgent:
             # Return moderate smoothness as default
             return 0.5
         
-        # Calculate velocities (magnitude of flow vectors)
-        velocities = []
-        for vx, vy in flow_vectors:
-            magnitude = math.sqrt(vx * vx + vy * vy)
-            velocities.append(magnitude)
-        
-        if len(velocities) < 3:
-            return 0.5
-        
-        # Calculate accelerations (change in velocity)
-        accelerations = []
-        for i in range(1, len(velocities)):
-            accel = velocities[i] - velocities[i - 1]
-            accelerations.append(accel)
-        
-        if not accelerations:
-            return 0.5
-        
-        # Calculate variance of accelerations
-        mean_accel = sum(accelerations) / len(accelerations)
-        variance = sum((a - mean_accel) ** 2 for a in accelerations) / len(accelerations)
+        # Velocities are the flow vector magnitudes; accelerations are
+        # their frame-to-frame changes
+        accelerations = np.diff(optical_flow.flow_magnitudes())
+        variance = float(np.var(accelerations))
         
         # Normalize variance to smoothness score
         # Higher variance = lower smoothness
@@ -184,7 +174,7 @@ class HeuristicAnalyzerAgent:
 
     def calculate_subject_occupancy(
         self,
-        bbox_sequence: list[BBox]
+        bbox_sequence: BBoxes
     ) -> float:
         """
         Calculate average subject area ratio (occupancy).
@@ -194,22 +184,17 @@ class HeuristicAnalyzerAgent:
         represents the fraction of the frame.
         
         Args:
-            bbox_sequence: Sequence of normalized bounding boxes
+            bbox_sequence: Sequence of normalized bounding boxes, or an
+                (N, 4) array of them
             
         Returns:
             Subject occupancy in range [0, 1]
         """
-        if not bbox_sequence:
-            return 0.0
-        
-        # Calculate areas for all bounding boxes
-        areas = [bbox.area() for bbox in bbox_sequence]
-        
-        if not areas:
+        if len(bbox_sequence) == 0:
             return 0.0
         
         # Average area across all frames
-        avg_occupancy = sum(areas) / len(areas)
+        avg_occupancy = float(np.mean(_bbox_areas(bbox_sequence)))
         
         # Ensure result is in [0, 1] range
         return max(0.0, min(1.0, avg_occupancy))
@@ -299,13 +284,8 @@ class HeuristicAnalyzerAgent:
             return motion_timestamps
         
         # Calculate magnitudes
-        magnitudes = [math.sqrt(vx*vx + vy*vy) for vx, vy in flow_vectors]
-        
-        if not magnitudes:
-            return motion_timestamps
-        
-        avg_magnitude = sum(magnitudes) / len(magnitudes)
-        threshold = avg_magnitude * threshold_factor
+        magnitudes = optical_flow.flow_magnitudes()
+        threshold = float(np.mean(magnitudes)) * threshold_factor
         
         # Find peaks above threshold
         # Map flow vector indices to timestamps
@@ -313,11 +293,10 @@ class HeuristicAnalyzerAgent:
             # Sample timestamps to match flow vectors
             step = max(1, len(timestamps) // len(magnitudes))
             
-            for i, mag in enumerate(magnitudes):
-                if mag > threshold:
-                    # Map to timestamp
-                    ts_idx = min(i * step, len(timestamps) - 1)
-                    motion_timestamps.append(timestamps[ts_idx])
+            for i in np.flatnonzero(magnitudes > threshold):
+                # Map to timestamp
+                ts_idx = min(int(i) * step, len(timestamps) - 1)
+                motion_timestamps.append(timestamps[ts_idx])
         
         return motion_timestamps
 
@@ -355,18 +334,17 @@ class HeuristicAnalyzerAgent:
         # Calculate average motion speed
         avg_motion_px_per_s = self.calculate_avg_motion(optical_flow, duration)
         
+        # Pack the boxes once for both area-based indicators
+        bboxes = subject_tracking.bbox_array()
+        
         # Calculate frame percentage change
-        frame_pct_change = self.calculate_frame_pct_change(
-            subject_tracking.bbox_sequence
-        )
+        frame_pct_change = self.calculate_frame_pct_change(bboxes)
         
         # Calculate motion smoothness
         motion_smoothness = self.calculate_motion_smoothness(optical_flow)
         
         # Calculate subject occupancy
-        subject_occupancy = self.calculate_subject_occupancy(
-            subject_tracking.bbox_sequence
-        )
+        subject_occupancy = self.calculate_subject_occupancy(bboxes)
         
         # Extract motion timestamps and calculate beat alignment
         motion_timestamps = self._extract_motion_timestamps(
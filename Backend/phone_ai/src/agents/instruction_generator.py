@@ -725,7 +725,7 @@ class InstructionGeneratorAgent:
         
         card = InstructionCard(
             video_id=video_id,
-            primary=primary,
+            primary=tuple(primary),
             explain=explain,
             advanced=advanced,
         )
@@ -770,7 +770,7 @@ class InstructionGeneratorAgent:
         
         return InstructionCard(
             video_id=video_id or "unknown",
-            primary=primary,
+            primary=tuple(primary),
             explain=explain,
             advanced=advanced,
         )
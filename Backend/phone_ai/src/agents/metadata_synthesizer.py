@@ -4,8 +4,14 @@ Metadata Synthesizer Agent for the Video Shooting Assistant.
 Combines rule-based inference with LLM enhancement to generate
 structured metadata from heuristic indicators.
 """
+import asyncio
+import concurrent.futures
 import logging
-from dataclasses import dataclass
+import math
+import threading
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass, replace
 from typing import Any, Optional
 
 from src.models.data_types import (
@@ -17,7 +23,11 @@ from src.models.data_types import (
     MotionParams,
 )
 from src.models.enums import MotionType, SpeedProfile, SuggestedScale
-from src.schemas.validator import SchemaValidator, SchemaValidationError
+from src.schemas.metadata_model import is_valid_metadata_output
+from src.schemas.validator import (
+    SchemaValidationError,
+    get_schema_validator,
+)
 from src.services.llm_client import (
     LLMClient,
     LLMConfig,
@@ -41,6 +51,42 @@ from src.agents.prompt_templates import (
 logger = logging.getLogger(__name__)
 
 
+# Direct value -> member maps; resolving LLM strings through these avoids
+# Enum.__call__ and the ValueError it raises for unknown values
+_MOTION_MAP = MotionType._value2member_map_
+_SPEED_PROFILE_MAP = SpeedProfile._value2member_map_
+_SCALE_MAP = SuggestedScale._value2member_map_
+
+
+def _enum_from_str(value_map: dict, value: Any) -> Optional[Any]:
+    """Resolve an enum member from its string value, or None if unknown."""
+    return value_map.get(value) if isinstance(value, str) else None
+
+
+# Smoothness bands used by the default explainability text:
+# 0 = smooth (> 0.7), 1 = moderate (> 0.4), 2 = slightly shaky
+_SMOOTHNESS_DESCRIPTIONS = ("平滑", "中等流畅度", "略有抖动")
+
+# First-sentence templates per motion type; {smooth} is folded in below,
+# {speed} stays open for dolly shots since it depends on frame change.
+_SENTENCE1_BASE = {
+    MotionType.STATIC: "该镜头为静态镜头，画面稳定无明显运动。",
+    MotionType.DOLLY_IN: "该镜头为{{speed}}推进，运动{smooth}。",
+    MotionType.DOLLY_OUT: "该镜头为{{speed}}拉远，运动{smooth}。",
+    MotionType.PAN: "该镜头为横向摇移，运动{smooth}，适合展示宽广场景。",
+    MotionType.TILT: "该镜头为纵向摇移，运动{smooth}，适合展示高度变化。",
+    MotionType.TRACK: "该镜头为跟踪运动，运动{smooth}，持续跟随主体。",
+    MotionType.HANDHELD: "该镜头呈现手持拍摄特征，具有自然的运动感。",
+}
+
+# Precomposed first sentences keyed by (motion_type, smoothness_band)
+_SENTENCE1_TEMPLATES: dict[tuple[MotionType, int], str] = {
+    (motion_type, band): template.format(smooth=smooth)
+    for motion_type, template in _SENTENCE1_BASE.items()
+    for band, smooth in enumerate(_SMOOTHNESS_DESCRIPTIONS)
+}
+
+
 @dataclass
 class MetadataSynthesizerConfig:
     """Configuration for the Metadata Synthesizer Agent."""
@@ -55,10 +101,18 @@ class MetadataSynthesizerConfig:
     
     # Fallback settings
     fallback_to_rules: bool = True  # Fall back to rules if LLM fails
+    llm_skip_confidence: float = 0.9  # Skip LLM when rule confidence exceeds this
     
     # Validation settings
     validate_output: bool = True  # Validate output against schema
     auto_fix_invalid: bool = True  # Auto-fix invalid values
+    fast_validation: bool = True  # Try the compiled model before JSON Schema
+    
+    # Response cache settings (pipeline level, LLM path only)
+    response_cache_size: int = 256  # Max cached results, 0 disables
+    
+    # Batch settings (pipeline run_batch)
+    batch_size: int = 16  # Max clips in flight at once, i.e. concurrent LLM calls
 
 
 class MetadataSynthesizerAgent:
@@ -83,8 +137,12 @@ class MetadataSynthesizerAgent:
         """
         self.config = config or MetadataSynthesizerConfig()
         self.llm_client = llm_client
-        self.motion_inferrer = MotionTypeInferrer()
-        self.schema_validator = SchemaValidator()
+        self.motion_inferrer = MotionTypeInferrer.from_config_cached()
+        self.schema_validator = get_schema_validator()
+        
+        # Rule-only merge results keyed by id(heuristic_output); each entry
+        # holds a weakref so it is dropped when the heuristic object dies
+        self._merge_cache: dict[int, tuple[weakref.ref, MetadataOutput]] = {}
         
         # Initialize LLM client if needed
         if self.config.use_llm and self.llm_client is None:
@@ -93,6 +151,9 @@ class MetadataSynthesizerAgent:
             except Exception as e:
                 logger.warning(f"Failed to initialize LLM client: {e}")
                 self.llm_client = None
+        
+        # Resolve the LLM path once so process() doesn't re-check per clip
+        self._llm_enabled = bool(self.config.use_llm and self.llm_client is not None)
     
     async def process(
         self,
@@ -113,6 +174,26 @@ class MetadataSynthesizerAgent:
         Returns:
             MetadataOutput with all required fields
         """
+        metadata, _ = await self._process(
+            heuristic_output,
+            exif_data,
+            primary_direction_deg
+        )
+        return metadata
+    
+    async def _process(
+        self,
+        heuristic_output: HeuristicOutput,
+        exif_data: Optional[ExifData] = None,
+        primary_direction_deg: Optional[float] = None
+    ) -> tuple[MetadataOutput, bool]:
+        """
+        Run process() and report whether an LLM answer went into the result.
+        
+        Returns:
+            Tuple of (metadata, llm_used). llm_used is False when the LLM
+            was disabled, skipped, failed or returned nothing usable.
+        """
         # Step 1: Rule-based inference for baseline
         rule_based_result = self._infer_from_rules(
             heuristic_output,
@@ -120,17 +201,25 @@ class MetadataSynthesizerAgent:
         )
         
         # Step 2: LLM enhancement (if enabled)
+        # Unambiguous rule results (e.g. a smooth static shot) gain nothing
+        # from the LLM, so those keep the templated explainability
         llm_result = None
-        if self.config.use_llm and self.llm_client is not None:
-            try:
-                llm_result = await self._enhance_with_llm(
-                    heuristic_output,
-                    exif_data
+        if self._llm_enabled:
+            if rule_based_result["confidence"] > self.config.llm_skip_confidence:
+                logger.info(
+                    f"Skipping LLM for {heuristic_output.video_id}: "
+                    f"rule confidence {rule_based_result['confidence']:.2f}"
                 )
-            except LLMError as e:
-                logger.warning(f"LLM enhancement failed: {e}")
-                if not self.config.fallback_to_rules:
-                    raise
+            else:
+                try:
+                    llm_result = await self._enhance_with_llm(
+                        heuristic_output,
+                        exif_data
+                    )
+                except LLMError as e:
+                    logger.warning(f"LLM enhancement failed: {e}")
+                    if not self.config.fallback_to_rules:
+                        raise
         
         # Step 3: Merge results (LLM takes precedence for certain fields)
         metadata = self._merge_results(
@@ -144,7 +233,7 @@ class MetadataSynthesizerAgent:
         if self.config.validate_output:
             metadata = self._validate_and_fix(metadata)
         
-        return metadata
+        return metadata, bool(llm_result)
     
     def _infer_from_rules(
         self,
@@ -221,40 +310,48 @@ class MetadataSynthesizerAgent:
         """
         normalized = {}
         
+        # Fetch each nested section once; LLMs occasionally emit non-objects
+        motion = result.get("motion")
+        if not isinstance(motion, dict):
+            motion = {}
+        params = motion.get("params")
+        if not isinstance(params, dict):
+            params = {}
+        framing = result.get("framing")
+        if not isinstance(framing, dict):
+            framing = {}
+        
         # Extract motion type
-        if "motion" in result and "type" in result["motion"]:
-            motion_type_str = result["motion"]["type"]
-            try:
-                normalized["motion_type"] = MotionType(motion_type_str)
-            except ValueError:
+        if (motion_type_str := motion.get("type")) is not None:
+            motion_type = _enum_from_str(_MOTION_MAP, motion_type_str)
+            if motion_type is None:
                 logger.warning(f"Invalid motion type from LLM: {motion_type_str}")
+            else:
+                normalized["motion_type"] = motion_type
         
         # Extract speed profile
-        if "motion" in result and "params" in result["motion"]:
-            params = result["motion"]["params"]
-            if "speed_profile" in params:
-                try:
-                    normalized["speed_profile"] = SpeedProfile(params["speed_profile"])
-                except ValueError:
-                    logger.warning(
-                        f"Invalid speed profile from LLM: {params['speed_profile']}"
-                    )
+        if (speed_profile_str := params.get("speed_profile")) is not None:
+            speed_profile = _enum_from_str(_SPEED_PROFILE_MAP, speed_profile_str)
+            if speed_profile is None:
+                logger.warning(f"Invalid speed profile from LLM: {speed_profile_str}")
+            else:
+                normalized["speed_profile"] = speed_profile
         
         # Extract suggested scale
-        if "framing" in result and "suggested_scale" in result["framing"]:
-            scale_str = result["framing"]["suggested_scale"]
-            try:
-                normalized["suggested_scale"] = SuggestedScale(scale_str)
-            except ValueError:
+        if (scale_str := framing.get("suggested_scale")) is not None:
+            suggested_scale = _enum_from_str(_SCALE_MAP, scale_str)
+            if suggested_scale is None:
                 logger.warning(f"Invalid suggested scale from LLM: {scale_str}")
+            else:
+                normalized["suggested_scale"] = suggested_scale
         
         # Extract confidence
-        if "confidence" in result:
-            normalized["confidence"] = float(result["confidence"])
+        if (confidence := result.get("confidence")) is not None:
+            normalized["confidence"] = float(confidence)
         
         # Extract explainability
-        if "explainability" in result:
-            normalized["explainability"] = str(result["explainability"])
+        if (explainability := result.get("explainability")) is not None:
+            normalized["explainability"] = str(explainability)
         
         return normalized
     
@@ -319,6 +416,28 @@ class MetadataSynthesizerAgent:
             llm_explainability
         )
         
+        # Rule-only path: motion params and framing depend solely on the
+        # heuristic object, so reuse the ones built for it last time
+        override = bool(llm_result) and any(
+            key in llm_result
+            for key in ("motion_type", "speed_profile", "suggested_scale")
+        )
+        if not override:
+            entry = self._merge_cache.get(id(heuristic_output))
+            if entry is not None:
+                ref, cached = entry
+                if (
+                    ref() is heuristic_output and
+                    cached.motion_type is motion_type and
+                    cached.motion_params.speed_profile is speed_profile and
+                    cached.framing.suggested_scale is suggested_scale
+                ):
+                    return replace(
+                        cached,
+                        confidence=confidence,
+                        explainability=explainability,
+                    )
+        
         # Build subject bbox from heuristic data
         # Use average bbox if available, otherwise default
         subject_bbox = self._get_average_bbox(heuristic_output)
@@ -341,7 +460,7 @@ class MetadataSynthesizerAgent:
             suggested_scale=suggested_scale,
         )
         
-        return MetadataOutput(
+        metadata = MetadataOutput(
             time_range=heuristic_output.time_range,
             motion_type=motion_type,
             motion_params=motion_params,
@@ -350,6 +469,28 @@ class MetadataSynthesizerAgent:
             confidence=confidence,
             explainability=explainability,
         )
+        
+        if not override:
+            self._remember_merge(heuristic_output, metadata)
+        
+        return metadata
+    
+    def _remember_merge(
+        self,
+        heuristic_output: HeuristicOutput,
+        metadata: MetadataOutput
+    ) -> None:
+        """
+        Cache a rule-only merge result for the given heuristic object.
+        
+        Args:
+            heuristic_output: Heuristic indicators the metadata was built from
+            metadata: Merged metadata to reuse on later rule-only calls
+        """
+        key = id(heuristic_output)
+        cache = self._merge_cache
+        ref = weakref.ref(heuristic_output, lambda _, key=key: cache.pop(key, None))
+        cache[key] = (ref, metadata)
     
     def _calculate_final_confidence(
         self,
@@ -457,7 +598,6 @@ class MetadataSynthesizerAgent:
         
         # Calculate approximate dimensions
         # Assume 4:3 aspect ratio for subject
-        import math
         area = occupancy
         # w * h = area, w/h = 4/3 -> w = 4h/3 -> 4h^2/3 = area -> h = sqrt(3*area/4)
         h = min(1.0, math.sqrt(3 * area / 4))
@@ -488,41 +628,22 @@ class MetadataSynthesizerAgent:
         Returns:
             2-sentence Chinese explanation string
         """
-        motion_descriptions = {
-            MotionType.STATIC: "静态镜头",
-            MotionType.DOLLY_IN: "推镜头",
-            MotionType.DOLLY_OUT: "拉镜头",
-            MotionType.PAN: "横摇镜头",
-            MotionType.TILT: "纵摇镜头",
-            MotionType.TRACK: "跟踪镜头",
-            MotionType.HANDHELD: "手持镜头",
-        }
-        
-        motion_desc = motion_descriptions.get(motion_type, "未知运动类型")
         smoothness = heuristic_output.motion_smoothness
         occupancy = heuristic_output.subject_occupancy
         frame_change = heuristic_output.frame_pct_change
         beat_score = heuristic_output.beat_alignment_score
         
         # First sentence: Describe the motion characteristics
-        smoothness_desc = "平滑" if smoothness > 0.7 else "中等流畅度" if smoothness > 0.4 else "略有抖动"
+        band = 0 if smoothness > 0.7 else 1 if smoothness > 0.4 else 2
+        template = _SENTENCE1_TEMPLATES.get((motion_type, band))
         
-        if motion_type == MotionType.STATIC:
-            sentence1 = f"该镜头为{motion_desc}，画面稳定无明显运动。"
+        if template is None:
+            sentence1 = f"该镜头为未知运动类型，运动{_SMOOTHNESS_DESCRIPTIONS[band]}。"
         elif motion_type in (MotionType.DOLLY_IN, MotionType.DOLLY_OUT):
-            direction = "推进" if motion_type == MotionType.DOLLY_IN else "拉远"
             speed_desc = "缓慢" if frame_change < 0.1 else "中速" if frame_change <= 0.25 else "快速"
-            sentence1 = f"该镜头为{speed_desc}{direction}，运动{smoothness_desc}。"
-        elif motion_type == MotionType.PAN:
-            sentence1 = f"该镜头为横向摇移，运动{smoothness_desc}，适合展示宽广场景。"
-        elif motion_type == MotionType.TILT:
-            sentence1 = f"该镜头为纵向摇移，运动{smoothness_desc}，适合展示高度变化。"
-        elif motion_type == MotionType.TRACK:
-            sentence1 = f"该镜头为跟踪运动，运动{smoothness_desc}，持续跟随主体。"
-        elif motion_type == MotionType.HANDHELD:
-            sentence1 = f"该镜头呈现手持拍摄特征，具有自然的运动感。"
+            sentence1 = template.format(speed=speed_desc)
         else:
-            sentence1 = f"该镜头为{motion_desc}，运动{smoothness_desc}。"
+            sentence1 = template
         
         # Second sentence: Provide composition and recommendation context
         occupancy_pct = int(occupancy * 100)
@@ -566,11 +687,7 @@ class MetadataSynthesizerAgent:
         Returns:
             Validated (and possibly fixed) metadata
         """
-        # Convert to dict for validation
-        metadata_dict = metadata.to_dict()
-        
-        # Validate against schema
-        is_valid, errors = self.schema_validator.validate_metadata(metadata_dict)
+        is_valid, errors = self._check_metadata(metadata)
         
         if is_valid:
             return metadata
@@ -584,8 +701,7 @@ class MetadataSynthesizerAgent:
         fixed_metadata = self._auto_fix_metadata(metadata, errors)
         
         # Re-validate
-        fixed_dict = fixed_metadata.to_dict()
-        is_valid, errors = self.schema_validator.validate_metadata(fixed_dict)
+        is_valid, errors = self._check_metadata(fixed_metadata)
         
         if not is_valid:
             logger.error(f"Could not auto-fix metadata: {errors}")
@@ -593,6 +709,24 @@ class MetadataSynthesizerAgent:
         
         return fixed_metadata
     
+    def _check_metadata(self, metadata: MetadataOutput) -> tuple[bool, list[str]]:
+        """
+        Validate metadata, trying the compiled model first.
+        
+        The compiled model never accepts what the JSON Schema rejects, so
+        only rejected metadata goes through the schema validator, which
+        produces the error messages.
+        
+        Args:
+            metadata: Metadata to validate
+            
+        Returns:
+            Tuple of (is_valid, list of error messages)
+        """
+        if self.config.fast_validation and is_valid_metadata_output(metadata):
+            return True, []
+        return self.schema_validator.validate_metadata(metadata.to_dict())
+    
     def _auto_fix_metadata(
         self,
         metadata: MetadataOutput,
@@ -685,7 +819,6 @@ class MetadataSynthesizerAgent:
         Returns:
             MetadataOutput with all required fields
         """
-        import asyncio
         return asyncio.get_event_loop().run_until_complete(
             self.process(heuristic_output, exif_data, primary_direction_deg)
         )
@@ -742,7 +875,6 @@ class MetadataSynthesizerAgent:
         Returns:
             MetadataOutput with confidence score and explainability
         """
-        import asyncio
         try:
             loop = asyncio.get_running_loop()
         except RuntimeError:
@@ -750,7 +882,6 @@ class MetadataSynthesizerAgent:
         
         if loop and loop.is_running():
             # If we're already in an async context, create a new loop in a thread
-            import concurrent.futures
             with concurrent.futures.ThreadPoolExecutor() as executor:
                 future = executor.submit(
                     asyncio.run,
@@ -800,7 +931,11 @@ class MetadataGenerationPipeline:
             config=self.config,
             llm_client=llm_client
         )
-        self.schema_validator = SchemaValidator()
+        self.schema_validator = self.synthesizer.schema_validator
+        # Per-thread event loops reused by run_sync() and run_batch_sync()
+        self._thread_state = threading.local()
+        # LRU of LLM-backed results keyed by a quantized heuristic fingerprint
+        self._response_cache: OrderedDict[tuple, MetadataOutput] = OrderedDict()
         logger.info("MetadataGenerationPipeline initialized")
     
     async def run(
@@ -831,17 +966,37 @@ class MetadataGenerationPipeline:
         """
         logger.info(f"Starting metadata generation for video: {heuristic_output.video_id}")
         
-        # Validate input
+        # Validate input (a result cached by the analyzer's check is reused)
         if not heuristic_output.is_valid():
             logger.warning("Heuristic output has invalid values, attempting to proceed")
         
+        # Near-identical heuristics get the same LLM answer, so serve
+        # those from the response cache instead of another round trip
+        use_cache = self.config.response_cache_size > 0 and self.synthesizer._llm_enabled
+        cache_key = None
+        if use_cache:
+            cache_key = self._cache_key(heuristic_output, exif_data, primary_direction_deg)
+            cached = self._response_cache.get(cache_key)
+            if cached is not None:
+                self._response_cache.move_to_end(cache_key)
+                logger.info(f"Metadata cache hit for video: {heuristic_output.video_id}")
+                return self._rebase_cached(cached, heuristic_output)
+        
         # Run the synthesizer pipeline
-        metadata = await self.synthesizer.generate_metadata(
+        metadata, llm_used = await self.synthesizer._process(
             heuristic_output,
             exif_data,
             primary_direction_deg
         )
         
+        # Only LLM answers are cached; a rule-only fallback after a skipped
+        # or failed call would otherwise stick for the whole fingerprint.
+        # The cache keeps its own copy so callers can't mutate the entry.
+        if cache_key is not None and llm_used:
+            self._response_cache[cache_key] = self._rebase_cached(metadata, heuristic_output)
+            if len(self._response_cache) > self.config.response_cache_size:
+                self._response_cache.popitem(last=False)
+        
         # Log pipeline results
         logger.info(
             f"Metadata generated: motion_type={metadata.motion_type.value}, "
@@ -850,6 +1005,77 @@ class MetadataGenerationPipeline:
         
         return metadata
     
+    @staticmethod
+    def _cache_key(
+        heuristic_output: HeuristicOutput,
+        exif_data: Optional[ExifData],
+        primary_direction_deg: Optional[float]
+    ) -> tuple:
+        """
+        Build the response cache key from quantized heuristic indicators.
+        
+        Args:
+            heuristic_output: Heuristic indicators
+            exif_data: Optional EXIF metadata
+            primary_direction_deg: Optional primary motion direction
+            
+        Returns:
+            Hashable fingerprint of the inputs that drive the LLM answer
+        """
+        direction_bucket = (
+            None if primary_direction_deg is None
+            else round(primary_direction_deg / 10) * 10
+        )
+        exif_key = (
+            None if exif_data is None
+            else (exif_data.focal_length_mm, exif_data.aperture, exif_data.sensor_size)
+        )
+        return (
+            round(heuristic_output.avg_motion_px_per_s, 1),
+            round(heuristic_output.frame_pct_change, 3),
+            round(heuristic_output.motion_smoothness, 2),
+            round(heuristic_output.subject_occupancy, 2),
+            round(heuristic_output.beat_alignment_score, 2),
+            direction_bucket,
+            exif_key,
+        )
+    
+    def _rebase_cached(
+        self,
+        cached: MetadataOutput,
+        heuristic_output: HeuristicOutput
+    ) -> MetadataOutput:
+        """
+        Apply a cached result to a new clip.
+        
+        Keeps the cached classification, confidence and explainability but
+        takes time range and measured values from the current heuristics.
+        
+        Args:
+            cached: Previously generated metadata
+            heuristic_output: Heuristic indicators of the current clip
+            
+        Returns:
+            Fresh MetadataOutput that shares no mutable state with the cache
+        """
+        start, end = heuristic_output.time_range
+        return replace(
+            cached,
+            time_range=heuristic_output.time_range,
+            motion_params=replace(
+                cached.motion_params,
+                duration_s=end - start,
+                frame_pct_change=heuristic_output.frame_pct_change,
+                motion_smoothness=heuristic_output.motion_smoothness,
+            ),
+            framing=replace(
+                cached.framing,
+                subject_bbox=self.synthesizer._get_average_bbox(heuristic_output),
+                subject_occupancy=heuristic_output.subject_occupancy,
+            ),
+            beat_alignment_score=heuristic_output.beat_alignment_score,
+        )
+    
     def run_sync(
         self,
         heuristic_output: HeuristicOutput,
@@ -867,17 +1093,90 @@ class MetadataGenerationPipeline:
         Returns:
             MetadataOutput with confidence score and explainability
         """
-        import asyncio
-        try:
-            loop = asyncio.get_event_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-        
-        return loop.run_until_complete(
+        return self._thread_loop().run_until_complete(
             self.run(heuristic_output, exif_data, primary_direction_deg)
         )
     
+    async def run_batch(
+        self,
+        heuristic_outputs: list[HeuristicOutput],
+        exif_data: Optional[ExifData] = None,
+        primary_directions: Optional[list[Optional[float]]] = None
+    ) -> list[MetadataOutput]:
+        """
+        Run the pipeline for many clips with overlapping LLM round trips.
+        
+        Up to config.batch_size clips are processed concurrently, so the
+        LLM latency of a batch is paid roughly once per window instead of
+        once per clip. Results keep the input order.
+        
+        Args:
+            heuristic_outputs: Heuristic indicators, one per clip
+            exif_data: Optional EXIF metadata shared by all clips
+            primary_directions: Optional primary motion direction per clip
+            
+        Returns:
+            MetadataOutput per clip, in input order
+        """
+        if primary_directions is None:
+            primary_directions = [None] * len(heuristic_outputs)
+        elif len(primary_directions) != len(heuristic_outputs):
+            raise ValueError("primary_directions must match heuristic_outputs in length")
+        
+        if len(heuristic_outputs) == 1:
+            return [await self.run(heuristic_outputs[0], exif_data, primary_directions[0])]
+        
+        semaphore = asyncio.Semaphore(max(1, self.config.batch_size))
+        
+        async def run_one(
+            heuristic_output: HeuristicOutput,
+            primary_direction_deg: Optional[float]
+        ) -> MetadataOutput:
+            async with semaphore:
+                return await self.run(heuristic_output, exif_data, primary_direction_deg)
+        
+        return list(await asyncio.gather(*(
+            run_one(heuristic_output, direction)
+            for heuristic_output, direction in zip(heuristic_outputs, primary_directions)
+        )))
+    
+    def run_batch_sync(
+        self,
+        heuristic_outputs: list[HeuristicOutput],
+        exif_data: Optional[ExifData] = None,
+        primary_directions: Optional[list[Optional[float]]] = None
+    ) -> list[MetadataOutput]:
+        """
+        Synchronous version of run_batch() for non-async contexts.
+        
+        Args:
+            heuristic_outputs: Heuristic indicators, one per clip
+            exif_data: Optional EXIF metadata shared by all clips
+            primary_directions: Optional primary motion direction per clip
+            
+        Returns:
+            MetadataOutput per clip, in input order
+        """
+        return self._thread_loop().run_until_complete(
+            self.run_batch(heuristic_outputs, exif_data, primary_directions)
+        )
+    
+    def _thread_loop(self) -> asyncio.AbstractEventLoop:
+        """
+        Get the event loop owned by the calling thread.
+        
+        Reuses one loop per calling thread instead of creating a new one
+        for every video in a batch script.
+        
+        Returns:
+            Open event loop for this thread
+        """
+        loop = getattr(self._thread_state, "loop", None)
+        if loop is None or loop.is_closed():
+            loop = asyncio.new_event_loop()
+            self._thread_state.loop = loop
+        return loop
+    
     def validate_output(self, metadata: MetadataOutput) -> tuple[bool, list[str]]:
         """
         Validate metadata output against JSON Schema.
@@ -888,7 +1187,7 @@ class MetadataGenerationPipeline:
         Returns:
             Tuple of (is_valid, list of error messages)
         """
-        return self.schema_validator.validate_metadata(metadata.to_dict())
+        return self.synthesizer._check_metadata(metadata)
     
     def get_confidence_action(self, confidence: float) -> str:
         """
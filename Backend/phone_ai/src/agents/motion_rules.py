@@ -4,14 +4,80 @@ Motion type inference rules for the Video Shooting Assistant.
 Rule-based classification of camera motion types based on heuristic indicators.
 Maps optical flow data and subject tracking to MotionType enum values.
 """
+import math
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Optional
 
+import numpy as np
+
 from src.models.enums import MotionType, SpeedProfile, SuggestedScale
 from src.models.data_types import HeuristicOutput, OpticalFlowData
 
 
-@dataclass
+# Code order for the integer arrays returned by infer_motion_batch;
+# e.g. MOTION_TYPE_CODES[code] gives back the MotionType member.
+MOTION_TYPE_CODES: tuple[MotionType, ...] = tuple(MotionType)
+SPEED_PROFILE_CODES: tuple[SpeedProfile, ...] = tuple(SpeedProfile)
+SUGGESTED_SCALE_CODES: tuple[SuggestedScale, ...] = tuple(SuggestedScale)
+
+_MT = {m: i for i, m in enumerate(MOTION_TYPE_CODES)}
+_SP = {p: i for i, p in enumerate(SPEED_PROFILE_CODES)}
+_SC = {s: i for i, s in enumerate(SUGGESTED_SCALE_CODES)}
+
+# Direction lookup table flags
+_DIR_HORIZONTAL = 1
+_DIR_VERTICAL = 2
+_DIR_AMBIGUOUS = 4  # A tolerance boundary falls inside this 1-degree bin
+
+
+def _classify_direction(direction: float, h_tol: float, v_tol: float) -> int:
+    """Exact pan/tilt classification of a direction in [0, 360]."""
+    flags = 0
+    if direction < h_tol or direction > 360 - h_tol or abs(direction - 180) < h_tol:
+        flags |= _DIR_HORIZONTAL
+    if abs(direction - 90) < v_tol or abs(direction - 270) < v_tol:
+        flags |= _DIR_VERTICAL
+    return flags
+
+
+@lru_cache(maxsize=8)
+def _build_direction_lut(h_tol: float, v_tol: float) -> np.ndarray:
+    """
+    Build a 361-entry table of direction flags indexed by int(direction).
+    
+    Bins whose classification is not constant across [k, k+1) are marked
+    _DIR_AMBIGUOUS so callers fall back to the exact comparisons there;
+    entry 360 covers the value 360.0 that float modulo can produce.
+    
+    Args:
+        h_tol: Horizontal tolerance in degrees
+        v_tol: Vertical tolerance in degrees
+        
+    Returns:
+        uint8 array of flag combinations
+    """
+    lut = np.zeros(361, dtype=np.uint8)
+    for k in range(360):
+        flags = _classify_direction(float(k), h_tol, v_tol)
+        # Boundaries are at multiples of the tolerances; check both sides
+        edges = {k + 1.0}
+        for tol in (h_tol, v_tol):
+            for center in (0.0, 90.0, 180.0, 270.0, 360.0):
+                for edge in (center - tol, center + tol):
+                    if k < edge < k + 1:
+                        edges.add(edge)
+        probes = [math.nextafter(e, -math.inf) for e in edges]
+        probes += [e for e in edges if e < k + 1]
+        if any(_classify_direction(p, h_tol, v_tol) != flags for p in probes):
+            flags |= _DIR_AMBIGUOUS
+        lut[k] = flags
+    lut[360] = _classify_direction(360.0, h_tol, v_tol)
+    lut.setflags(write=False)
+    return lut
+
+
+@dataclass(slots=True, frozen=True)
 class MotionRulesConfig:
     """Configuration for motion type inference rules."""
     
@@ -53,6 +119,45 @@ class MotionTypeInferrer:
             config: Configuration for inference rules
         """
         self.config = config or MotionRulesConfig()
+        
+        # The config is frozen, so hot-path thresholds can be cached as
+        # plain attributes (one lookup instead of self.config.<name>)
+        self._static = self.config.static_threshold
+        self._slow = self.config.slow_motion_threshold
+        self._dolly = self.config.dolly_threshold
+        self._significant = self.config.significant_change_threshold
+        self._handheld_smoothness = self.config.handheld_smoothness_threshold
+        self._extreme_closeup = self.config.extreme_closeup_threshold
+        self._closeup = self.config.closeup_threshold
+        self._medium = self.config.medium_threshold
+        # Plain tuple copy: scalar indexing is cheaper than on an ndarray
+        self._direction_lut: tuple[int, ...] = tuple(
+            _build_direction_lut(
+                self.config.horizontal_tolerance,
+                self.config.vertical_tolerance,
+            ).tolist()
+        )
+    
+    @classmethod
+    @lru_cache(maxsize=8)
+    def from_config_cached(
+        cls,
+        config: Optional[MotionRulesConfig] = None
+    ) -> "MotionTypeInferrer":
+        """
+        Get a shared inferrer for a configuration.
+        
+        The inferrer holds no per-call state and the config is frozen, so
+        callers using the same config can share one instance instead of
+        allocating a new one per clip.
+        
+        Args:
+            config: Configuration for inference rules (default if None)
+            
+        Returns:
+            Cached MotionTypeInferrer for this configuration
+        """
+        return cls(config)
     
     def infer_motion_type(
         self,
@@ -79,25 +184,75 @@ class MotionTypeInferrer:
         Returns:
             Inferred MotionType
         """
+        return self._classify_motion(
+            heuristic_output.avg_motion_px_per_s,
+            heuristic_output.frame_pct_change,
+            heuristic_output.motion_smoothness,
+            heuristic_output.subject_occupancy,
+            primary_direction_deg,
+        )
+    
+    def infer_all(
+        self,
+        heuristic_output: HeuristicOutput,
+        primary_direction_deg: Optional[float] = None
+    ) -> tuple[MotionType, SpeedProfile, SuggestedScale, float]:
+        """
+        Infer motion type, speed profile, scale and confidence in one pass.
+        
+        Reads each indicator off the heuristic output once and feeds the
+        same locals to every rule, instead of each public method re-reading
+        them.
+        
+        Args:
+            heuristic_output: Output from the Heuristic Analyzer
+            primary_direction_deg: Primary motion direction in degrees
+            
+        Returns:
+            Tuple of (motion_type, speed_profile, suggested_scale, confidence)
+        """
         avg_motion = heuristic_output.avg_motion_px_per_s
         frame_pct_change = heuristic_output.frame_pct_change
         motion_smoothness = heuristic_output.motion_smoothness
         subject_occupancy = heuristic_output.subject_occupancy
         
+        motion_type = self._classify_motion(
+            avg_motion,
+            frame_pct_change,
+            motion_smoothness,
+            subject_occupancy,
+            primary_direction_deg,
+        )
+        return (
+            motion_type,
+            self._speed_profile_for(motion_type, motion_smoothness, frame_pct_change),
+            self.infer_suggested_scale(subject_occupancy),
+            self._confidence_for(motion_type, avg_motion, motion_smoothness, frame_pct_change),
+        )
+    
+    def _classify_motion(
+        self,
+        avg_motion: float,
+        frame_pct_change: float,
+        motion_smoothness: float,
+        subject_occupancy: float,
+        primary_direction_deg: Optional[float]
+    ) -> MotionType:
+        """Decision tree behind infer_motion_type, on plain indicator values."""
         # Rule 1: Check for static shot
-        if avg_motion < self.config.static_threshold:
+        if avg_motion < self._static:
             return MotionType.STATIC
         
         # Rule 2: Check for handheld (low smoothness)
-        if motion_smoothness < self.config.handheld_smoothness_threshold:
+        if motion_smoothness < self._handheld_smoothness:
             return MotionType.HANDHELD
         
         # Rule 3: Check for dolly movement (significant size change)
-        if frame_pct_change > self.config.dolly_threshold:
+        if frame_pct_change > self._dolly:
             # Determine direction based on whether subject is getting larger or smaller
             # If occupancy is increasing over time, it's dolly_in
             # For now, use frame_pct_change magnitude as a proxy
-            if frame_pct_change > self.config.significant_change_threshold:
+            if frame_pct_change > self._significant:
                 # Significant change - likely dolly
                 # Use subject occupancy to guess direction
                 # Higher occupancy at end suggests dolly_in
@@ -111,29 +266,43 @@ class MotionTypeInferrer:
             # Normalize direction to 0-360
             direction = primary_direction_deg % 360
             
-            # Check for horizontal motion (pan)
-            # Pan is around 0/180 degrees (left-right)
-            if self._is_horizontal(direction):
-                return MotionType.PAN
-            
-            # Check for vertical motion (tilt)
-            # Tilt is around 90/270 degrees (up-down)
-            if self._is_vertical(direction):
-                return MotionType.TILT
+            if not math.isnan(direction):
+                flags = self._direction_flags(direction)
+                
+                # Check for horizontal motion (pan)
+                # Pan is around 0/180 degrees (left-right)
+                if flags & _DIR_HORIZONTAL:
+                    return MotionType.PAN
+                
+                # Check for vertical motion (tilt)
+                # Tilt is around 90/270 degrees (up-down)
+                if flags & _DIR_VERTICAL:
+                    return MotionType.TILT
         
         # Rule 6: Check for tracking shot
         # If there's consistent subject tracking with moderate motion
         if (subject_occupancy > 0.1 and 
-            avg_motion > self.config.slow_motion_threshold and
+            avg_motion > self._slow and
             motion_smoothness > 0.6):
             return MotionType.TRACK
         
         # Default: If motion exists but doesn't fit other categories
-        if avg_motion > self.config.slow_motion_threshold:
+        if avg_motion > self._slow:
             return MotionType.HANDHELD
         
         return MotionType.STATIC
     
+    def _direction_flags(self, direction: float) -> int:
+        """Look up pan/tilt flags for a direction already normalized to 0-360."""
+        flags = self._direction_lut[int(direction)]
+        if flags & _DIR_AMBIGUOUS:
+            return _classify_direction(
+                direction,
+                self.config.horizontal_tolerance,
+                self.config.vertical_tolerance,
+            )
+        return flags
+    
     def _is_horizontal(self, direction: float) -> bool:
         """Check if direction is primarily horizontal (pan)."""
         tolerance = self.config.horizontal_tolerance
@@ -168,9 +337,19 @@ class MotionTypeInferrer:
         Returns:
             Inferred SpeedProfile
         """
-        motion_smoothness = heuristic_output.motion_smoothness
-        frame_pct_change = heuristic_output.frame_pct_change
-        
+        return self._speed_profile_for(
+            motion_type,
+            heuristic_output.motion_smoothness,
+            heuristic_output.frame_pct_change,
+        )
+    
+    @staticmethod
+    def _speed_profile_for(
+        motion_type: MotionType,
+        motion_smoothness: float,
+        frame_pct_change: float
+    ) -> SpeedProfile:
+        """Speed profile rules behind infer_speed_profile."""
         # Static shots don't have a meaningful speed profile
         if motion_type == MotionType.STATIC:
             return SpeedProfile.LINEAR
@@ -207,11 +386,11 @@ class MotionTypeInferrer:
         Returns:
             Suggested framing scale
         """
-        if subject_occupancy >= self.config.extreme_closeup_threshold:
+        if subject_occupancy >= self._extreme_closeup:
             return SuggestedScale.EXTREME_CLOSEUP
-        elif subject_occupancy >= self.config.closeup_threshold:
+        elif subject_occupancy >= self._closeup:
             return SuggestedScale.CLOSEUP
-        elif subject_occupancy >= self.config.medium_threshold:
+        elif subject_occupancy >= self._medium:
             return SuggestedScale.MEDIUM
         else:
             return SuggestedScale.WIDE
@@ -236,16 +415,27 @@ class MotionTypeInferrer:
         Returns:
             Confidence score in range [0, 1]
         """
+        return self._confidence_for(
+            motion_type,
+            heuristic_output.avg_motion_px_per_s,
+            heuristic_output.motion_smoothness,
+            heuristic_output.frame_pct_change,
+        )
+    
+    def _confidence_for(
+        self,
+        motion_type: MotionType,
+        avg_motion: float,
+        motion_smoothness: float,
+        frame_pct_change: float
+    ) -> float:
+        """Confidence rules behind calculate_confidence."""
         confidence = 0.5  # Base confidence
         
         # Boost confidence for clear motion patterns
-        avg_motion = heuristic_output.avg_motion_px_per_s
-        motion_smoothness = heuristic_output.motion_smoothness
-        frame_pct_change = heuristic_output.frame_pct_change
-        
         # Static shots are easy to identify
         if motion_type == MotionType.STATIC:
-            if avg_motion < self.config.static_threshold:
+            if avg_motion < self._static:
                 confidence += 0.3
         
         # Smooth motion is easier to classify
@@ -256,7 +446,7 @@ class MotionTypeInferrer:
         
         # Clear dolly movements
         if motion_type in (MotionType.DOLLY_IN, MotionType.DOLLY_OUT):
-            if frame_pct_change > self.config.significant_change_threshold:
+            if frame_pct_change > self._significant:
                 confidence += 0.2
         
         # Penalize for ambiguous cases
@@ -283,25 +473,147 @@ def infer_motion_type_from_heuristics(
     Returns:
         Tuple of (motion_type, speed_profile, suggested_scale, confidence)
     """
-    inferrer = MotionTypeInferrer(config)
+    inferrer = MotionTypeInferrer.from_config_cached(config)
+    return inferrer.infer_all(heuristic_output, primary_direction_deg)
+
+
+def infer_motion_batch(
+    avg_motion: np.ndarray,
+    frame_pct_change: np.ndarray,
+    motion_smoothness: np.ndarray,
+    subject_occupancy: np.ndarray,
+    primary_direction_deg: Optional[np.ndarray] = None,
+    config: Optional[MotionRulesConfig] = None
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Vectorized version of infer_motion_type_from_heuristics for many segments.
     
-    motion_type = inferrer.infer_motion_type(
-        heuristic_output, 
-        primary_direction_deg
-    )
+    Evaluates the same decision tree as MotionTypeInferrer with boolean
+    masks, so scoring N segments costs a handful of array operations
+    instead of N interpreter passes.
     
-    speed_profile = inferrer.infer_speed_profile(
-        heuristic_output,
-        motion_type
-    )
+    Args:
+        avg_motion: (N,) average motion in px/s
+        frame_pct_change: (N,) frame percentage change
+        motion_smoothness: (N,) motion smoothness
+        subject_occupancy: (N,) subject occupancy
+        primary_direction_deg: Optional (N,) primary direction in degrees;
+                               NaN entries are treated as "no direction"
+        config: Optional configuration for inference rules
+        
+    Returns:
+        Tuple of (motion_type, speed_profile, suggested_scale, confidence)
+        arrays. The first three hold int8 indices into MOTION_TYPE_CODES,
+        SPEED_PROFILE_CODES and SUGGESTED_SCALE_CODES respectively.
+    """
+    cfg = config or MotionRulesConfig()
+    avg = np.asarray(avg_motion, dtype=np.float64)
+    pct = np.asarray(frame_pct_change, dtype=np.float64)
+    smooth = np.asarray(motion_smoothness, dtype=np.float64)
+    occ = np.asarray(subject_occupancy, dtype=np.float64)
     
-    suggested_scale = inferrer.infer_suggested_scale(
-        heuristic_output.subject_occupancy
+    # Rules in the same priority order as infer_motion_type
+    is_static = avg < cfg.static_threshold
+    is_handheld = ~is_static & (smooth < cfg.handheld_smoothness_threshold)
+    undecided = ~(is_static | is_handheld)
+    is_dolly = undecided & (pct > cfg.dolly_threshold) & (
+        pct > cfg.significant_change_threshold
     )
+    undecided &= ~is_dolly
     
-    confidence = inferrer.calculate_confidence(
-        heuristic_output,
-        motion_type
-    )
+    if primary_direction_deg is not None:
+        # Non-finite directions (NaN/inf) become NaN here: "no direction"
+        with np.errstate(invalid="ignore"):
+            direction = np.mod(np.asarray(primary_direction_deg, dtype=np.float64), 360)
+        has_dir = ~np.isnan(direction)
+        direction[~has_dir] = 0.0
+        
+        # One gather from the direction table; only bins that straddle a
+        # tolerance boundary are re-classified exactly
+        lut = _build_direction_lut(cfg.horizontal_tolerance, cfg.vertical_tolerance)
+        flags = lut[direction.astype(np.intp)]
+        ambiguous = np.flatnonzero(flags & _DIR_AMBIGUOUS)
+        if ambiguous.size:
+            flags = flags.copy()
+            flags[ambiguous] = [
+                _classify_direction(d, cfg.horizontal_tolerance, cfg.vertical_tolerance)
+                for d in direction[ambiguous].tolist()
+            ]
+        horizontal = (flags & _DIR_HORIZONTAL).astype(bool)
+        vertical = (flags & _DIR_VERTICAL).astype(bool)
+        is_pan = undecided & has_dir & horizontal
+        undecided &= ~is_pan
+        is_tilt = undecided & has_dir & vertical
+        undecided &= ~is_tilt
+    else:
+        is_pan = is_tilt = np.zeros(avg.shape, dtype=bool)
+    
+    is_moving = avg > cfg.slow_motion_threshold
+    is_track = undecided & (occ > 0.1) & is_moving & (smooth > 0.6)
+    undecided &= ~is_track
+    is_handheld |= undecided & is_moving
+    
+    motion_type = np.select(
+        [
+            is_static,
+            is_handheld,
+            is_dolly & (occ > 0.3),
+            is_dolly,
+            is_pan,
+            is_tilt,
+            is_track,
+        ],
+        [
+            _MT[MotionType.STATIC],
+            _MT[MotionType.HANDHELD],
+            _MT[MotionType.DOLLY_IN],
+            _MT[MotionType.DOLLY_OUT],
+            _MT[MotionType.PAN],
+            _MT[MotionType.TILT],
+            _MT[MotionType.TRACK],
+        ],
+        default=_MT[MotionType.STATIC],
+    ).astype(np.int8)
+    
+    # Speed profile: static/handheld are always linear
+    final_static = motion_type == _MT[MotionType.STATIC]
+    linear_type = final_static | (motion_type == _MT[MotionType.HANDHELD])
+    speed_profile = np.select(
+        [
+            linear_type,
+            smooth > 0.8,
+            (smooth > 0.6) & (pct > 0.1),
+            smooth > 0.6,
+        ],
+        [
+            _SP[SpeedProfile.LINEAR],
+            _SP[SpeedProfile.EASE_IN_OUT],
+            _SP[SpeedProfile.EASE_IN],
+            _SP[SpeedProfile.EASE_OUT],
+        ],
+        default=_SP[SpeedProfile.LINEAR],
+    ).astype(np.int8)
+    
+    suggested_scale = np.select(
+        [
+            occ >= cfg.extreme_closeup_threshold,
+            occ >= cfg.closeup_threshold,
+            occ >= cfg.medium_threshold,
+        ],
+        [
+            _SC[SuggestedScale.EXTREME_CLOSEUP],
+            _SC[SuggestedScale.CLOSEUP],
+            _SC[SuggestedScale.MEDIUM],
+        ],
+        default=_SC[SuggestedScale.WIDE],
+    ).astype(np.int8)
+    
+    # Confidence, accumulated in the same order as calculate_confidence
+    confidence = np.full(avg.shape, 0.5)
+    confidence += np.where(final_static & is_static, 0.3, 0.0)
+    confidence += np.where(smooth > 0.7, 0.15, np.where(smooth > 0.5, 0.1, 0.0))
+    confidence += np.where(is_dolly & (pct > cfg.significant_change_threshold), 0.2, 0.0)
+    confidence -= np.where(smooth < 0.3, 0.1, 0.0)
+    np.clip(confidence, 0.0, 1.0, out=confidence)
     
     return motion_type, speed_profile, suggested_scale, confidence
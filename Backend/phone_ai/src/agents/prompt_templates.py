@@ -4,7 +4,14 @@ LLM prompt templates for the Metadata Synthesizer Agent.
 Contains few-shot prompt templates with examples for generating
 structured metadata from heuristic indicators.
 """
-from typing import Optional
+import json
+import re
+from typing import Any, Callable, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from src.models.data_types import ExifData, HeuristicOutput
 
@@ -144,34 +151,38 @@ def build_few_shot_prompt(
     """
     # Limit examples to available range
     num_examples = max(2, min(4, num_examples, len(FEW_SHOT_EXAMPLES)))
+    
+    # Dispatch to the builder specialized for this prompt shape
+    builder = _PROMPT_BUILDERS[(exif_data is not None, num_examples)]
+    return builder(heuristic_output, exif_data)
+
+
+def _build_static_prefix(num_examples: int) -> str:
+    """
+    Build the static part of the few-shot prompt (system prompt + examples).
+    
+    The examples never change at runtime, so the prefix is built once per
+    example count at import time (see _PRECOMPUTED_PREFIX). Keeping it as
+    the leading part of every prompt also lets providers reuse their
+    prompt/KV cache across clips.
+    
+    Args:
+        num_examples: Number of few-shot examples to include
+        
+    Returns:
+        Prompt prefix ending right before the current input JSON
+    """
     examples = FEW_SHOT_EXAMPLES[:num_examples]
     
     # Build examples section
-    examples_text = ""
+    parts: list[str] = []
     for i, example in enumerate(examples, 1):
-        examples_text += f"\n### 示例 {i}\n"
-        examples_text += f"输入数据:\n```json\n{_format_input(example['input'])}\n```\n"
-        examples_text += f"输出:\n```json\n{_format_output(example['output'])}\n```\n"
-    
-    # Build current input
-    current_input = {
-        "avg_motion_px_per_s": heuristic_output.avg_motion_px_per_s,
-        "frame_pct_change": heuristic_output.frame_pct_change,
-        "motion_smoothness": heuristic_output.motion_smoothness,
-        "subject_occupancy": heuristic_output.subject_occupancy,
-        "beat_alignment_score": heuristic_output.beat_alignment_score,
-        "time_range": list(heuristic_output.time_range),
-    }
+        parts.append(f"\n### 示例 {i}\n")
+        parts.append(f"输入数据:\n```json\n{_format_input(example['input'])}\n```\n")
+        parts.append(f"输出:\n```json\n{_format_output(example['output'])}\n```\n")
+    examples_text = "".join(parts)
     
-    if exif_data:
-        current_input["exif"] = {
-            "focal_length_mm": exif_data.focal_length_mm,
-            "aperture": exif_data.aperture,
-            "sensor_size": exif_data.sensor_size,
-        }
-    
-    # Construct the full prompt
-    prompt = f"""{SYSTEM_PROMPT}
+    return f"""{SYSTEM_PROMPT}
 
 ## 示例
 {examples_text}
@@ -180,15 +191,7 @@ def build_few_shot_prompt(
 
 请根据以下视频分析数据生成元数据：
 
-输入数据:
-```json
-{_format_input(current_input)}
-```
-
-请输出完整的JSON格式元数据，包含motion、framing、confidence和explainability字段。
-只输出JSON，不要添加其他文字。"""
-    
-    return prompt
+输入数据:"""
 
 
 def build_simple_prompt(
@@ -247,16 +250,160 @@ def build_simple_prompt(
 
 def _format_input(data: dict) -> str:
     """Format input data as JSON string."""
-    import json
-    return json.dumps(data, ensure_ascii=False, indent=2)
+    return _dumps_indented(data)
 
 
 def _format_output(data: dict) -> str:
     """Format output data as JSON string."""
-    import json
+    return _dumps_indented(data)
+
+
+def _dumps_indented(data: dict) -> str:
+    """Serialize to 2-space indented JSON, using orjson when available."""
+    if orjson is not None:
+        # Heuristic and EXIF values may be numpy scalars
+        return orjson.dumps(
+            data,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+        ).decode()
     return json.dumps(data, ensure_ascii=False, indent=2)
 
 
+def _loads(text: str) -> Any:
+    """Parse JSON text, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+# Characters that matter when matching braces in JSON text
+_JSON_STRUCT_RE = re.compile(r'[{}"\\]')
+
+
+def _iter_code_blocks(text: str):
+    """
+    Yield the bodies of markdown code fences (```json ... ```) in order.
+    
+    Uses plain str.find so the scan is linear in the response length.
+    """
+    pos = 0
+    while (fence := text.find("```", pos)) != -1:
+        body_start = fence + 3
+        if text.startswith("json", body_start):
+            body_start += 4
+        close = text.find("```", body_start)
+        if close == -1:
+            return
+        yield text[body_start:close]
+        pos = close + 3
+
+
+def _find_json_object(text: str, start: int = 0) -> Optional[tuple[int, int]]:
+    """
+    Locate the top-level {...} object opened by the first "{" at or after ``start``.
+    
+    Single linear pass that tracks brace depth while skipping braces inside
+    string literals (honouring backslash escapes). Only structural
+    characters are visited, so there is no regex backtracking on malformed
+    input. An object that never closes (e.g. truncated output) yields None
+    rather than one of its nested fragments.
+    
+    Args:
+        text: Text to scan
+        start: Index to start searching from
+        
+    Returns:
+        (begin, end) slice bounds of the object, or None if there is none
+    """
+    begin = text.find("{", start)
+    if begin == -1:
+        return None
+    
+    depth = 0
+    in_string = False
+    skip_to = begin
+    for match in _JSON_STRUCT_RE.finditer(text, begin):
+        pos = match.start()
+        if pos < skip_to:
+            continue  # Character escaped by a preceding backslash
+        ch = match.group()
+        if in_string:
+            if ch == "\\":
+                skip_to = pos + 2
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return begin, pos + 1
+    return None
+
+
+# Static few-shot prefixes for every supported example count (2-4)
+_PRECOMPUTED_PREFIX: dict[int, str] = {
+    n: _build_static_prefix(n)
+    for n in range(2, min(4, len(FEW_SHOT_EXAMPLES)) + 1)
+}
+
+# Fixed text that closes every few-shot prompt after the current input
+_FEW_SHOT_SUFFIX = """
+```
+
+请输出完整的JSON格式元数据，包含motion、framing、confidence和explainability字段。
+只输出JSON，不要添加其他文字。"""
+
+
+def _make_prompt_builder(
+    num_examples: int,
+    has_exif: bool
+) -> Callable[[HeuristicOutput, Optional[ExifData]], str]:
+    """
+    Create a few-shot prompt builder specialized for one prompt shape.
+    
+    The prefix and the EXIF branch are resolved here, once, so the
+    returned closure only serializes the current input.
+    
+    Args:
+        num_examples: Number of few-shot examples in the prefix
+        has_exif: Whether the current input carries EXIF data
+        
+    Returns:
+        Function mapping (heuristic_output, exif_data) to the full prompt
+    """
+    head = _PRECOMPUTED_PREFIX[num_examples] + "\n```json\n"
+    
+    def build(heuristic_output: HeuristicOutput, exif_data: Optional[ExifData]) -> str:
+        current_input = {
+            "avg_motion_px_per_s": heuristic_output.avg_motion_px_per_s,
+            "frame_pct_change": heuristic_output.frame_pct_change,
+            "motion_smoothness": heuristic_output.motion_smoothness,
+            "subject_occupancy": heuristic_output.subject_occupancy,
+            "beat_alignment_score": heuristic_output.beat_alignment_score,
+            "time_range": list(heuristic_output.time_range),
+        }
+        if has_exif:
+            current_input["exif"] = {
+                "focal_length_mm": exif_data.focal_length_mm,
+                "aperture": exif_data.aperture,
+                "sensor_size": exif_data.sensor_size,
+            }
+        return "".join((head, _format_input(current_input), _FEW_SHOT_SUFFIX))
+    
+    return build
+
+
+# Specialized builders keyed by (has_exif, num_examples)
+_PROMPT_BUILDERS: dict[tuple[bool, int], Callable[[HeuristicOutput, Optional[ExifData]], str]] = {
+    (has_exif, n): _make_prompt_builder(n, has_exif)
+    for has_exif in (False, True)
+    for n in _PRECOMPUTED_PREFIX
+}
+
+
 def parse_llm_response(response: str) -> dict:
     """
     Parse the LLM response to extract JSON metadata.
@@ -275,33 +422,27 @@ def parse_llm_response(response: str) -> dict:
     Raises:
         ValueError: If JSON cannot be extracted from response
     """
-    import json
-    import re
-    
     # Try direct JSON parsing first
     try:
-        return json.loads(response.strip())
+        return _loads(response.strip())
     except json.JSONDecodeError:
         pass
     
     # Try to extract JSON from markdown code blocks
-    code_block_pattern = r'```(?:json)?\s*\n?([\s\S]*?)\n?```'
-    matches = re.findall(code_block_pattern, response)
-    
-    for match in matches:
+    for block in _iter_code_blocks(response):
         try:
-            return json.loads(match.strip())
+            return _loads(block.strip())
         except json.JSONDecodeError:
             continue
     
-    # Try to find JSON object in the response
-    json_pattern = r'\{[\s\S]*\}'
-    matches = re.findall(json_pattern, response)
-    
-    for match in matches:
+    # Try each top-level balanced object in the response, in order; the
+    # scan resumes after an object that fails to parse, so it stays linear
+    start = 0
+    while (span := _find_json_object(response, start)) is not None:
+        begin, end = span
         try:
-            return json.loads(match)
+            return _loads(response[begin:end])
         except json.JSONDecodeError:
-            continue
+            start = end
     
     raise ValueError(f"Could not extract valid JSON from LLM response: {response[:200]}...")
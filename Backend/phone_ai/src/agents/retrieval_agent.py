@@ -5,7 +5,7 @@ Provides reference video retrieval using vector similarity search.
 """
 import logging
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Optional, Union
 
 import numpy as np
 
@@ -13,20 +13,175 @@ from src.models.data_types import RetrievalOutput, RetrievalResult
 from src.services.vector_db import (
     VectorDB,
     VectorDBConfig,
+    VectorDBError,
     VideoMetadata,
     SearchResult,
     RetrievalFilters,
     create_vector_db,
+    normalize_embeddings,
 )
 
 logger = logging.getLogger(__name__)
 
+# Frame embeddings as produced upstream (lists) or as a (frames, dimension)
+# array; float32 arrays are aggregated without a copy
+FrameEmbeddings = Union[np.ndarray, list[list[float]]]
+
+
+def _mean_into(embeddings: np.ndarray, out: np.ndarray) -> None:
+    """Element-wise mean over frames."""
+    np.mean(embeddings, axis=0, out=out)
+
+
+def _max_into(embeddings: np.ndarray, out: np.ndarray) -> None:
+    """Element-wise max over frames."""
+    np.max(embeddings, axis=0, out=out)
+
+
+def _first_into(embeddings: np.ndarray, out: np.ndarray) -> None:
+    """First frame."""
+    out[:] = embeddings[0]
+
+
+def _last_into(embeddings: np.ndarray, out: np.ndarray) -> None:
+    """Last frame."""
+    out[:] = embeddings[-1]
+
+
+# Aggregation kernels keyed by method name; reductions write into the
+# caller's row so no per-video result array is allocated
+_AGGREGATORS = {
+    "mean": _mean_into,
+    "max": _max_into,
+    "first": _first_into,
+    "last": _last_into,
+}
+
+# Methods that read every frame (the others only need one row)
+_REDUCING_AGGREGATIONS = frozenset(("mean", "max"))
+
+
+def _aggregate_into(
+    frame_embeddings: FrameEmbeddings,
+    aggregation: str,
+    out: np.ndarray,
+) -> np.ndarray:
+    """
+    Aggregate frame embeddings into a preallocated row.
+    
+    Args:
+        frame_embeddings: List (or array) of frame embedding vectors
+        aggregation: Aggregation method ("mean", "max", "first", "last")
+        out: Output row of shape (dimension,), dtype float32
+        
+    Returns:
+        The filled output row
+    """
+    aggregator = _AGGREGATORS.get(aggregation)
+    if aggregator is None:
+        raise ValueError(f"Unknown aggregation method: {aggregation}")
+    if aggregation in _REDUCING_AGGREGATIONS:
+        # No copy when frames already arrive as a float32 array
+        frame_embeddings = np.asarray(frame_embeddings, dtype=np.float32)
+    aggregator(frame_embeddings, out)
+    return out
+
+
+def _aggregate(frame_embeddings: FrameEmbeddings, aggregation: str) -> np.ndarray:
+    """
+    Aggregate frame embeddings into a single embedding.
+    
+    Args:
+        frame_embeddings: List (or array) of frame embedding vectors
+        aggregation: Aggregation method ("mean", "max", "first", "last")
+        
+    Returns:
+        Aggregated embedding of shape (dimension,)
+    """
+    out = np.empty(len(frame_embeddings[0]), dtype=np.float32)
+    return _aggregate_into(frame_embeddings, aggregation, out)
+
+
+class RunningAggregator:
+    """
+    Incrementally aggregate frame embeddings as frames arrive.
+    
+    Keeps a running sum (mean), element-wise max, or single row (first/last),
+    so each new frame costs O(dimension) instead of re-aggregating every
+    frame seen so far. Pass value() to RetrievalAgent.search.
+    """
+    
+    def __init__(self, dimension: int, aggregation: str = "mean"):
+        """
+        Initialize the aggregator.
+        
+        Args:
+            dimension: Embedding dimension
+            aggregation: Aggregation method ("mean", "max", "first", "last")
+        """
+        if aggregation not in _AGGREGATORS:
+            raise ValueError(f"Unknown aggregation method: {aggregation}")
+        self.dimension = dimension
+        self.aggregation = aggregation
+        # Accumulate the mean in float64 so long streams don't lose precision
+        dtype = np.float64 if aggregation == "mean" else np.float32
+        self._acc = np.empty(dimension, dtype=dtype)
+        self._count = 0
+    
+    def __len__(self) -> int:
+        """Number of frames added so far."""
+        return self._count
+    
+    def add(self, embedding: np.ndarray) -> None:
+        """
+        Add one frame embedding.
+        
+        Args:
+            embedding: Frame embedding of shape (dimension,)
+        """
+        embedding = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        if embedding.shape[0] != self.dimension:
+            raise ValueError(
+                f"Embedding dimension mismatch: expected {self.dimension}, "
+                f"got {embedding.shape[0]}"
+            )
+        
+        if self._count == 0 or self.aggregation == "last":
+            self._acc[:] = embedding
+        elif self.aggregation == "mean":
+            self._acc += embedding
+        elif self.aggregation == "max":
+            np.maximum(self._acc, embedding, out=self._acc)
+        self._count += 1
+    
+    def value(self) -> np.ndarray:
+        """
+        Get the aggregate of the frames added so far.
+        
+        Returns:
+            Aggregated embedding of shape (dimension,), dtype float32
+        """
+        if self._count == 0:
+            raise ValueError("No frame embeddings provided")
+        if self.aggregation == "mean":
+            return (self._acc / self._count).astype(np.float32)
+        return self._acc.copy()
+    
+    def reset(self) -> None:
+        """Discard all frames added so far."""
+        self._count = 0
+
 
 @dataclass
 class RetrievalAgentConfig:
     """Configuration for the Retrieval Agent."""
     dimension: int = 2048  # Embedding dimension
-    index_type: str = "flat"  # FAISS index type
+    index_type: str = "ivfpq"  # FAISS index type ("flat", "ivf", "ivfpq")
+    nlist: int = 100  # IVF clusters
+    nprobe: int = 10  # IVF clusters visited per query
+    pq_m: int = 64  # PQ sub-quantizers (must divide dimension)
+    pq_nbits: int = 8  # Bits per PQ code
+    storage_dtype: str = "float32"  # "float16"/"int8" store flat/ivf vectors scalar-quantized
     default_top_k: int = 5  # Default number of results
     min_similarity: float = 0.3  # Minimum similarity threshold
     index_path: Optional[str] = None  # Path to FAISS index
@@ -64,6 +219,11 @@ class RetrievalAgent:
             db_config = VectorDBConfig(
                 dimension=self.config.dimension,
                 index_type=self.config.index_type,
+                nlist=self.config.nlist,
+                nprobe=self.config.nprobe,
+                pq_m=self.config.pq_m,
+                pq_nbits=self.config.pq_nbits,
+                storage_dtype=self.config.storage_dtype,
                 index_path=self.config.index_path,
                 metadata_path=self.config.metadata_path,
             )
@@ -120,26 +280,24 @@ class RetrievalAgent:
             f"top_k={top_k}, motion_type={motion_type}, subject_type={subject_type}"
         )
         
-        # Perform search
+        # Perform search, leaving out the query video itself
         search_results = self._vector_db.search(
             query_embedding=query_embedding,
             top_k=top_k,
             filters=filters,
+            exclude_ids={query_video_id},
         )
         
         # Convert to RetrievalOutput format
-        results = []
-        for sr in search_results:
-            # Skip if this is the query video itself
-            if sr.video_id == query_video_id:
-                continue
-            
-            results.append(RetrievalResult(
+        results = [
+            RetrievalResult(
                 ref_video_id=sr.video_id,
                 thumbnail_url=sr.metadata.thumbnail_url or "",
                 similarity_score=sr.similarity_score,
                 annotation=sr.metadata.annotation,
-            ))
+            )
+            for sr in search_results
+        ]
         
         logger.info(f"Found {len(results)} similar videos")
         
@@ -150,7 +308,7 @@ class RetrievalAgent:
     
     async def search_by_aggregated_embedding(
         self,
-        frame_embeddings: list[list[float]],
+        frame_embeddings: FrameEmbeddings,
         query_video_id: str,
         top_k: Optional[int] = None,
         motion_type: Optional[str] = None,
@@ -161,7 +319,7 @@ class RetrievalAgent:
         Search using aggregated frame embeddings.
         
         Args:
-            frame_embeddings: List of frame embedding vectors
+            frame_embeddings: List or (frames, dimension) array of frame embeddings
             query_video_id: ID of the query video
             top_k: Number of results to return
             motion_type: Filter by motion type
@@ -171,23 +329,12 @@ class RetrievalAgent:
         Returns:
             RetrievalOutput with search results
         """
-        if not frame_embeddings:
+        if len(frame_embeddings) == 0:
             logger.warning("No frame embeddings provided")
             return RetrievalOutput(query_video_id=query_video_id, results=[])
         
-        embeddings = np.array(frame_embeddings, dtype=np.float32)
-        
         # Aggregate embeddings
-        if aggregation == "mean":
-            query_embedding = np.mean(embeddings, axis=0)
-        elif aggregation == "max":
-            query_embedding = np.max(embeddings, axis=0)
-        elif aggregation == "first":
-            query_embedding = embeddings[0]
-        elif aggregation == "last":
-            query_embedding = embeddings[-1]
-        else:
-            raise ValueError(f"Unknown aggregation method: {aggregation}")
+        query_embedding = _aggregate(frame_embeddings, aggregation)
         
         return await self.search(
             query_embedding=query_embedding,
@@ -235,7 +382,8 @@ class RetrievalAgent:
             extra=extra_metadata or {},
         )
         
-        idx = self._vector_db.add(video_id, embedding, metadata)
+        embedding = np.asarray(embedding, dtype=np.float32).reshape(1, -1)
+        idx = self._vector_db.add_batch([video_id], embedding, [metadata])[0]
         logger.info(f"Indexed video {video_id} at position {idx}")
         
         return idx
@@ -244,7 +392,7 @@ class RetrievalAgent:
         self,
         video_id: str,
         video_path: str,
-        frame_embeddings: list[list[float]],
+        frame_embeddings: FrameEmbeddings,
         motion_type: Optional[str] = None,
         subject_type: Optional[str] = None,
         thumbnail_url: Optional[str] = None,
@@ -258,7 +406,7 @@ class RetrievalAgent:
         Args:
             video_id: Unique identifier for the video
             video_path: Path to the video file
-            frame_embeddings: List of frame embedding vectors
+            frame_embeddings: List or (frames, dimension) array of frame embeddings
             motion_type: Type of camera motion
             subject_type: Type of subject in the video
             thumbnail_url: URL to video thumbnail
@@ -269,22 +417,11 @@ class RetrievalAgent:
         Returns:
             Index position of the added video
         """
-        if not frame_embeddings:
+        if len(frame_embeddings) == 0:
             raise ValueError("No frame embeddings provided")
         
-        embeddings = np.array(frame_embeddings, dtype=np.float32)
-        
         # Aggregate embeddings
-        if aggregation == "mean":
-            video_embedding = np.mean(embeddings, axis=0)
-        elif aggregation == "max":
-            video_embedding = np.max(embeddings, axis=0)
-        elif aggregation == "first":
-            video_embedding = embeddings[0]
-        elif aggregation == "last":
-            video_embedding = embeddings[-1]
-        else:
-            raise ValueError(f"Unknown aggregation method: {aggregation}")
+        video_embedding = _aggregate(frame_embeddings, aggregation)
         
         return self.index_video(
             video_id=video_id,
@@ -309,7 +446,7 @@ class RetrievalAgent:
             videos: List of video dictionaries with keys:
                 - video_id: str
                 - video_path: str
-                - embedding: np.ndarray or frame_embeddings: list[list[float]]
+                - embedding: np.ndarray or frame_embeddings: list[list[float]] | np.ndarray
                 - motion_type: Optional[str]
                 - subject_type: Optional[str]
                 - thumbnail_url: Optional[str]
@@ -320,43 +457,60 @@ class RetrievalAgent:
         Returns:
             List of index positions
         """
-        indices = []
+        if aggregation not in _AGGREGATORS:
+            raise ValueError(f"Unknown aggregation method: {aggregation}")
         
-        for video in videos:
+        # Fill one contiguous (N, dimension) matrix and add it in one call
+        dimension = self.config.dimension
+        embeddings = np.empty((len(videos), dimension), dtype=np.float32)
+        video_ids = []
+        metadata_list = []
+        
+        for row, video in enumerate(videos):
             video_id = video["video_id"]
-            video_path = video["video_path"]
             
             if "embedding" in video:
-                idx = self.index_video(
-                    video_id=video_id,
-                    video_path=video_path,
-                    embedding=video["embedding"],
-                    motion_type=video.get("motion_type"),
-                    subject_type=video.get("subject_type"),
-                    thumbnail_url=video.get("thumbnail_url"),
-                    annotation=video.get("annotation"),
-                    extra_metadata=video.get("extra_metadata"),
-                )
+                embedding = np.asarray(video["embedding"], dtype=np.float32).reshape(-1)
+                self._check_dimension(embedding.shape[0])
+                embeddings[row] = embedding
             elif "frame_embeddings" in video:
-                idx = self.index_video_from_frames(
-                    video_id=video_id,
-                    video_path=video_path,
-                    frame_embeddings=video["frame_embeddings"],
-                    motion_type=video.get("motion_type"),
-                    subject_type=video.get("subject_type"),
-                    thumbnail_url=video.get("thumbnail_url"),
-                    annotation=video.get("annotation"),
-                    aggregation=aggregation,
-                    extra_metadata=video.get("extra_metadata"),
-                )
+                frame_embeddings = video["frame_embeddings"]
+                if len(frame_embeddings) == 0:
+                    raise ValueError("No frame embeddings provided")
+                self._check_dimension(len(frame_embeddings[0]))
+                _aggregate_into(frame_embeddings, aggregation, embeddings[row])
             else:
                 raise ValueError(f"Video {video_id} must have 'embedding' or 'frame_embeddings'")
             
-            indices.append(idx)
+            video_ids.append(video_id)
+            metadata_list.append(VideoMetadata(
+                video_id=video_id,
+                video_path=video["video_path"],
+                motion_type=video.get("motion_type"),
+                subject_type=video.get("subject_type"),
+                thumbnail_url=video.get("thumbnail_url"),
+                annotation=video.get("annotation"),
+                extra=video.get("extra_metadata") or {},
+            ))
+        
+        # Normalize the matrix we own in place (after aggregation) rather
+        # than having the vector DB copy it
+        normalize_embeddings(embeddings, copy=False)
+        indices = self._vector_db.add_batch(
+            video_ids, embeddings, metadata_list, normalized=True
+        )
         
         logger.info(f"Indexed {len(indices)} videos")
         return indices
     
+    def _check_dimension(self, dimension: int) -> None:
+        """Raise VectorDBError if an embedding does not match the index dimension."""
+        if dimension != self.config.dimension:
+            raise VectorDBError(
+                f"Embedding dimension mismatch: expected {self.config.dimension}, "
+                f"got {dimension}"
+            )
+    
     def remove_video(self, video_id: str) -> bool:
         """
         Remove a video from the index.
@@ -14,6 +14,7 @@ from configs.settings import settings
 from src.api.routes import router
 from src.api.realtime_routes import router as realtime_router, router_v1 as realtime_router_v1
 from src.api.auth import rate_limiter
+from src.realtime.advice_backplane import get_advice_backplane
 
 
 # Configure logging
@@ -24,12 +25,18 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# Constant for the process lifetime, so format it once
+_RATE_LIMIT_HEADER = str(settings.security.rate_limit_per_minute)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan handler."""
     logger.info("Starting Video Shooting Assistant API")
+    backplane = get_advice_backplane()
+    await backplane.start()
     yield
+    await backplane.stop()
     logger.info("Shutting down Video Shooting Assistant API")
 
 
@@ -62,7 +69,10 @@ async def add_rate_limit_headers(request: Request, call_next):
     response = await call_next(request)
     
     # Add rate limit info headers
-    response.headers["X-RateLimit-Limit"] = str(settings.security.rate_limit_per_minute)
+    response.headers["X-RateLimit-Limit"] = _RATE_LIMIT_HEADER
+    remaining = getattr(request.state, "rate_limit_remaining", None)
+    if remaining is not None:
+        response.headers["X-RateLimit-Remaining"] = str(remaining)
     
     return response
 
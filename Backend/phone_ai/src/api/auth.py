@@ -7,27 +7,44 @@ Requirements covered:
 - 10.4: Implement rate limiting (100 req/min/user)
 - 10.5: Implement JWT-based authentication
 """
+import itertools
+import logging
+import math
+import threading
 import time
-from collections import defaultdict
+import uuid
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional
 
+import bcrypt
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from pydantic import BaseModel
 
+try:
+    import redis
+    import redis.asyncio as aioredis
+except ImportError:
+    redis = None
+    aioredis = None
+
 from configs.settings import settings
 
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+logger = logging.getLogger(__name__)
+
+# Password hashing (bcrypt only hashes the first 72 bytes of a password)
+BCRYPT_ROUNDS = settings.security.bcrypt_rounds
+BCRYPT_MAX_PASSWORD_BYTES = 72
 
 # JWT settings
 SECRET_KEY = settings.security.secret_key
 ALGORITHM = settings.security.algorithm
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.security.access_token_expire_minutes
+TOKEN_CACHE_SIZE = 4096  # Verified tokens remembered by verify_token
 
 # Rate limiting settings
 RATE_LIMIT_PER_MINUTE = settings.security.rate_limit_per_minute
@@ -52,9 +69,14 @@ class TokenData(BaseModel):
     user_id: Optional[str] = None
     username: Optional[str] = None
     exp: Optional[datetime] = None
+    jti: Optional[str] = None
 
 
-class User(BaseModel):
+# A plain dataclass: it is built from an already verified token on every
+# request, so pydantic validation buys nothing there. FastAPI still
+# serializes it as a response model.
+@dataclass(slots=True, frozen=True)
+class User:
     """User model."""
     user_id: str
     username: str
@@ -88,66 +110,156 @@ def create_access_token(
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     
     to_encode.update({"exp": expire})
+    # Unique token id so a token can be revoked before it expires
+    to_encode.setdefault("jti", uuid.uuid4().hex)
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     
     return encoded_jwt
 
 
-def verify_token(token: str) -> TokenData:
+def _unauthorized(detail: str) -> HTTPException:
+    """Build the 401 response raised for rejected tokens."""
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+@lru_cache(maxsize=TOKEN_CACHE_SIZE)
+def _decode_token(token: str) -> tuple[TokenData, Optional[float]]:
     """
-    Verify and decode a JWT token.
+    Verify a token's signature and decode its payload.
+    
+    Successful results are cached per token string, so the signature check
+    runs once per token instead of once per request. Failures raise and are
+    not cached. Expiry and revocation are checked by verify_token on every
+    call, since a cached entry can outlive both.
     
     Args:
         token: JWT token string
         
     Returns:
-        TokenData with decoded payload
+        Tuple of (TokenData, expiry as a Unix timestamp or None)
         
     Raises:
         HTTPException: If token is invalid or expired
     """
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
-        username: str = payload.get("username")
-        exp: datetime = datetime.fromtimestamp(payload.get("exp", 0))
+    except JWTError as e:
+        raise _unauthorized(f"Invalid token: {str(e)}")
+    
+    user_id: str = payload.get("sub")
+    username: str = payload.get("username")
+    exp: datetime = datetime.fromtimestamp(payload.get("exp", 0))
+    
+    if user_id is None:
+        raise _unauthorized("Invalid token: missing user_id")
+    
+    token_data = TokenData(
+        user_id=user_id, username=username, exp=exp, jti=payload.get("jti")
+    )
+    return token_data, payload.get("exp")
+
+
+# Revoked token ids mapped to their expiry (None = never expires). This
+# denylist is per process: see revoke_token
+_revoked_tokens: dict[str, Optional[float]] = {}
+
+
+def verify_token(token: str) -> TokenData:
+    """
+    Verify and decode a JWT token.
+    
+    Args:
+        token: JWT token string
         
-        if user_id is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token: missing user_id",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+    Returns:
+        TokenData with decoded payload
+        
+    Raises:
+        HTTPException: If token is invalid, expired or revoked
+    """
+    token_data, expires_at = _decode_token(token)
+    
+    if expires_at is not None and expires_at <= time.time():
+        raise _unauthorized("Invalid token: Signature has expired.")
+    
+    if token_data.jti is not None and token_data.jti in _revoked_tokens:
+        raise _unauthorized("Invalid token: Token has been revoked.")
+    
+    return token_data
+
+
+def revoke_token(token: str) -> bool:
+    """
+    Revoke a token (e.g. on logout) before it expires.
+    
+    The denylist lives in this process's memory only. With several API
+    workers, a token revoked on one worker is still accepted by the others
+    until it expires, and a restart forgets all revocations. Deployments
+    that rely on logout must run a single worker or keep short token
+    lifetimes.
+    
+    Args:
+        token: JWT token string
         
-        return TokenData(user_id=user_id, username=username, exp=exp)
+    Returns:
+        True if revoked, False if the token carries no id (issued before
+        token ids were added) and can only expire
         
-    except JWTError as e:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail=f"Invalid token: {str(e)}",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    Raises:
+        HTTPException: If token is invalid or expired
+    """
+    token_data = verify_token(token)
+    if token_data.jti is None:
+        return False
+    
+    # Expired ids can't be presented anymore, drop them from the denylist
+    now = time.time()
+    for jti, expires_at in list(_revoked_tokens.items()):
+        if expires_at is not None and expires_at <= now:
+            del _revoked_tokens[jti]
+    
+    _revoked_tokens[token_data.jti] = _decode_token(token)[1]
+    return True
 
 
 def hash_password(password: str) -> str:
     """Hash a password."""
-    return pwd_context.hash(password)
+    secret = password.encode("utf-8")[:BCRYPT_MAX_PASSWORD_BYTES]
+    return bcrypt.hashpw(secret, bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode("ascii")
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    secret = plain_password.encode("utf-8")[:BCRYPT_MAX_PASSWORD_BYTES]
+    return bcrypt.checkpw(secret, hashed_password.encode("ascii"))
 
 
 # =========================================================================
 # Rate Limiting
 # =========================================================================
 
+_LOCK_STRIPES = 64
+# Sweep idle keys after this many rate-limit checks
+_SWEEP_INTERVAL = 1000
+
+
 class RateLimiter:
     """
     In-memory rate limiter.
     
-    Implements a sliding window rate limiting algorithm.
+    Implements a sliding window counter: each key keeps the request count of
+    the current and the previous fixed window, and the previous count is
+    weighted by how much of it still overlaps the sliding window. Memory and
+    work per request are constant regardless of the limit.
+    
+    Each key's state is one immutable tuple, updated under one of a fixed set
+    of striped locks chosen by the key's hash, so concurrent requests (sync
+    endpoints run on a threadpool) count correctly without serializing all
+    rate-limit checks behind a single global lock.
     For production, consider using Redis-based rate limiting.
     
     Requirement 10.4: Rate limiting of 100 requests per minute per user.
@@ -162,14 +274,52 @@ class RateLimiter:
         """
         self.requests_per_minute = requests_per_minute
         self.window_size = 60  # 1 minute in seconds
-        self._requests: dict[str, list[float]] = defaultdict(list)
+        # key -> (window index, count in that window, count in the window before)
+        self._windows: dict[str, tuple[int, int, int]] = {}
+        self._locks = tuple(threading.Lock() for _ in range(_LOCK_STRIPES))
+        self._calls = itertools.count(1)
+    
+    def _lock_for(self, key: str) -> threading.Lock:
+        """Get the striped lock guarding updates for key."""
+        return self._locks[hash(key) & (_LOCK_STRIPES - 1)]
+    
+    def sweep(self) -> int:
+        """
+        Drop keys with no requests in the current or previous window.
+        
+        Such keys no longer affect any estimate, so removing them bounds
+        memory to the keys seen in the last two windows, even under scan
+        traffic from many distinct IPs.
+        
+        Returns:
+            Number of keys removed
+        """
+        stale_before = int(time.time() // self.window_size) - 1
+        removed = 0
+        for key, (window, _, _) in list(self._windows.items()):
+            if window >= stale_before:
+                continue
+            with self._lock_for(key):
+                state = self._windows.get(key)
+                if state is not None and state[0] < stale_before:
+                    del self._windows[key]
+                    removed += 1
+        return removed
+    
+    def _current_counts(self, key: str, current_time: float) -> tuple[int, int, int]:
+        """Get (window, current count, previous count) rolled forward to current_time."""
+        window = int(current_time // self.window_size)
+        start, current, previous = self._windows.get(key, (window, 0, 0))
+        if start != window:
+            # Roll over; anything older than the previous window no longer counts
+            previous = current if start == window - 1 else 0
+            current = 0
+        return window, current, previous
     
-    def _clean_old_requests(self, key: str, current_time: float) -> None:
-        """Remove requests outside the current window."""
-        cutoff = current_time - self.window_size
-        self._requests[key] = [
-            t for t in self._requests[key] if t > cutoff
-        ]
+    def _estimate(self, current: int, previous: int, current_time: float) -> float:
+        """Estimate requests in the sliding window ending at current_time."""
+        elapsed = (current_time % self.window_size) / self.window_size
+        return previous * (1.0 - elapsed) + current
     
     def is_allowed(self, key: str) -> tuple[bool, int]:
         """
@@ -181,17 +331,21 @@ class RateLimiter:
         Returns:
             Tuple of (is_allowed, remaining_requests)
         """
-        current_time = time.time()
-        self._clean_old_requests(key, current_time)
-        
-        request_count = len(self._requests[key])
-        remaining = max(0, self.requests_per_minute - request_count)
+        if next(self._calls) % _SWEEP_INTERVAL == 0:
+            self.sweep()
         
-        if request_count >= self.requests_per_minute:
-            return False, 0
-        
-        self._requests[key].append(current_time)
-        return True, remaining - 1
+        with self._lock_for(key):
+            current_time = time.time()
+            window, current, previous = self._current_counts(key, current_time)
+            estimated = self._estimate(current, previous, current_time)
+            
+            if estimated >= self.requests_per_minute:
+                self._windows[key] = (window, current, previous)
+                return False, 0
+            
+            self._windows[key] = (window, current + 1, previous)
+        remaining = int(self.requests_per_minute - estimated) - 1
+        return True, max(0, remaining)
     
     def get_retry_after(self, key: str) -> int:
         """
@@ -201,25 +355,171 @@ class RateLimiter:
             key: Identifier for rate limiting
             
         Returns:
-            Seconds until oldest request expires
+            Seconds until the next request would be allowed
         """
-        if not self._requests[key]:
+        if key not in self._windows:
+            return 0
+        
+        current_time = time.time()
+        window, current, previous = self._current_counts(key, current_time)
+        return self._retry_after(window, current, previous, current_time)
+    
+    def _retry_after(
+        self,
+        window: int,
+        current: int,
+        previous: int,
+        current_time: float,
+    ) -> int:
+        """Seconds until the estimate for these counts drops below the limit."""
+        limit = self.requests_per_minute
+        if self._estimate(current, previous, current_time) < limit:
             return 0
         
-        oldest_request = min(self._requests[key])
-        retry_after = int(oldest_request + self.window_size - time.time())
-        return max(0, retry_after)
+        # The estimate falls below the limit once enough of the weighted
+        # window has slid out, in this window or (if the current count alone
+        # is at the limit) in the next one
+        if current < limit:
+            start, weighted, budget = window, previous, limit - current
+        else:
+            start, weighted, budget = window + 1, current, limit
+        allowed_after = (start + 1 - budget / weighted) * self.window_size
+        return max(0, math.floor(allowed_after - current_time) + 1)
+    
+    async def check(self, key: str) -> tuple[bool, int, int]:
+        """
+        Count a request and decide whether it is allowed.
+        
+        Args:
+            key: Identifier for rate limiting
+            
+        Returns:
+            Tuple of (is_allowed, remaining_requests, retry_after_seconds)
+        """
+        is_allowed, remaining = self.is_allowed(key)
+        retry_after = 0 if is_allowed else self.get_retry_after(key)
+        return is_allowed, remaining, retry_after
+
+
+class RedisRateLimiter(RateLimiter):
+    """
+    Redis-backed rate limiter shared by all API workers.
+    
+    Uses the same sliding window counter as RateLimiter, with each fixed
+    window's count kept in a Redis key that one pipelined INCR/EXPIRE/GET
+    round trip updates and reads. Falls back to the in-process counters when
+    Redis is unreachable.
+    """
+    
+    def __init__(
+        self,
+        url: str,
+        requests_per_minute: int = RATE_LIMIT_PER_MINUTE,
+        prefix: str = "rl",
+    ):
+        """
+        Initialize rate limiter.
+        
+        Args:
+            url: Redis URL
+            requests_per_minute: Maximum requests allowed per minute
+            prefix: Prefix for the Redis counter keys
+        """
+        super().__init__(requests_per_minute)
+        self.url = url
+        self.prefix = prefix
+        self._client = None
+    
+    def _get_client(self):
+        """Lazily create the async Redis client (connections are pooled)."""
+        if self._client is None:
+            self._client = aioredis.from_url(
+                self.url,
+                socket_connect_timeout=0.5,
+                socket_timeout=0.5,
+            )
+        return self._client
+    
+    async def check(self, key: str) -> tuple[bool, int, int]:
+        """
+        Count a request in Redis and decide whether it is allowed.
+        
+        Args:
+            key: Identifier for rate limiting
+            
+        Returns:
+            Tuple of (is_allowed, remaining_requests, retry_after_seconds)
+        """
+        current_time = time.time()
+        window = int(current_time // self.window_size)
+        current_key = f"{self.prefix}:{key}:{window}"
+        previous_key = f"{self.prefix}:{key}:{window - 1}"
+        
+        try:
+            client = self._get_client()
+            async with client.pipeline(transaction=True) as pipe:
+                pipe.incr(current_key)
+                # Kept for one more window, where it is the previous count
+                pipe.expire(current_key, 2 * self.window_size)
+                pipe.get(previous_key)
+                count, _, previous = await pipe.execute()
+            
+            # count includes this request
+            current, previous = count - 1, int(previous or 0)
+            estimated = self._estimate(current, previous, current_time)
+            if estimated >= self.requests_per_minute:
+                # Rejected requests don't count against the limit
+                await client.decr(current_key)
+                return False, 0, self._retry_after(window, current, previous, current_time)
+        except redis.RedisError as e:
+            logger.warning(f"Redis rate limiting failed, using local counters: {e}")
+            return await super().check(key)
+        
+        remaining = int(self.requests_per_minute - estimated) - 1
+        return True, max(0, remaining), 0
 
 
-# Global rate limiter instance
-rate_limiter = RateLimiter()
+# Global rate limiter instance (shared through Redis when configured)
+if settings.security.rate_limit_backend == "redis" and aioredis is not None:
+    rate_limiter = RedisRateLimiter(settings.redis.url)
+else:
+    rate_limiter = RateLimiter()
 
 
 # =========================================================================
 # Dependencies
 # =========================================================================
 
+def _authenticate(request: Request, token: str) -> User:
+    """
+    Resolve the user for a bearer token once per request.
+    
+    The user is stored on request.state, so when a route depends on both
+    get_current_user (e.g. via rate_limit_check) and require_auth, the
+    token is only verified once.
+    
+    Args:
+        request: FastAPI request object
+        token: JWT token string
+        
+    Returns:
+        Authenticated User object
+    """
+    user = getattr(request.state, "user", None)
+    if user is not None:
+        return user
+    
+    token_data = verify_token(token)
+    user = User(
+        user_id=token_data.user_id,
+        username=token_data.username or "unknown",
+    )
+    request.state.user = user
+    return user
+
+
 async def get_current_user(
+    request: Request,
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
 ) -> Optional[User]:
     """
@@ -228,6 +528,7 @@ async def get_current_user(
     This dependency is optional - returns None if no token provided.
     
     Args:
+        request: FastAPI request object
         credentials: HTTP Bearer credentials
         
     Returns:
@@ -236,15 +537,11 @@ async def get_current_user(
     if credentials is None:
         return None
     
-    token_data = verify_token(credentials.credentials)
-    
-    return User(
-        user_id=token_data.user_id,
-        username=token_data.username or "unknown",
-    )
+    return _authenticate(request, credentials.credentials)
 
 
 async def require_auth(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(HTTPBearer()),
 ) -> User:
     """
@@ -253,6 +550,7 @@ async def require_auth(
     Requirement 10.5: JWT-based authentication for all API endpoints.
     
     Args:
+        request: FastAPI request object
         credentials: HTTP Bearer credentials (required)
         
     Returns:
@@ -261,12 +559,7 @@ async def require_auth(
     Raises:
         HTTPException: If not authenticated
     """
-    token_data = verify_token(credentials.credentials)
-    
-    return User(
-        user_id=token_data.user_id,
-        username=token_data.username or "unknown",
-    )
+    return _authenticate(request, credentials.credentials)
 
 
 async def rate_limit_check(
@@ -298,10 +591,11 @@ async def rate_limit_check(
         else:
             key = f"ip:{request.client.host if request.client else 'unknown'}"
     
-    is_allowed, remaining = rate_limiter.is_allowed(key)
+    is_allowed, remaining, retry_after = await rate_limiter.check(key)
+    # Reported by the rate limit header middleware
+    request.state.rate_limit_remaining = remaining
     
     if not is_allowed:
-        retry_after = rate_limiter.get_retry_after(key)
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail={
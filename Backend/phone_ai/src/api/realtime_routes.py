@@ -11,15 +11,17 @@ Requirements covered:
 - 9.5: Heartbeat mechanism
 """
 import logging
-import uuid
+import secrets
 from typing import Optional, List
 
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, HTTPException, status, Request
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, HTTPException, status, Request, Response
 from pydantic import BaseModel
 
+from src.realtime.advice_backplane import get_advice_backplane
+from src.realtime.types import AdvicePayload, AdvicePriority, AdviceCategory
 from src.realtime.websocket_handler import (
     get_session_manager,
-    create_websocket_handler,
+    get_websocket_handler,
     RealtimeWebSocketHandler,
     SessionManager,
 )
@@ -87,7 +89,7 @@ async def create_shooting_session():
     
     Returns a session ID and WebSocket URL for clients to connect.
     """
-    session_id = str(uuid.uuid4())[:8].upper()
+    session_id = secrets.token_hex(4).upper()
     
     session_manager = get_session_manager()
     session_manager.create_session(session_id)
@@ -104,7 +106,7 @@ async def create_shooting_session():
 # v1 兼容端点
 async def create_shooting_session_v1():
     """v1 兼容的创建会话端点"""
-    session_id = str(uuid.uuid4())[:8].upper()
+    session_id = secrets.token_hex(4).upper()
     
     session_manager = get_session_manager()
     session_manager.create_session(session_id)
@@ -146,14 +148,17 @@ async def get_session_info(session_id: str):
     
     clients = session_manager.get_clients(session_id)
     
-    return SessionInfoResponse(
+    # Built from in-process session state, so skip validation; a Response is
+    # sent as-is, whereas response_model would validate a model again
+    body = SessionInfoResponse.model_construct(
         session_id=session.session_id,
         created_at=session.created_at,
         motion_state=session.motion_state.value,
         total_analyses=session.total_analyses,
         avg_latency_ms=session.avg_latency_ms,
         active_clients=len(clients)
-    )
+    ).model_dump_json()
+    return Response(content=body, media_type="application/json")
 
 
 @router.delete(
@@ -194,7 +199,9 @@ async def push_advice(session_id: str, advice: AdvicePushRequest):
     Requirement 9.2: Push advice immediately.
     
     This endpoint is used by external systems to push advice
-    to connected mobile clients.
+    to connected mobile clients. With the Redis backplane enabled the
+    advice reaches clients on every worker, and clients_notified is the
+    total client count the workers last reported for the session.
     
     Args:
         session_id: Session identifier
@@ -205,8 +212,10 @@ async def push_advice(session_id: str, advice: AdvicePushRequest):
     """
     session_manager = get_session_manager()
     session = session_manager.get_session(session_id)
+    backplane = get_advice_backplane()
     
-    if session is None:
+    # Behind the backplane the session may live on another worker
+    if session is None and not backplane.enabled:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail={
@@ -215,11 +224,7 @@ async def push_advice(session_id: str, advice: AdvicePushRequest):
             }
         )
     
-    clients = session_manager.get_clients(session_id)
-    
     # Create advice payload
-    from src.realtime.types import AdvicePayload, AdvicePriority, AdviceCategory
-    
     try:
         priority = AdvicePriority(advice.priority)
         category = AdviceCategory(advice.category)
@@ -241,13 +246,20 @@ async def push_advice(session_id: str, advice: AdvicePushRequest):
     )
     
     # Broadcast to all clients
-    handler = create_websocket_handler()
-    import asyncio
-    await handler._broadcast_advice(session_id, [advice_payload])
+    clients_notified = await backplane.publish(session_id, [advice_payload])
+    if clients_notified is None:
+        # No worker reports the session
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={
+                "error_code": "SESSION_NOT_FOUND",
+                "message": f"Session {session_id} not found"
+            }
+        )
     
     return AdvicePushResponse(
         success=True,
-        clients_notified=len(clients)
+        clients_notified=clients_notified
     )
 
 
@@ -349,12 +361,12 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
         websocket: FastAPI WebSocket connection
         session_id: Session identifier
     """
-    handler = create_websocket_handler()
+    handler = get_websocket_handler()
     await handler.handle_connection(websocket, session_id)
 
 # v1 兼容 WebSocket
 @router_v1.websocket("/session/{session_id}/ws")
 async def websocket_endpoint_v1(websocket: WebSocket, session_id: str):
     """v1 兼容 WebSocket 端点"""
-    handler = create_websocket_handler()
+    handler = get_websocket_handler()
     await handler.handle_connection(websocket, session_id)
@@ -14,13 +14,14 @@ Requirements covered:
 - 10.5: JWT-based authentication
 """
 import csv
-import io
 import logging
 import os
+import time
 import uuid
 from datetime import datetime
 from typing import Any, Optional
 
+import aiofiles
 from fastapi import (
     APIRouter,
     Depends,
@@ -31,13 +32,32 @@ from fastapi import (
     UploadFile,
     status,
 )
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from pydantic import BaseModel, Field
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from configs.settings import settings
-from src.models.database import AnalysisTask, UserFeedback, get_engine, get_session_factory
+from src.models.database import (
+    AnalysisTask,
+    UserFeedback,
+    get_async_engine,
+    get_async_session_factory,
+)
 from src.models.enums import FeedbackAction, TaskStatus
+from src.services.result_cache import (
+    ResultCache,
+    analysis_cache_key,
+    get_result_cache,
+    suggestions_cache_key,
+)
 from src.tasks.analysis_tasks import (
     run_video_analysis,
     get_task_status,
@@ -52,28 +72,82 @@ from src.api.auth import (
     require_auth,
     rate_limit_check,
     generate_token_for_user,
+    revoke_token,
 )
 
 
 logger = logging.getLogger(__name__)
 
+# Uploads are streamed to disk in chunks of this size
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Upload size limit, compared as integer bytes
+_MAX_UPLOAD_BYTES = settings.storage.max_file_size_mb * 1024 * 1024
+
+# Suggestion confidence bands: (action, message) above 0.75, from 0.55, below
+_PROCEED_CONFIDENCE = 0.75
+_WARN_CONFIDENCE = 0.55
+_CONFIDENCE_PROCEED = ("proceed", None)
+_CONFIDENCE_WARN = ("warn", "请尝试并拍摄两条版本")
+_CONFIDENCE_MANUAL = ("manual", "置信度较低，建议人工确认后再执行")
+
+# Task status polls within this window share one result backend lookup
+TASK_STATUS_CACHE_TTL_S = 0.5
+TASK_STATUS_CACHE_SIZE = 10_000
+
 # Create router
 router = APIRouter(prefix="/api", tags=["Video Analysis"])
 
 
+class _RawJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered with orjson when it is installed.
+    
+    Only for endpoints returning raw dicts: routes with a response_model keep
+    the default response class, which FastAPI serializes through pydantic.
+    """
+    
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
 # =========================================================================
 # Database Session Dependency
 # =========================================================================
 
-def get_db():
-    """Get database session."""
-    engine = get_engine(settings.database.url)
-    SessionLocal = get_session_factory(engine)
-    db = SessionLocal()
-    try:
+async def get_db():
+    """Get an async database session (queries don't block the event loop)."""
+    engine = get_async_engine(settings.database.async_url)
+    SessionLocal = get_async_session_factory(engine)
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+
+async def _get_task_by_video_id(
+    db: AsyncSession,
+    video_id: str,
+    *columns: Any,
+) -> Optional[AnalysisTask]:
+    """
+    Get the analysis task for a video, if any.
+    
+    Args:
+        db: Database session
+        video_id: Video identifier
+        *columns: AnalysisTask columns to load; all columns when omitted.
+            Skipping the pipeline JSONB blobs keeps polling queries small.
+            Other attributes must not be accessed on the returned task.
+        
+    Returns:
+        The task, or None if the video is unknown
+    """
+    stmt = select(AnalysisTask).where(AnalysisTask.video_id == video_id).limit(1)
+    if columns:
+        stmt = stmt.options(load_only(*columns))
+    result = await db.execute(stmt)
+    return result.scalars().first()
 
 
 # =========================================================================
@@ -162,7 +236,7 @@ class ErrorResponse(BaseModel):
 )
 async def upload_video(
     file: UploadFile = File(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user: Optional[User] = Depends(get_current_user),
 ):
     """
@@ -186,13 +260,13 @@ async def upload_video(
             }
         )
     
-    extension = file.filename.split(".")[-1].lower()
+    extension = os.path.splitext(file.filename)[1].lstrip(".").lower()
     if extension not in settings.storage.allowed_formats:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail={
                 "error_code": "INVALID_VIDEO_FORMAT",
-                "message": f"Unsupported format: {extension}. Supported: {settings.storage.allowed_formats}",
+                "message": f"Unsupported format: {extension}. Supported: {sorted(settings.storage.allowed_formats)}",
             }
         )
     
@@ -205,28 +279,30 @@ async def upload_video(
     
     file_path = os.path.join(upload_dir, f"{video_id}.{extension}")
     
+    if file.size is not None and file.size > _MAX_UPLOAD_BYTES:
+        raise _file_too_large(file.size)
+    
+    # Written under a temporary name and renamed once complete, so the
+    # analysis worker never sees a half-written video
+    part_path = file_path + ".part"
+    
     try:
-        # Read and save file
-        content = await file.read()
-        
-        # Check file size
-        file_size_mb = len(content) / (1024 * 1024)
-        if file_size_mb > settings.storage.max_file_size_mb:
-            raise HTTPException(
-                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                detail={
-                    "error_code": "FILE_TOO_LARGE",
-                    "message": f"File size {file_size_mb:.1f}MB exceeds limit of {settings.storage.max_file_size_mb}MB",
-                }
-            )
-        
-        with open(file_path, "wb") as f:
-            f.write(content)
+        # Stream to disk so memory use doesn't grow with the file size
+        size = 0
+        async with aiofiles.open(part_path, "wb") as f:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > _MAX_UPLOAD_BYTES:
+                    raise _file_too_large(size)
+                await f.write(chunk)
+        os.replace(part_path, file_path)
         
     except HTTPException:
+        _remove_partial_upload(part_path)
         raise
     except Exception as e:
         logger.error(f"Failed to save uploaded file: {e}")
+        _remove_partial_upload(part_path)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail={
@@ -241,7 +317,7 @@ async def upload_video(
         status=TaskStatus.PENDING.value,
     )
     db.add(task_record)
-    db.commit()
+    await db.commit()
     
     # Queue analysis task
     celery_task = run_video_analysis.delay(file_path, video_id)
@@ -259,6 +335,35 @@ async def upload_video(
     )
 
 
+def _confidence_action(confidence: float) -> tuple[str, Optional[str]]:
+    """Map an analysis confidence to its (action, message) band."""
+    if confidence > _PROCEED_CONFIDENCE:
+        return _CONFIDENCE_PROCEED
+    if confidence >= _WARN_CONFIDENCE:
+        return _CONFIDENCE_WARN
+    return _CONFIDENCE_MANUAL
+
+
+def _file_too_large(size: int) -> HTTPException:
+    """Build the 413 error for an upload of at least size bytes."""
+    file_size_mb = size / (1024 * 1024)
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail={
+            "error_code": "FILE_TOO_LARGE",
+            "message": f"File size {file_size_mb:.1f}MB exceeds limit of {settings.storage.max_file_size_mb}MB",
+        }
+    )
+
+
+def _remove_partial_upload(file_path: str) -> None:
+    """Delete a partially written upload, if any."""
+    try:
+        os.remove(file_path)
+    except FileNotFoundError:
+        pass
+
+
 @router.get(
     "/analysis/{video_id}",
     response_model=AnalysisResponse,
@@ -270,7 +375,8 @@ async def upload_video(
 )
 async def get_analysis(
     video_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
+    cache: ResultCache = Depends(get_result_cache),
     user: Optional[User] = Depends(get_current_user),
 ):
     """
@@ -279,11 +385,15 @@ async def get_analysis(
     Requirement 9.2: GET /api/analysis/{video_id} endpoint.
     
     Returns the full analysis results including all intermediate outputs
-    from each pipeline stage.
+    from each pipeline stage. Completed results are served from the
+    result cache.
     """
-    task = db.query(AnalysisTask).filter(
-        AnalysisTask.video_id == video_id
-    ).first()
+    cache_key = analysis_cache_key(video_id)
+    cached = await cache.get(cache_key)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+    
+    task = await _get_task_by_video_id(db, video_id)
     
     if not task:
         raise HTTPException(
@@ -294,7 +404,8 @@ async def get_analysis(
             }
         )
     
-    return AnalysisResponse(
+    # Built from our own DB row, so skip validation
+    body = AnalysisResponse.model_construct(
         video_id=task.video_id,
         status=task.status,
         created_at=task.created_at,
@@ -305,7 +416,14 @@ async def get_analysis(
         heuristic_output=task.heuristic_output,
         metadata_output=task.metadata_output,
         instruction_card=task.instruction_card,
-    )
+    ).model_dump_json().encode()
+    
+    # Completed analyses no longer change, so later polls can skip the DB
+    if task.status == TaskStatus.COMPLETED.value:
+        await cache.set(cache_key, body)
+    
+    # A Response is sent as-is; response_model would validate a model again
+    return Response(content=body, media_type="application/json")
 
 
 @router.get(
@@ -320,7 +438,8 @@ async def get_analysis(
 )
 async def get_suggestions(
     video_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
+    cache: ResultCache = Depends(get_result_cache),
     user: Optional[User] = Depends(get_current_user),
 ):
     """
@@ -329,10 +448,20 @@ async def get_suggestions(
     Requirement 9.3: GET /api/suggestions/{video_id} endpoint.
     
     Returns the three-layer instruction card with confidence information.
+    Completed results are served from the result cache.
     """
-    task = db.query(AnalysisTask).filter(
-        AnalysisTask.video_id == video_id
-    ).first()
+    cache_key = suggestions_cache_key(video_id)
+    cached = await cache.get(cache_key)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+    
+    task = await _get_task_by_video_id(
+        db,
+        video_id,
+        AnalysisTask.status,
+        AnalysisTask.metadata_output,
+        AnalysisTask.instruction_card,
+    )
     
     if not task:
         raise HTTPException(
@@ -345,7 +474,7 @@ async def get_suggestions(
     
     # Check if analysis is complete
     if task.status != TaskStatus.COMPLETED.value:
-        return JSONResponse(
+        return _RawJSONResponse(
             status_code=status.HTTP_202_ACCEPTED,
             content={
                 "video_id": video_id,
@@ -365,24 +494,21 @@ async def get_suggestions(
     if task.metadata_output:
         confidence = task.metadata_output.get("confidence")
         if confidence is not None:
-            if confidence > 0.75:
-                confidence_action = "proceed"
-                confidence_message = None
-            elif confidence >= 0.55:
-                confidence_action = "warn"
-                confidence_message = "请尝试并拍摄两条版本"
-            else:
-                confidence_action = "manual"
-                confidence_message = "置信度较低，建议人工确认后再执行"
-    
-    return SuggestionsResponse(
+            confidence_action, confidence_message = _confidence_action(confidence)
+    
+    # Built from our own DB row, so skip validation
+    body = SuggestionsResponse.model_construct(
         video_id=video_id,
         status=task.status,
         confidence=confidence,
         confidence_action=confidence_action,
         confidence_message=confidence_message,
         instruction_card=task.instruction_card,
-    )
+    ).model_dump_json().encode()
+    await cache.set(cache_key, body)
+    
+    # A Response is sent as-is; response_model would validate a model again
+    return Response(content=body, media_type="application/json")
 
 
 @router.post(
@@ -398,7 +524,7 @@ async def get_suggestions(
 )
 async def submit_feedback(
     feedback: FeedbackRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user: Optional[User] = Depends(get_current_user),
 ):
     """
@@ -417,14 +543,12 @@ async def submit_feedback(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail={
                 "error_code": "INVALID_ACTION",
-                "message": f"Invalid action: {feedback.action}. Must be one of: {FeedbackAction.values()}",
+                "message": f"Invalid action: {feedback.action}. Must be one of: {list(FeedbackAction.values())}",
             }
         )
     
     # Find the analysis task
-    task = db.query(AnalysisTask).filter(
-        AnalysisTask.video_id == feedback.video_id
-    ).first()
+    task = await _get_task_by_video_id(db, feedback.video_id, AnalysisTask.id)
     
     if not task:
         raise HTTPException(
@@ -444,8 +568,8 @@ async def submit_feedback(
         comment=feedback.comment,
     )
     db.add(feedback_record)
-    db.commit()
-    db.refresh(feedback_record)
+    await db.commit()
+    await db.refresh(feedback_record)
     
     return FeedbackResponse(
         feedback_id=str(feedback_record.id),
@@ -465,7 +589,7 @@ async def submit_feedback(
 async def export_shot_list(
     video_id: str,
     format: str = Query("json", description="Export format: json or csv"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user: Optional[User] = Depends(get_current_user),
 ):
     """
@@ -476,9 +600,15 @@ async def export_shot_list(
     Exports the analysis results and instruction cards in a format
     suitable for use in production workflows.
     """
-    task = db.query(AnalysisTask).filter(
-        AnalysisTask.video_id == video_id
-    ).first()
+    task = await _get_task_by_video_id(
+        db,
+        video_id,
+        AnalysisTask.status,
+        AnalysisTask.created_at,
+        AnalysisTask.completed_at,
+        AnalysisTask.metadata_output,
+        AnalysisTask.instruction_card,
+    )
     
     if not task:
         raise HTTPException(
@@ -510,13 +640,69 @@ async def export_shot_list(
     if format.lower() == "csv":
         return _export_as_csv(export_data, video_id)
     else:
-        return JSONResponse(content=export_data)
+        return _RawJSONResponse(content=export_data)
+
+
+class _EchoBuffer:
+    """File-like object whose write() returns the text instead of storing it."""
+    
+    def write(self, value: str) -> str:
+        return value
+
+
+_CSV_HEADER = (
+    "video_id",
+    "created_at",
+    "completed_at",
+    "motion_type",
+    "speed_profile",
+    "suggested_scale",
+    "confidence",
+    "primary_instruction_1",
+    "primary_instruction_2",
+    "primary_instruction_3",
+    "primary_instruction_4",
+    "explain",
+)
+
+# Primary instructions are padded to this many CSV columns
+_CSV_PRIMARY_COLUMNS = 4
+
+
+def _csv_row(data: dict) -> tuple:
+    """Extract one CSV row, in _CSV_HEADER order, from export data."""
+    metadata = data.get("metadata") or {}
+    instruction_card = data.get("instruction_card") or {}
+    card_data = instruction_card.get("instruction_card") or {}
+    
+    motion = metadata.get("motion") or {}
+    framing = metadata.get("framing") or {}
+    primary = card_data.get("primary") or []
+    
+    # Pad primary instructions to 4 without touching the source list
+    primary = list(primary[:_CSV_PRIMARY_COLUMNS])
+    primary += [""] * (_CSV_PRIMARY_COLUMNS - len(primary))
+    
+    return (
+        data.get("video_id", ""),
+        data.get("created_at", ""),
+        data.get("completed_at", ""),
+        motion.get("type", ""),
+        (motion.get("params") or {}).get("speed_profile", ""),
+        framing.get("suggested_scale", ""),
+        metadata.get("confidence", ""),
+        *primary,
+        card_data.get("explain", ""),
+    )
 
 
 def _export_as_csv(data: dict, video_id: str) -> StreamingResponse:
     """
     Export data as CSV file.
     
+    Rows are formatted one at a time and streamed to the client, so the
+    full CSV is never buffered in memory.
+    
     Args:
         data: Export data dictionary
         video_id: Video identifier for filename
@@ -524,57 +710,13 @@ def _export_as_csv(data: dict, video_id: str) -> StreamingResponse:
     Returns:
         StreamingResponse with CSV content
     """
-    output = io.StringIO()
-    writer = csv.writer(output)
-    
-    # Write header
-    writer.writerow([
-        "video_id",
-        "created_at",
-        "completed_at",
-        "motion_type",
-        "speed_profile",
-        "suggested_scale",
-        "confidence",
-        "primary_instruction_1",
-        "primary_instruction_2",
-        "primary_instruction_3",
-        "primary_instruction_4",
-        "explain",
-    ])
-    
-    # Extract values
-    metadata = data.get("metadata", {}) or {}
-    instruction_card = data.get("instruction_card", {}) or {}
-    card_data = instruction_card.get("instruction_card", {}) or {}
-    
-    motion = metadata.get("motion", {}) or {}
-    framing = metadata.get("framing", {}) or {}
-    primary = card_data.get("primary", []) or []
-    
-    # Pad primary instructions to 4
-    while len(primary) < 4:
-        primary.append("")
-    
-    writer.writerow([
-        data.get("video_id", ""),
-        data.get("created_at", ""),
-        data.get("completed_at", ""),
-        motion.get("type", ""),
-        motion.get("params", {}).get("speed_profile", ""),
-        framing.get("suggested_scale", ""),
-        metadata.get("confidence", ""),
-        primary[0] if len(primary) > 0 else "",
-        primary[1] if len(primary) > 1 else "",
-        primary[2] if len(primary) > 2 else "",
-        primary[3] if len(primary) > 3 else "",
-        card_data.get("explain", ""),
-    ])
-    
-    output.seek(0)
+    async def rows():
+        writer = csv.writer(_EchoBuffer())
+        yield writer.writerow(_CSV_HEADER)
+        yield writer.writerow(_csv_row(data))
     
     return StreamingResponse(
-        iter([output.getvalue()]),
+        rows(),
         media_type="text/csv",
         headers={
             "Content-Disposition": f"attachment; filename=shot_list_{video_id}.csv"
@@ -582,6 +724,33 @@ def _export_as_csv(data: dict, video_id: str) -> StreamingResponse:
     )
 
 
+# task_id -> (expires_at, status_info)
+_task_status_cache: dict[str, tuple[float, dict[str, Any]]] = {}
+
+
+def _cached_task_status(task_id: str) -> dict[str, Any]:
+    """
+    Get a task's status, reusing a lookup made in the last TASK_STATUS_CACHE_TTL_S.
+    
+    Clients poll every second or so; this collapses bursts of polls for the
+    same task into a single Celery result backend hit.
+    """
+    now = time.monotonic()
+    cached = _task_status_cache.get(task_id)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+    
+    status_info = get_task_status(task_id)
+    
+    if len(_task_status_cache) >= TASK_STATUS_CACHE_SIZE:
+        for key in [k for k, (expires_at, _) in _task_status_cache.items() if expires_at <= now]:
+            del _task_status_cache[key]
+        if len(_task_status_cache) >= TASK_STATUS_CACHE_SIZE:
+            _task_status_cache.clear()
+    _task_status_cache[task_id] = (now + TASK_STATUS_CACHE_TTL_S, status_info)
+    return status_info
+
+
 @router.get(
     "/task/{task_id}",
     response_model=TaskStatusResponse,
@@ -592,7 +761,7 @@ async def get_task_status_endpoint(task_id: str):
     
     Returns progress information for running tasks.
     """
-    status_info = get_task_status(task_id)
+    status_info = _cached_task_status(task_id)
     
     return TaskStatusResponse(
         task_id=status_info["task_id"],
@@ -612,6 +781,7 @@ async def cancel_task_endpoint(task_id: str):
     Cancel a running analysis task.
     """
     cancel_task(task_id)
+    _task_status_cache.pop(task_id, None)
     return None
 
 
@@ -655,6 +825,23 @@ async def login(request: LoginRequest):
     return generate_token_for_user(user_id, request.username)
 
 
+@router.post(
+    "/auth/logout",
+    status_code=status.HTTP_204_NO_CONTENT,
+    tags=["Authentication"],
+)
+async def logout(
+    credentials: HTTPAuthorizationCredentials = Depends(HTTPBearer()),
+):
+    """
+    Revoke the presented access token.
+    
+    Requires valid JWT token. The token is rejected from then on, even
+    though it has not expired yet.
+    """
+    revoke_token(credentials.credentials)
+
+
 @router.get(
     "/auth/me",
     response_model=User,
@@ -36,6 +36,8 @@ from .database import (
     ReferenceVideo,
     get_engine,
     get_session_factory,
+    get_async_engine,
+    get_async_session_factory,
     init_db,
 )
 
@@ -69,5 +71,7 @@ __all__ = [
     "ReferenceVideo",
     "get_engine",
     "get_session_factory",
+    "get_async_engine",
+    "get_async_session_factory",
     "init_db",
 ]
@@ -3,14 +3,30 @@ Core data types and dataclasses for the Video Shooting Assistant.
 
 Defines all input/output schemas for agents and data transfer objects.
 """
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field
+from itertools import chain
+from operator import attrgetter
 from typing import Optional
 import json
 
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from .enums import MotionType, SpeedProfile, SuggestedScale
 
 
-@dataclass
+def _clamp(value: float, upper: float) -> float:
+    """Clamp value to [0, upper] with one range check in the common case."""
+    if 0.0 <= value <= upper:
+        return value
+    return 0.0 if value < 0.0 else upper
+
+
+@dataclass(slots=True)
 class BBox:
     """
     归一化边界框
@@ -54,10 +70,10 @@ class BBox:
         Return a normalized version of the bounding box.
         Clamps all values to valid ranges.
         """
-        x = max(0.0, min(1.0, self.x))
-        y = max(0.0, min(1.0, self.y))
-        w = max(0.0, min(1.0 - x, self.w))
-        h = max(0.0, min(1.0 - y, self.h))
+        x = _clamp(self.x, 1.0)
+        y = _clamp(self.y, 1.0)
+        w = _clamp(self.w, 1.0 - x)
+        h = _clamp(self.h, 1.0 - y)
         return BBox(x=x, y=y, w=w, h=h)
     
     def to_list(self) -> list[float]:
@@ -73,10 +89,43 @@ class BBox:
     
     def to_dict(self) -> dict:
         """Convert to dictionary."""
-        return asdict(self)
+        return {"x": self.x, "y": self.y, "w": self.w, "h": self.h}
 
 
-@dataclass
+_bbox_coords = attrgetter("x", "y", "w", "h")
+
+
+def bboxes_to_array(bboxes: list[BBox]) -> np.ndarray:
+    """
+    Pack bounding boxes into an (N, 4) float64 array of [x, y, w, h] rows.
+    
+    Lets per-frame bbox math run as whole-array numpy operations instead
+    of attribute lookups on each BBox.
+    """
+    return np.fromiter(
+        chain.from_iterable(map(_bbox_coords, bboxes)),
+        dtype=np.float64,
+        count=4 * len(bboxes),
+    ).reshape(-1, 4)
+
+
+def normalize_bbox_array(boxes: np.ndarray) -> np.ndarray:
+    """Vectorized BBox.normalize over the rows of an (N, 4) bbox array."""
+    xy = np.clip(boxes[:, :2], 0.0, 1.0)
+    wh = np.clip(boxes[:, 2:], 0.0, 1.0 - xy)
+    return np.concatenate([xy, wh], axis=1)
+
+
+def bbox_array_valid_mask(boxes: np.ndarray) -> np.ndarray:
+    """Vectorized BBox.is_valid over the rows of an (N, 4) bbox array."""
+    return (
+        ((boxes >= 0) & (boxes <= 1)).all(axis=1) &
+        (boxes[:, 0] + boxes[:, 2] <= 1) &
+        (boxes[:, 1] + boxes[:, 3] <= 1)
+    )
+
+
+@dataclass(slots=True)
 class ExifData:
     """
     EXIF 元数据
@@ -89,10 +138,15 @@ class ExifData:
     
     def to_dict(self) -> dict:
         """Convert to dictionary."""
-        return asdict(self)
+        return {
+            "focal_length_mm": self.focal_length_mm,
+            "aperture": self.aperture,
+            "sensor_size": self.sensor_size,
+            "iso": self.iso,
+        }
 
 
-@dataclass
+@dataclass(slots=True)
 class UploaderOutput:
     """
     Uploader Agent 输出
@@ -121,7 +175,7 @@ class UploaderOutput:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class OpticalFlowData:
     """
     光流数据
@@ -129,18 +183,38 @@ class OpticalFlowData:
     """
     avg_speed_px_s: float
     primary_direction_deg: float
-    flow_vectors: list[tuple[float, float]] = field(default_factory=list)
+    # (N, 2) float64 array of (vx, vy) rows; lists of pairs are converted.
+    # Compared element-wise by __eq__ below rather than by the generated one
+    flow_vectors: np.ndarray = field(
+        default_factory=lambda: np.empty((0, 2)), compare=False
+    )
+    
+    def __post_init__(self):
+        self.flow_vectors = np.asarray(self.flow_vectors, dtype=np.float64).reshape(-1, 2)
+    
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (
+            self.avg_speed_px_s == other.avg_speed_px_s and
+            self.primary_direction_deg == other.primary_direction_deg and
+            np.array_equal(self.flow_vectors, other.flow_vectors)
+        )
+    
+    def flow_magnitudes(self) -> np.ndarray:
+        """Get the magnitude of each flow vector."""
+        return np.hypot(self.flow_vectors[:, 0], self.flow_vectors[:, 1])
     
     def to_dict(self) -> dict:
         """Convert to dictionary."""
         return {
             "avg_speed_px_s": self.avg_speed_px_s,
             "primary_direction_deg": self.primary_direction_deg,
-            "flow_vectors": self.flow_vectors,
+            "flow_vectors": self.flow_vectors.tolist(),
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class SubjectTrackingData:
     """
     主体跟踪数据
@@ -150,16 +224,24 @@ class SubjectTrackingData:
     confidence_scores: list[float] = field(default_factory=list)
     timestamps: list[float] = field(default_factory=list)
     
+    def bbox_array(self) -> np.ndarray:
+        """Get bbox_sequence as an (N, 4) float64 array of [x, y, w, h] rows."""
+        return bboxes_to_array(self.bbox_sequence)
+    
+    def valid_bbox_mask(self) -> np.ndarray:
+        """Get a boolean mask of which bboxes in bbox_sequence are valid."""
+        return bbox_array_valid_mask(self.bbox_array())
+    
     def to_dict(self) -> dict:
         """Convert to dictionary."""
         return {
-            "bbox_sequence": [bbox.to_list() for bbox in self.bbox_sequence],
+            "bbox_sequence": [[b.x, b.y, b.w, b.h] for b in self.bbox_sequence],
             "confidence_scores": self.confidence_scores,
             "timestamps": self.timestamps,
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class FeatureOutput:
     """
     Feature Extractor 输出
@@ -184,6 +266,8 @@ class FeatureOutput:
         }
 
 
+# Not slotted: the Metadata Synthesizer holds weak references to instances,
+# and dataclass weakref_slot needs Python 3.11
 @dataclass
 class HeuristicOutput:
     """
@@ -197,18 +281,35 @@ class HeuristicOutput:
     motion_smoothness: float
     subject_occupancy: float
     beat_alignment_score: float
+    # Set once is_valid() has passed, so each later stage that checks the
+    # same output (analyzer, then synthesizer) skips the comparisons
+    validated: bool = field(default=False, init=False, repr=False, compare=False)
+    
+    def __setattr__(self, name: str, value) -> None:
+        # Assigning any field voids a remembered is_valid() pass
+        if name != "validated":
+            self.__dict__["validated"] = False
+        object.__setattr__(self, name, value)
     
     def is_valid(self) -> bool:
-        """Check if all indicators are in valid ranges."""
-        return (
+        """
+        Check if all indicators are in valid ranges.
+        
+        A passing result is remembered in validated until a field is
+        assigned again.
+        """
+        if self.validated:
+            return True
+        start, end = self.time_range
+        self.validated = (
+            0 <= start < end and
             self.avg_motion_px_per_s >= 0 and
             0 <= self.frame_pct_change <= 1 and
             0 <= self.motion_smoothness <= 1 and
             0 <= self.subject_occupancy <= 1 and
-            0 <= self.beat_alignment_score <= 1 and
-            self.time_range[0] >= 0 and
-            self.time_range[0] < self.time_range[1]
+            0 <= self.beat_alignment_score <= 1
         )
+        return self.validated
     
     def to_dict(self) -> dict:
         """Convert to dictionary for JSON serialization."""
@@ -223,7 +324,7 @@ class HeuristicOutput:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class MotionParams:
     """
     运动参数
@@ -244,7 +345,7 @@ class MotionParams:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class FramingData:
     """
     构图数据
@@ -263,7 +364,7 @@ class FramingData:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class MetadataOutput:
     """
     Metadata Synthesizer 输出
@@ -305,11 +406,13 @@ class MetadataOutput:
         }
     
     def to_json(self) -> str:
-        """Convert to JSON string."""
+        """Convert to JSON string (serialized by orjson when available)."""
+        if orjson is not None:
+            return orjson.dumps(self.to_dict(), option=orjson.OPT_INDENT_2).decode()
         return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
 
 
-@dataclass
+@dataclass(slots=True)
 class AdvancedParams:
     """
     高级参数
@@ -319,7 +422,7 @@ class AdvancedParams:
     duration_s: float
     speed_curve: str
     stabilization: str
-    notes: list[str] = field(default_factory=list)
+    notes: Optional[list[str]] = None
     
     def to_dict(self) -> dict:
         """Convert to dictionary."""
@@ -328,18 +431,18 @@ class AdvancedParams:
             "duration_s": self.duration_s,
             "speed_curve": self.speed_curve,
             "stabilization": self.stabilization,
-            "notes": self.notes,
+            "notes": self.notes if self.notes is not None else [],
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class InstructionCard:
     """
     拍摄指令卡
     Three-layer shooting instruction card.
     """
     video_id: str
-    primary: list[str]  # Layer 1: 1-4 lines of actionable advice
+    primary: tuple[str, ...]  # Layer 1: 1-4 lines of actionable advice
     explain: str        # Layer 2: 1-3 sentences explaining rationale
     advanced: AdvancedParams  # Layer 3: Adjustable parameters
     
@@ -356,14 +459,14 @@ class InstructionCard:
         return {
             "video_id": self.video_id,
             "instruction_card": {
-                "primary": self.primary,
+                "primary": list(self.primary),
                 "explain": self.explain,
                 "advanced": self.advanced.to_dict(),
             }
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class RetrievalResult:
     """
     检索结果
@@ -384,24 +487,31 @@ class RetrievalResult:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class RetrievalOutput:
     """
     Retrieval Agent 输出
     Output schema for the Retrieval Agent.
     """
     query_video_id: str
-    results: list[RetrievalResult] = field(default_factory=list)
+    results: Optional[list[RetrievalResult]] = None
     
     def to_dict(self) -> dict:
         """Convert to dictionary for JSON serialization."""
         return {
             "query_video_id": self.query_video_id,
-            "results": [r.to_dict() for r in self.results],
+            "results": [r.to_dict() for r in self.results or ()],
         }
 
 
-@dataclass
+def _json_bytes(value) -> bytes:
+    """Serialize a JSON value to UTF-8 bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False).encode("utf-8")
+
+
+@dataclass(slots=True)
 class PipelineResult:
     """
     完整流水线结果
@@ -427,19 +537,50 @@ class PipelineResult:
         """Convert to dictionary for JSON serialization."""
         result = {"video_id": self.video_id}
         
-        if self.uploader_output:
+        if self.uploader_output is not None:
             result["uploader_output"] = self.uploader_output.to_dict()
-        if self.feature_output:
+        if self.feature_output is not None:
             result["feature_output"] = self.feature_output.to_dict()
-        if self.heuristic_output:
+        if self.heuristic_output is not None:
             result["heuristic_output"] = self.heuristic_output.to_dict()
-        if self.metadata_output:
+        if self.metadata_output is not None:
             result["metadata_output"] = self.metadata_output.to_dict()
-        if self.instruction_card:
+        if self.instruction_card is not None:
             result["instruction_card"] = self.instruction_card.to_dict()
-        if self.retrieval_output:
+        if self.retrieval_output is not None:
             result["retrieval_output"] = self.retrieval_output.to_dict()
         if self.error:
             result["error"] = self.error
             
         return result
+    
+    def write_json(self, fp) -> None:
+        """
+        Write the to_dict() JSON document to a binary file.
+        
+        Each stage output is converted and encoded on its own, so only one
+        stage's dict is alive at a time instead of the whole nested result.
+        
+        Args:
+            fp: File object opened in binary write mode
+        """
+        fp.write(b'{"video_id":' + _json_bytes(self.video_id))
+        for name in _PIPELINE_OUTPUTS:
+            output = getattr(self, name)
+            if output is not None:
+                fp.write(b',"' + name.encode() + b'":')
+                fp.write(_json_bytes(output.to_dict()))
+        if self.error:
+            fp.write(b',"error":' + _json_bytes(self.error))
+        fp.write(b"}")
+
+
+# Stage outputs of a PipelineResult, in to_dict() key order
+_PIPELINE_OUTPUTS = (
+    "uploader_output",
+    "feature_output",
+    "heuristic_output",
+    "metadata_output",
+    "instruction_card",
+    "retrieval_output",
+)
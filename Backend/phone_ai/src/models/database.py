@@ -1,8 +1,10 @@
 """
 SQLAlchemy database models for the Video Shooting Assistant.
 """
+import os
+import time
 import uuid
-from datetime import datetime
+from functools import lru_cache
 from typing import Optional
 
 from sqlalchemy import (
@@ -16,10 +18,54 @@ from sqlalchemy import (
     String,
     Text,
     create_engine,
+    func,
+    text,
 )
 from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, relationship, sessionmaker
 
+from .enums import FeedbackAction, MotionType, TaskStatus
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _uuid7() -> uuid.UUID:
+    """
+    Generate a time-ordered UUIDv7 (RFC 9562).
+    
+    The leading 48 bits are the Unix time in milliseconds, so new primary
+    keys land at the right edge of the B-tree instead of at random pages.
+    Uses uuid.uuid7 where the standard library provides it (3.14+).
+    """
+    timestamp_ms = time.time_ns() // 1_000_000
+    rand = int.from_bytes(os.urandom(10), "big")
+    value = (
+        (timestamp_ms & 0xFFFF_FFFF_FFFF) << 80
+        | 0x7 << 76                              # version
+        | (rand >> 62 & 0xFFF) << 64             # rand_a
+        | 0b10 << 62                             # RFC 4122 variant
+        | rand & 0x3FFF_FFFF_FFFF_FFFF           # rand_b
+    )
+    return uuid.UUID(int=value)
+
+
+if hasattr(uuid, "uuid7"):
+    _uuid7 = uuid.uuid7  # noqa: F811
+
+
+def _utc_now():
+    """SQL expression for the current UTC time as a naive timestamp."""
+    return func.timezone("UTC", func.now())
+
+
+def _enum_type(enum_cls, name: str) -> Enum:
+    """PostgreSQL ENUM column type storing the Python enum's values."""
+    return Enum(enum_cls, name=name, values_callable=lambda cls: list(cls.values()))
+
 
 class Base(DeclarativeBase):
     """Base class for all database models."""
@@ -33,16 +79,16 @@ class AnalysisTask(Base):
     """
     __tablename__ = "analysis_tasks"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=_uuid7)
     video_id = Column(String(255), nullable=False, index=True)
     status = Column(
-        String(50),
+        _enum_type(TaskStatus, "task_status"),
         nullable=False,
-        default="pending",
+        default=TaskStatus.PENDING,
         index=True,
     )
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=_utc_now())
+    updated_at = Column(DateTime, server_default=_utc_now(), onupdate=_utc_now())
     completed_at = Column(DateTime, nullable=True)
     error_message = Column(Text, nullable=True)
     
@@ -57,12 +103,9 @@ class AnalysisTask(Base):
     feedbacks = relationship("UserFeedback", back_populates="task", cascade="all, delete-orphan")
     
     __table_args__ = (
-        CheckConstraint(
-            "status IN ('pending', 'processing', 'completed', 'failed')",
-            name="valid_status"
-        ),
-        Index("idx_tasks_status", "status"),
-        Index("idx_tasks_video_id", "video_id"),
+        # Composite indexes also serve lookups on their leading column
+        Index("idx_tasks_status_created", "status", "created_at"),
+        Index("idx_tasks_video_status", "video_id", "status"),
     )
     
     def __repr__(self) -> str:
@@ -76,20 +119,20 @@ class UserFeedback(Base):
     """
     __tablename__ = "user_feedback"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=_uuid7)
     task_id = Column(UUID(as_uuid=True), ForeignKey("analysis_tasks.id"), nullable=False)
     instruction_index = Column(Integer, nullable=True)
-    action = Column(String(50), nullable=False)  # accept, modify, ignore
+    action = Column(_enum_type(FeedbackAction, "feedback_action"), nullable=False)
     rating = Column(Integer, nullable=True)
     comment = Column(Text, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, server_default=_utc_now())
     
     # Relationships
     task = relationship("AnalysisTask", back_populates="feedbacks")
     
     __table_args__ = (
         CheckConstraint("rating >= 1 AND rating <= 5", name="valid_rating"),
-        Index("idx_feedback_task_id", "task_id"),
+        Index("idx_feedback_task_created", "task_id", "created_at"),
     )
     
     def __repr__(self) -> str:
@@ -105,30 +148,82 @@ class ReferenceVideo(Base):
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     video_path = Column(String(500), nullable=False)
-    motion_type = Column(String(50), nullable=True, index=True)
+    motion_type = Column(_enum_type(MotionType, "motion_type"), nullable=True, index=True)
     subject_type = Column(String(100), nullable=True)
     embedding_id = Column(String(255), nullable=True)  # FAISS index ID
     video_metadata = Column(JSONB, nullable=True)  # renamed from 'metadata' to avoid SQLAlchemy conflict
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, server_default=_utc_now())
     
     __table_args__ = (
-        Index("idx_reference_motion_type", "motion_type"),
+        # Also serves lookups by motion_type alone
+        Index("idx_reference_motion_subject", "motion_type", "subject_type"),
+        # FAISS ID -> row; rows without an embedding stay out of the index
+        Index(
+            "idx_reference_embedding_id",
+            "embedding_id",
+            unique=True,
+            postgresql_where=text("embedding_id IS NOT NULL"),
+        ),
     )
     
     def __repr__(self) -> str:
         return f"<ReferenceVideo(id={self.id}, motion_type={self.motion_type})>"
 
 
+def _json_dumps(value) -> str:
+    """Serialize a JSONB column value with orjson."""
+    return orjson.dumps(
+        value, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    ).decode()
+
+
+def _json_engine_kwargs() -> dict:
+    """
+    Engine options that encode and decode JSONB columns with orjson.
+    
+    Pipeline outputs are large nested dicts; without these the driver
+    falls back to the stdlib json module. Empty when orjson is missing.
+    """
+    if orjson is None:
+        return {}
+    return {"json_serializer": _json_dumps, "json_deserializer": orjson.loads}
+
+
+@lru_cache(maxsize=None)
 def get_engine(database_url: str):
-    """Create database engine."""
-    return create_engine(database_url, echo=False)
+    """
+    Get the database engine for a URL.
+    
+    Engines own a connection pool, so one is created per URL and reused
+    by every request and task instead of being rebuilt on each call.
+    """
+    return create_engine(database_url, echo=False, **_json_engine_kwargs())
 
 
+@lru_cache(maxsize=None)
 def get_session_factory(engine):
-    """Create session factory."""
+    """Get the session factory bound to an engine."""
     return sessionmaker(bind=engine, autocommit=False, autoflush=False)
 
 
+@lru_cache(maxsize=None)
+def get_async_engine(database_url: str):
+    """
+    Get the asyncio database engine for a URL (e.g. postgresql+asyncpg://).
+    
+    Used by the API so queries don't block the event loop; Celery workers
+    keep the sync engine.
+    """
+    return create_async_engine(database_url, echo=False, **_json_engine_kwargs())
+
+
+@lru_cache(maxsize=None)
+def get_async_session_factory(engine):
+    """Get the async session factory bound to an async engine."""
+    # Attributes stay loaded after commit; refreshing them would need an await
+    return async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+
 def init_db(database_url: str):
     """Initialize database and create all tables."""
     engine = get_engine(database_url)
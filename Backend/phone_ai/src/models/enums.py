@@ -5,6 +5,7 @@ Defines all enum types used across the system for motion types,
 speed profiles, and suggested scales.
 """
 from enum import Enum
+from functools import cache
 
 
 class MotionType(str, Enum):
@@ -21,9 +22,10 @@ class MotionType(str, Enum):
     STATIC = "static"           # 静止
     
     @classmethod
-    def values(cls) -> list[str]:
-        """Return all valid enum values."""
-        return [e.value for e in cls]
+    @cache
+    def values(cls) -> tuple[str, ...]:
+        """Return all valid enum values (built once, then cached)."""
+        return tuple(e.value for e in cls)
 
 
 class SpeedProfile(str, Enum):
@@ -37,9 +39,10 @@ class SpeedProfile(str, Enum):
     LINEAR = "linear"           # 线性
     
     @classmethod
-    def values(cls) -> list[str]:
-        """Return all valid enum values."""
-        return [e.value for e in cls]
+    @cache
+    def values(cls) -> tuple[str, ...]:
+        """Return all valid enum values (built once, then cached)."""
+        return tuple(e.value for e in cls)
 
 
 class SuggestedScale(str, Enum):
@@ -53,9 +56,10 @@ class SuggestedScale(str, Enum):
     WIDE = "wide"                        # 远景/全景
     
     @classmethod
-    def values(cls) -> list[str]:
-        """Return all valid enum values."""
-        return [e.value for e in cls]
+    @cache
+    def values(cls) -> tuple[str, ...]:
+        """Return all valid enum values (built once, then cached)."""
+        return tuple(e.value for e in cls)
 
 
 class TaskStatus(str, Enum):
@@ -69,9 +73,10 @@ class TaskStatus(str, Enum):
     FAILED = "failed"
     
     @classmethod
-    def values(cls) -> list[str]:
-        """Return all valid enum values."""
-        return [e.value for e in cls]
+    @cache
+    def values(cls) -> tuple[str, ...]:
+        """Return all valid enum values (built once, then cached)."""
+        return tuple(e.value for e in cls)
 
 
 class FeedbackAction(str, Enum):
@@ -84,6 +89,7 @@ class FeedbackAction(str, Enum):
     IGNORE = "ignore"
     
     @classmethod
-    def values(cls) -> list[str]:
-        """Return all valid enum values."""
-        return [e.value for e in cls]
+    @cache
+    def values(cls) -> tuple[str, ...]:
+        """Return all valid enum values (built once, then cached)."""
+        return tuple(e.value for e in cls)
@@ -11,6 +11,7 @@ Components:
 - HysteresisController: 滞后控制器
 - RealtimeWebSocketHandler: WebSocket 处理器
 - SessionManager: 会话管理器
+- AdviceBackplane: 多 worker 建议广播 (Redis Pub/Sub)
 """
 
 from .types import (
@@ -34,7 +35,9 @@ from .websocket_handler import (
     ReconnectionManager,
     get_session_manager,
     create_websocket_handler,
+    get_websocket_handler,
 )
+from .advice_backplane import AdviceBackplane, get_advice_backplane
 from .session_manager import (
     PersistentSessionManager,
     SessionConfig,
@@ -69,6 +72,9 @@ __all__ = [
     "ReconnectionManager",
     "get_session_manager",
     "create_websocket_handler",
+    "get_websocket_handler",
+    "AdviceBackplane",
+    "get_advice_backplane",
     # Session Management
     "PersistentSessionManager",
     "SessionConfig",
@@ -0,0 +1,259 @@
+"""
+Redis Pub/Sub backplane for realtime advice.
+
+Sessions and their WebSocket clients live in the worker process that
+accepted the connection, so a REST advice push only reaches the clients of
+whichever worker served it. With the backplane enabled, pushed advice is
+published to Redis and every worker fans it out to its own clients.
+
+Each worker also reports the sessions it hosts and their client counts in
+a Redis hash per session, so a push can tell how many clients were
+notified and whether any worker knows the session at all.
+"""
+import asyncio
+import logging
+import uuid
+from typing import Optional
+
+try:
+    import redis
+    import redis.asyncio as aioredis
+except ImportError:
+    redis = None
+    aioredis = None
+
+from configs.settings import settings
+
+from .types import AdvicePayload
+from .websocket_handler import RealtimeWebSocketHandler, _dumps_message, get_websocket_handler
+
+
+logger = logging.getLogger(__name__)
+
+# Advice for session X is published on channel "advice:X"
+CHANNEL_PREFIX = "advice:"
+
+# Hash "advice-clients:X" maps worker id -> clients of session X on that worker
+CLIENTS_KEY_PREFIX = "advice-clients:"
+
+# Reports from workers that died without cleaning up expire after a day
+CLIENTS_KEY_TTL_S = 24 * 60 * 60
+
+
+def advice_channel(session_id: str) -> str:
+    """Pub/Sub channel carrying the advice for a session."""
+    return f"{CHANNEL_PREFIX}{session_id}"
+
+
+def clients_key(session_id: str) -> str:
+    """Hash holding each worker's client count for a session."""
+    return f"{CLIENTS_KEY_PREFIX}{session_id}"
+
+
+class AdviceBackplane:
+    """
+    Fans pushed advice out to every worker through Redis Pub/Sub.
+
+    Each worker runs one listener subscribed to all advice channels and
+    forwards the messages to the clients connected to that worker, and
+    keeps its entry in the per-session client hashes up to date. When
+    disabled (or redis is not installed) advice is broadcast locally only.
+    """
+
+    def __init__(
+        self,
+        handler: RealtimeWebSocketHandler,
+        url: Optional[str] = None,
+        enabled: Optional[bool] = None,
+        reconnect_delay_s: float = 1.0
+    ):
+        """
+        Initialize the backplane.
+
+        Args:
+            handler: Handler used to reach this worker's clients
+            url: Redis URL (defaults to settings.redis.url)
+            enabled: Use Redis (defaults to settings.redis.advice_pubsub)
+            reconnect_delay_s: Wait before resubscribing after a Redis error
+        """
+        self.handler = handler
+        self.url = url or settings.redis.url
+        if enabled is None:
+            enabled = settings.redis.advice_pubsub
+        self.enabled = enabled and aioredis is not None
+        self.reconnect_delay_s = reconnect_delay_s
+        self._client = None
+        self._listener: Optional[asyncio.Task] = None
+        self.worker_id = uuid.uuid4().hex
+        # Latest client count per session not yet written to Redis
+        self._pending_reports: dict[str, Optional[int]] = {}
+        self._report_task: Optional[asyncio.Task] = None
+        if self.enabled:
+            handler.session_manager.on_clients_changed = self._report_clients
+
+    def _get_client(self):
+        """Lazily create the async Redis client."""
+        if self._client is None:
+            # No socket_timeout: the subscriber blocks waiting for messages
+            self._client = aioredis.from_url(self.url, socket_connect_timeout=0.5)
+        return self._client
+
+    async def publish(
+        self,
+        session_id: str,
+        advice_list: list[AdvicePayload]
+    ) -> Optional[int]:
+        """
+        Deliver advice to the session's clients on every worker.
+
+        Falls back to a local broadcast when the backplane is disabled or
+        Redis is unreachable.
+
+        Args:
+            session_id: Session identifier
+            advice_list: List of advice payloads
+
+        Returns:
+            Number of clients the advice was sent to, as last reported by
+            the workers (or counted locally when broadcasting locally), or
+            None if no worker knows the session
+        """
+        if not self.enabled:
+            return await self._broadcast_locally(session_id, advice_list)
+
+        # Publish the final message text so subscribers forward it as-is
+        channel = advice_channel(session_id)
+        try:
+            async with self._get_client().pipeline(transaction=False) as pipe:
+                pipe.hvals(clients_key(session_id))
+                for advice in advice_list:
+                    pipe.publish(channel, _dumps_message(advice.to_dict()))
+                counts, *_ = await pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Advice publish failed for {session_id}, broadcasting locally: {e}")
+            return await self._broadcast_locally(session_id, advice_list)
+
+        if not counts:
+            return None
+        return sum(int(count) for count in counts)
+
+    async def _broadcast_locally(
+        self,
+        session_id: str,
+        advice_list: list[AdvicePayload]
+    ) -> Optional[int]:
+        """Broadcast to this worker's clients; None if the session is unknown here."""
+        if self.handler.session_manager.get_session(session_id) is None:
+            return None
+        return await self.handler._broadcast_advice(session_id, advice_list)
+
+    def _report_clients(self, session_id: str, count: Optional[int]) -> None:
+        """
+        Queue this worker's client count for a session to be written to Redis.
+
+        Called synchronously by the session manager; the writes happen in a
+        single background task so reports for a session land in order.
+
+        Args:
+            session_id: Session identifier
+            count: Local client count, or None once the session is deleted
+        """
+        self._pending_reports[session_id] = count
+        if self._report_task is None or self._report_task.done():
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                # No loop yet; the pending report is written by the next flush
+                return
+            self._report_task = loop.create_task(self._flush_reports())
+
+    async def _flush_reports(self) -> None:
+        """Write queued client counts to Redis until none are left."""
+        while self._pending_reports:
+            reports, self._pending_reports = self._pending_reports, {}
+            try:
+                async with self._get_client().pipeline(transaction=False) as pipe:
+                    for session_id, count in reports.items():
+                        key = clients_key(session_id)
+                        if count is None:
+                            pipe.hdel(key, self.worker_id)
+                        else:
+                            pipe.hset(key, self.worker_id, count)
+                            pipe.expire(key, CLIENTS_KEY_TTL_S)
+                    await pipe.execute()
+            except redis.RedisError as e:
+                logger.warning(f"Advice client report failed for {len(reports)} sessions: {e}")
+
+    async def start(self) -> None:
+        """Start this worker's listener (no-op when disabled)."""
+        if self.enabled and self._listener is None:
+            # Report sessions created before the backplane was started
+            for session_id in self.handler.session_manager.get_all_sessions():
+                self._report_clients(
+                    session_id, len(self.handler.session_manager.get_clients(session_id))
+                )
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        """Stop the listener, withdraw this worker's reports and close the pool."""
+        if self.enabled:
+            for session_id in self.handler.session_manager.get_all_sessions():
+                self._report_clients(session_id, None)
+            if self._report_task is not None:
+                await self._report_task
+                self._report_task = None
+
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _listen(self) -> None:
+        """Forward published advice to local clients, resubscribing on errors."""
+        while True:
+            pubsub = self._get_client().pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.psubscribe(f"{CHANNEL_PREFIX}*")
+                async for message in pubsub.listen():
+                    await self._dispatch(message["channel"], message["data"])
+            except redis.RedisError as e:
+                logger.warning(f"Advice backplane subscription lost, retrying: {e}")
+                await asyncio.sleep(self.reconnect_delay_s)
+            finally:
+                await pubsub.reset()
+
+    async def _dispatch(self, channel: bytes, data: bytes) -> int:
+        """
+        Queue one published message for the local clients of its session.
+
+        Args:
+            channel: Channel the message arrived on
+            data: Serialized advice message
+
+        Returns:
+            Number of local clients the message was queued for
+        """
+        session_id = channel.decode()[len(CHANNEL_PREFIX):]
+        clients = self.handler._connected_clients(session_id)
+        if not clients:
+            return 0
+        return await self.handler._broadcast_texts(clients, [data.decode()])
+
+
+# Global advice backplane instance
+_advice_backplane: Optional[AdviceBackplane] = None
+
+
+def get_advice_backplane() -> AdviceBackplane:
+    """Get the global advice backplane bound to the global WebSocket handler."""
+    global _advice_backplane
+    if _advice_backplane is None:
+        _advice_backplane = AdviceBackplane(get_websocket_handler())
+    return _advice_backplane
@@ -6,12 +6,18 @@ Performs low-latency optical flow and heuristic analysis on frame buffers.
 
 Requirements: 1.1, 1.2, 1.3, 4.5, 4.6, 11.5, 11.6
 """
+import asyncio
 import base64
 import math
+import os
+import queue
+import threading
 import time
+import weakref
 from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Optional, Sequence
 
 import cv2
 import numpy as np
@@ -21,6 +27,91 @@ from src.realtime.types import RealtimeAnalysisResult
 from src.realtime.smoothing import SmoothingFilter, IndicatorValues
 
 
+# How long pipeline workers block on a queue before re-checking for stop
+PIPELINE_POLL_S = 0.1
+
+# Threads decoding a buffer's JPEGs in parallel (cv2.imdecode releases the GIL)
+DECODE_WORKERS = min(8, os.cpu_count() or 1)
+
+# Shared by all analyzers, created on first use
+_decode_pool: Optional[ThreadPoolExecutor] = None
+_decode_pool_lock = threading.Lock()
+
+
+def _get_decode_pool() -> ThreadPoolExecutor:
+    """Get the process-wide JPEG decode thread pool."""
+    global _decode_pool
+    with _decode_pool_lock:
+        if _decode_pool is None:
+            _decode_pool = ThreadPoolExecutor(
+                max_workers=DECODE_WORKERS,
+                thread_name_prefix="realtime-jpeg"
+            )
+        return _decode_pool
+
+
+# JPEG scale-on-decode factors, largest first
+_REDUCED_DECODE_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
+
+# JPEG start-of-frame markers (SOF0-SOF15 minus DHT, JPG and DAC)
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def _jpeg_size(jpeg_bytes: bytes) -> Optional[tuple[int, int]]:
+    """
+    Read a JPEG's (width, height) from its start-of-frame header.
+    
+    Returns:
+        (width, height), or None if no start-of-frame segment is found
+    """
+    i = 2  # Skip SOI
+    n = len(jpeg_bytes)
+    while i + 9 <= n:
+        if jpeg_bytes[i] != 0xFF:
+            return None
+        marker = jpeg_bytes[i + 1]
+        if marker == 0xFF:  # Fill byte
+            i += 1
+            continue
+        if marker in _JPEG_SOF_MARKERS:
+            height = int.from_bytes(jpeg_bytes[i + 5:i + 7], "big")
+            width = int.from_bytes(jpeg_bytes[i + 7:i + 9], "big")
+            return width, height
+        i += 2 + int.from_bytes(jpeg_bytes[i + 2:i + 4], "big")
+    return None
+
+
+def _smoothness_and_variance(
+    magnitudes: np.ndarray,
+    normalization_factor: float
+) -> tuple[float, float]:
+    """
+    Compute motion smoothness and speed variance from flow magnitudes.
+    
+    Args:
+        magnitudes: Per-frame flow vector magnitudes
+        normalization_factor: Acceleration variance that maps to 1/e smoothness
+        
+    Returns:
+        Tuple of (motion_smoothness in [0, 1], speed_variance)
+    """
+    n = len(magnitudes)
+    speed_variance = float(np.var(magnitudes)) if n >= 2 else 0.0
+    if n < 3:
+        return 0.5, speed_variance  # Default moderate smoothness
+    
+    # Velocities are the flow vector magnitudes; accelerations are
+    # their frame-to-frame changes
+    variance = float(np.var(np.diff(magnitudes)))
+    smoothness = math.exp(-variance / normalization_factor)
+    
+    return max(0.0, min(1.0, smoothness)), speed_variance
+
+
 @dataclass
 class RealtimeAnalyzerConfig:
     """Configuration for realtime analysis."""
@@ -48,6 +139,12 @@ class RealtimeAnalyzerConfig:
     lk_block_size: int = 7
     lk_win_size: tuple[int, int] = (21, 21)
     
+    # Run Farneback on a CUDA device when OpenCV was built with CUDA
+    use_gpu_flow: bool = True
+    
+    # Capacity of each queue between pipeline stages (decode -> flow -> heuristics)
+    pipeline_queue_size: int = 2
+    
     # Subject tracking
     subject_lost_threshold_frames: int = 3  # Frames without subject to trigger lost state
     
@@ -60,31 +157,192 @@ class FrameBuffer:
     """
     帧缓冲区
     Sliding window buffer for frame storage with overlap support.
+    
+    Frames live in one preallocated (capacity, H, W, C) ring array, allocated
+    on the first frame and reallocated if the frame shape changes.
     """
-    frames: deque = field(default_factory=lambda: deque(maxlen=10))
-    timestamps: deque = field(default_factory=lambda: deque(maxlen=10))
+    capacity: int = 10
+    frames: Optional[np.ndarray] = None
+    timestamps: Optional[np.ndarray] = None
+    head: int = 0  # Ring index of the oldest frame
+    count: int = 0
+    
+    def __post_init__(self) -> None:
+        self.timestamps = np.empty(self.capacity, dtype=np.float64)
+    
+    def reserve_slot(
+        self,
+        shape: tuple[int, ...],
+        dtype: np.dtype,
+        timestamp: float
+    ) -> np.ndarray:
+        """
+        Claim the next ring slot, evicting the oldest frame when full.
+        
+        Args:
+            shape: Frame shape (H, W, C)
+            dtype: Frame dtype
+            timestamp: Timestamp of the frame to be written
+            
+        Returns:
+            Writable view of the slot, e.g. a cv2.resize dst
+        """
+        if self.frames is None or self.frames.shape[1:] != shape or self.frames.dtype != dtype:
+            self.frames = np.empty((self.capacity, *shape), dtype=dtype)
+            self.head = 0
+            self.count = 0
+        
+        idx = (self.head + self.count) % self.capacity
+        if self.count == self.capacity:
+            self.head = (self.head + 1) % self.capacity
+        else:
+            self.count += 1
+        
+        self.timestamps[idx] = timestamp
+        return self.frames[idx]
     
     def add_frame(self, frame: np.ndarray, timestamp: float) -> None:
         """Add a frame to the buffer."""
-        self.frames.append(frame)
-        self.timestamps.append(timestamp)
+        self.reserve_slot(frame.shape, frame.dtype, timestamp)[...] = frame
+    
+    def snapshot(self, copy: bool = True) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Get the buffered frames and timestamps, oldest first.
+        
+        Args:
+            copy: Return arrays independent of the ring. With copy=False
+                and an unwrapped ring the result is a view of the ring
+                slots, which later add_frame()/reserve_slot() calls
+                overwrite; only use it when the snapshot is consumed
+                before the buffer is written again.
+        
+        Returns:
+            Tuple of (frames (N, H, W, C), timestamps (N,))
+        """
+        if self.frames is None:
+            return np.empty((0,), dtype=np.uint8), np.empty(0, dtype=np.float64)
+        
+        end = self.head + self.count
+        if end <= self.capacity:
+            frames = self.frames[self.head:end]
+            timestamps = self.timestamps[self.head:end]
+            if copy:
+                return frames.copy(), timestamps.copy()
+            return frames, timestamps
+        
+        # A wrapped ring is gathered into new arrays either way
+        order = np.arange(self.head, end) % self.capacity
+        return self.frames[order], self.timestamps[order]
     
-    def get_frames(self) -> list[np.ndarray]:
-        """Get all frames in the buffer."""
-        return list(self.frames)
+    def get_frames(self) -> np.ndarray:
+        """Get a copy of all frames in the buffer as an (N, H, W, C) array."""
+        return self.snapshot()[0]
     
-    def get_timestamps(self) -> list[float]:
+    def get_timestamps(self) -> np.ndarray:
         """Get all timestamps in the buffer."""
-        return list(self.timestamps)
+        return self.snapshot()[1]
     
     def size(self) -> int:
         """Get current buffer size."""
-        return len(self.frames)
+        return self.count
     
     def clear(self) -> None:
         """Clear the buffer."""
-        self.frames.clear()
-        self.timestamps.clear()
+        self.head = 0
+        self.count = 0
+
+
+def _abandon(future: Future) -> None:
+    """Fail a queued buffer's future because the pipeline stopped."""
+    if future.running() or future.set_running_or_notify_cancel():
+        future.set_exception(RuntimeError("Realtime analysis pipeline stopped"))
+
+
+class _AnalysisPipeline:
+    """Queues, stop flag and threads of one run of an analyzer's pipeline."""
+    
+    def __init__(self, queue_size: int):
+        self.stopped = threading.Event()
+        self.decode_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.flow_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.heuristic_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.threads: list[threading.Thread] = []
+    
+    def start(self, analyzer_ref: weakref.ref, stages: list[tuple]) -> None:
+        """Start one daemon thread per (name, input queue, stage method name)."""
+        for name, stage_queue, stage in stages:
+            thread = threading.Thread(
+                target=self._run_stage,
+                args=(analyzer_ref, stage_queue, stage),
+                name=name,
+                daemon=True
+            )
+            thread.start()
+            self.threads.append(thread)
+    
+    def _run_stage(self, analyzer_ref: weakref.ref, stage_queue: queue.Queue, stage: str) -> None:
+        """Feed queued items to a stage until stopped or the analyzer is collected."""
+        try:
+            while not self.stopped.is_set():
+                try:
+                    item = stage_queue.get(timeout=PIPELINE_POLL_S)
+                except queue.Empty:
+                    if analyzer_ref() is None:
+                        return
+                    continue
+                analyzer = analyzer_ref()
+                if analyzer is None:
+                    _abandon(item[0])
+                    return
+                getattr(analyzer, stage)(self, item)
+                del analyzer
+        finally:
+            self.stopped.set()
+            self._drain()
+    
+    def put(self, stage_queue: queue.Queue, item: tuple) -> bool:
+        """
+        Hand an item to a stage, waiting while its queue is full.
+        
+        Returns:
+            True if queued, False if the pipeline stopped first
+        """
+        while not self.stopped.is_set():
+            try:
+                stage_queue.put(item, timeout=PIPELINE_POLL_S)
+            except queue.Full:
+                continue
+            self._drain_if_stopped()
+            return True
+        return False
+    
+    def put_nowait(self, stage_queue: queue.Queue, item: tuple) -> None:
+        """Hand an item to a stage, raising queue.Full if there is no room."""
+        stage_queue.put_nowait(item)
+        self._drain_if_stopped()
+    
+    def _drain_if_stopped(self) -> None:
+        # An item that lands after the consumer exited would never resolve
+        if self.stopped.is_set():
+            self._drain()
+    
+    def _drain(self) -> None:
+        """Fail every item still waiting in a queue."""
+        for stage_queue in (self.decode_queue, self.flow_queue, self.heuristic_queue):
+            while True:
+                try:
+                    _abandon(stage_queue.get_nowait()[0])
+                except queue.Empty:
+                    break
+    
+    def stop(self, wait: bool) -> None:
+        """Stop the workers and fail queued items."""
+        self.stopped.set()
+        if wait:
+            for thread in self.threads:
+                if thread is not threading.current_thread():
+                    thread.join(timeout=PIPELINE_POLL_S * 10)
+        self._drain()
 
 
 class RealtimeAnalyzer:
@@ -114,6 +372,79 @@ class RealtimeAnalyzer:
         # Adaptive degradation state
         self._degraded_mode = False
         self._latency_history: deque = deque(maxlen=5)
+        
+        # Guards the tracking and degradation state shared by pipeline stages
+        self._state_lock = threading.Lock()
+        
+        # Decode -> flow -> heuristics pipeline, started on first submit
+        self._pipeline: Optional[_AnalysisPipeline] = None
+        self._pipeline_lock = threading.Lock()
+        
+        # CUDA Farneback, or None to use the CPU implementation
+        self._gpu_farneback = self._create_gpu_farneback()
+    
+    def _create_gpu_farneback(self):
+        """
+        Create the CUDA Farneback solver if a CUDA device is usable.
+        
+        Returns:
+            cv2.cuda_FarnebackOpticalFlow instance, or None when OpenCV has
+            no CUDA support, no device is present, or use_gpu_flow is off
+        """
+        if not self.config.use_gpu_flow:
+            return None
+        try:
+            if cv2.cuda.getCudaEnabledDeviceCount() == 0:
+                return None
+            return cv2.cuda_FarnebackOpticalFlow.create(
+                numLevels=self.config.optical_flow_levels,
+                pyrScale=self.config.optical_flow_pyr_scale,
+                fastPyramids=False,
+                winSize=self.config.optical_flow_winsize,
+                numIters=self.config.optical_flow_iterations,
+                polyN=self.config.optical_flow_poly_n,
+                polySigma=self.config.optical_flow_poly_sigma,
+                flags=0,
+            )
+        except (AttributeError, cv2.error):
+            return None
+    
+    def _farneback_flows(self, gray_frames: list[np.ndarray]):
+        """
+        Yield the dense Farneback flow field between each consecutive pair.
+        
+        On the GPU each frame is uploaded once and reused as the next
+        pair's previous frame; only the (h, w, 2) flow field comes back.
+        
+        Args:
+            gray_frames: Grayscale frames
+            
+        Yields:
+            Flow field for frames (i, i + 1) as an (h, w, 2) float32 array
+        """
+        if self._gpu_farneback is not None:
+            prev_gpu = cv2.cuda_GpuMat()
+            prev_gpu.upload(gray_frames[0])
+            for next_frame in gray_frames[1:]:
+                next_gpu = cv2.cuda_GpuMat()
+                next_gpu.upload(next_frame)
+                yield self._gpu_farneback.calc(prev_gpu, next_gpu, None).download()
+                prev_gpu = next_gpu
+            return
+        
+        for i in range(len(gray_frames) - 1):
+            yield cv2.calcOpticalFlowFarneback(
+                gray_frames[i],
+                gray_frames[i + 1],
+                None,
+                pyr_scale=self.config.optical_flow_pyr_scale,
+                levels=self.config.optical_flow_levels,
+                winsize=self.config.optical_flow_winsize,
+                iterations=self.config.optical_flow_iterations,
+                poly_n=self.config.optical_flow_poly_n,
+                poly_sigma=self.config.optical_flow_poly_sigma,
+                flags=0
+            )
     
     def decode_base64_jpeg(self, base64_jpeg: str) -> Optional[np.ndarray]:
         """
@@ -128,27 +459,48 @@ class RealtimeAnalyzer:
         try:
             jpeg_bytes = base64.b64decode(base64_jpeg)
             nparr = np.frombuffer(jpeg_bytes, np.uint8)
-            frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+            frame = cv2.imdecode(nparr, self._decode_flag(jpeg_bytes))
             return frame
         except Exception:
             return None
     
+    def _decode_flag(self, jpeg_bytes: bytes) -> int:
+        """
+        Pick the imdecode flag for a JPEG.
+        
+        libjpeg can scale by 1/2, 1/4 or 1/8 while decoding, which is cheaper
+        than a full decode followed by cv2.resize. Use the largest factor that
+        still leaves the image at least target_resolution.
+        """
+        size = _jpeg_size(jpeg_bytes)
+        if size is None:
+            return cv2.IMREAD_COLOR
+        
+        width, height = size
+        target_w, target_h = self.config.target_resolution
+        for factor, flag in _REDUCED_DECODE_FLAGS:
+            if width // factor >= target_w and height // factor >= target_h:
+                return flag
+        return cv2.IMREAD_COLOR
+    
     def decode_frame_buffer(self, base64_frames: list[str]) -> list[np.ndarray]:
         """
         Decode a list of Base64-encoded JPEG frames.
         
+        Frames are independent, so on multi-core machines they are decoded
+        in parallel on a shared thread pool; order is preserved.
+        
         Args:
             base64_frames: List of Base64-encoded JPEG strings
             
         Returns:
             List of decoded frames as numpy arrays (BGR format)
         """
-        frames = []
-        for b64_jpeg in base64_frames:
-            frame = self.decode_base64_jpeg(b64_jpeg)
-            if frame is not None:
-                frames.append(frame)
-        return frames
+        if DECODE_WORKERS > 1 and len(base64_frames) > 1:
+            decoded = _get_decode_pool().map(self.decode_base64_jpeg, base64_frames)
+        else:
+            decoded = map(self.decode_base64_jpeg, base64_frames)
+        return [frame for frame in decoded if frame is not None]
     
     def add_frames_to_buffer(
         self,
@@ -169,29 +521,34 @@ class RealtimeAnalyzer:
         
         frame_interval = 1.0 / fps if fps > 0 else 0.033  # Default to ~30fps
         
+        target_h_w = self.config.target_resolution[::-1]
+        
         for i, frame in enumerate(frames):
             timestamp = start_timestamp + (i * frame_interval)
             
-            # Resize to target resolution for faster processing
-            if frame.shape[:2] != self.config.target_resolution[::-1]:
-                frame = cv2.resize(
+            # Resize to target resolution for faster processing, straight
+            # into the buffer's ring slot
+            if frame.shape[:2] != target_h_w:
+                slot = self._frame_buffer.reserve_slot(
+                    (*target_h_w, *frame.shape[2:]), frame.dtype, timestamp
+                )
+                cv2.resize(
                     frame,
                     self.config.target_resolution,
+                    dst=slot,
                     interpolation=cv2.INTER_LINEAR
                 )
-            
-            self._frame_buffer.add_frame(frame, timestamp)
+            else:
+                self._frame_buffer.add_frame(frame, timestamp)
     
-    def get_buffer_for_analysis(self) -> tuple[list[np.ndarray], list[float]]:
+    def get_buffer_for_analysis(self) -> tuple[np.ndarray, np.ndarray]:
         """
         Get frames from buffer for analysis.
         
         Returns:
             Tuple of (frames, timestamps) for analysis
         """
-        frames = self._frame_buffer.get_frames()
-        timestamps = self._frame_buffer.get_timestamps()
-        return frames, timestamps
+        return self._frame_buffer.snapshot()
     
     def is_buffer_ready(self) -> bool:
         """
@@ -206,7 +563,8 @@ class RealtimeAnalyzer:
     
     def compute_optical_flow_farneback(
         self,
-        frames: list[np.ndarray]
+        frames: Sequence[np.ndarray],
+        gray_frames: Optional[Sequence[np.ndarray]] = None
     ) -> OpticalFlowData:
         """
         Compute dense optical flow using Farneback algorithm.
@@ -216,6 +574,7 @@ class RealtimeAnalyzer:
         
         Args:
             frames: List of frames (BGR format)
+            gray_frames: The same frames already converted to grayscale
             
         Returns:
             OpticalFlowData with speed, direction, and flow vectors
@@ -228,7 +587,8 @@ class RealtimeAnalyzer:
             )
         
         # Convert to grayscale
-        gray_frames = [cv2.cvtColor(f, cv2.COLOR_BGR2GRAY) for f in frames]
+        if gray_frames is None:
+            gray_frames = self._to_gray(frames)
         
         # Apply center region only if configured
         if self.config.center_region_only:
@@ -240,40 +600,24 @@ class RealtimeAnalyzer:
             gray_frames = [f[y1:y2, x1:x2] for f in gray_frames]
         
         all_magnitudes = []
-        all_angles = []
         sampled_vectors = []
         
-        for i in range(len(gray_frames) - 1):
-            prev_frame = gray_frames[i]
-            next_frame = gray_frames[i + 1]
-            
-            # Compute dense optical flow using Farneback
-            flow = cv2.calcOpticalFlowFarneback(
-                prev_frame,
-                next_frame,
-                None,
-                pyr_scale=self.config.optical_flow_pyr_scale,
-                levels=self.config.optical_flow_levels,
-                winsize=self.config.optical_flow_winsize,
-                iterations=self.config.optical_flow_iterations,
-                poly_n=self.config.optical_flow_poly_n,
-                poly_sigma=self.config.optical_flow_poly_sigma,
-                flags=0
-            )
-            
-            # Calculate magnitude and angle
-            mag, ang = cv2.cartToPolar(flow[..., 0], flow[..., 1])
+        # Summed flow components; their direction is the vector mean of
+        # the flow, so motion in opposite directions cancels out
+        fx_sum = 0.0
+        fy_sum = 0.0
+        
+        # Compute dense optical flow using Farneback (on the GPU if available)
+        for flow in self._farneback_flows(gray_frames):
+            fx = flow[..., 0]
+            fy = flow[..., 1]
             
-            # Store mean magnitude and dominant angle
-            all_magnitudes.append(np.mean(mag))
+            # Store mean magnitude
+            mag = cv2.magnitude(fx, fy)
+            all_magnitudes.append(cv2.mean(mag)[0])
             
-            # Weight angles by magnitude for dominant direction
-            weighted_angles = ang * mag
-            if np.sum(mag) > 0:
-                dominant_angle = np.sum(weighted_angles) / np.sum(mag)
-            else:
-                dominant_angle = 0.0
-            all_angles.append(dominant_angle)
+            fx_sum += float(fx.sum())
+            fy_sum += float(fy.sum())
             
             # Sample flow vector from center
             h, w = flow.shape[:2]
@@ -285,13 +629,7 @@ class RealtimeAnalyzer:
         avg_magnitude_per_frame = np.mean(all_magnitudes) if all_magnitudes else 0.0
         
         # Calculate primary direction in degrees (0-360)
-        if all_angles:
-            sin_sum = np.sum([np.sin(a) for a in all_angles])
-            cos_sum = np.sum([np.cos(a) for a in all_angles])
-            primary_direction_rad = np.arctan2(sin_sum, cos_sum)
-            primary_direction_deg = np.degrees(primary_direction_rad) % 360
-        else:
-            primary_direction_deg = 0.0
+        primary_direction_deg = math.degrees(math.atan2(fy_sum, fx_sum)) % 360
         
         return OpticalFlowData(
             avg_speed_px_s=float(avg_magnitude_per_frame),  # Per frame, not per second
@@ -301,7 +639,8 @@ class RealtimeAnalyzer:
     
     def compute_optical_flow_lucas_kanade(
         self,
-        frames: list[np.ndarray]
+        frames: Sequence[np.ndarray],
+        gray_frames: Optional[Sequence[np.ndarray]] = None
     ) -> OpticalFlowData:
         """
         Compute sparse optical flow using Lucas-Kanade algorithm.
@@ -311,6 +650,7 @@ class RealtimeAnalyzer:
         
         Args:
             frames: List of frames (BGR format)
+            gray_frames: The same frames already converted to grayscale
             
         Returns:
             OpticalFlowData with speed, direction, and flow vectors
@@ -323,7 +663,8 @@ class RealtimeAnalyzer:
             )
         
         # Convert to grayscale
-        gray_frames = [cv2.cvtColor(f, cv2.COLOR_BGR2GRAY) for f in frames]
+        if gray_frames is None:
+            gray_frames = self._to_gray(frames)
         
         # Parameters for corner detection
         feature_params = dict(
@@ -341,9 +682,12 @@ class RealtimeAnalyzer:
         )
         
         all_magnitudes = []
-        all_angles = []
         sampled_vectors = []
         
+        # Summed flow components, as in compute_optical_flow_farneback()
+        fx_sum = 0.0
+        fy_sum = 0.0
+        
         for i in range(len(gray_frames) - 1):
             prev_frame = gray_frames[i]
             next_frame = gray_frames[i + 1]
@@ -372,18 +716,12 @@ class RealtimeAnalyzer:
             # Calculate flow vectors
             flow_vectors = good_new - good_old
             
-            # Calculate magnitudes and angles
-            magnitudes = np.sqrt(flow_vectors[:, 0]**2 + flow_vectors[:, 1]**2)
-            angles = np.arctan2(flow_vectors[:, 1], flow_vectors[:, 0])
-            
+            # Calculate magnitudes
+            magnitudes = np.hypot(flow_vectors[:, 0], flow_vectors[:, 1])
             all_magnitudes.append(np.mean(magnitudes))
             
-            # Weighted average angle
-            if np.sum(magnitudes) > 0:
-                weighted_angle = np.sum(angles * magnitudes) / np.sum(magnitudes)
-            else:
-                weighted_angle = 0.0
-            all_angles.append(weighted_angle)
+            fx_sum += float(flow_vectors[:, 0].sum())
+            fy_sum += float(flow_vectors[:, 1].sum())
             
             # Sample a flow vector
             if len(flow_vectors) > 0:
@@ -396,14 +734,8 @@ class RealtimeAnalyzer:
         # Calculate average speed
         avg_magnitude_per_frame = np.mean(all_magnitudes) if all_magnitudes else 0.0
         
-        # Calculate primary direction
-        if all_angles:
-            sin_sum = np.sum([np.sin(a) for a in all_angles])
-            cos_sum = np.sum([np.cos(a) for a in all_angles])
-            primary_direction_rad = np.arctan2(sin_sum, cos_sum)
-            primary_direction_deg = np.degrees(primary_direction_rad) % 360
-        else:
-            primary_direction_deg = 0.0
+        # Calculate primary direction in degrees (0-360)
+        primary_direction_deg = math.degrees(math.atan2(fy_sum, fx_sum)) % 360
         
         return OpticalFlowData(
             avg_speed_px_s=float(avg_magnitude_per_frame),
@@ -413,7 +745,8 @@ class RealtimeAnalyzer:
     
     def compute_optical_flow_fast(
         self,
-        frames: list[np.ndarray]
+        frames: Sequence[np.ndarray],
+        gray_frames: Optional[Sequence[np.ndarray]] = None
     ) -> tuple[OpticalFlowData, float]:
         """
         Compute optical flow with performance optimization.
@@ -423,6 +756,7 @@ class RealtimeAnalyzer:
         
         Args:
             frames: List of frames (BGR format)
+            gray_frames: The same frames already converted to grayscale
             
         Returns:
             Tuple of (OpticalFlowData, latency_ms)
@@ -430,16 +764,19 @@ class RealtimeAnalyzer:
         start_time = time.time()
         
         # Check if we should use degraded mode
-        if self._degraded_mode or self.config.use_sparse_flow:
-            flow_data = self.compute_optical_flow_lucas_kanade(frames)
+        with self._state_lock:
+            degraded = self._degraded_mode
+        if degraded or self.config.use_sparse_flow:
+            flow_data = self.compute_optical_flow_lucas_kanade(frames, gray_frames)
         else:
-            flow_data = self.compute_optical_flow_farneback(frames)
+            flow_data = self.compute_optical_flow_farneback(frames, gray_frames)
         
         latency_ms = (time.time() - start_time) * 1000
         
         # Update latency history and check for degradation
-        self._latency_history.append(latency_ms)
-        self._check_degradation()
+        with self._state_lock:
+            self._latency_history.append(latency_ms)
+            self._check_degradation()
         
         return flow_data, latency_ms
     
@@ -481,38 +818,11 @@ class RealtimeAnalyzer:
         Returns:
             Motion smoothness in range [0, 1] (higher = smoother)
         """
-        flow_vectors = flow_data.flow_vectors
-        
-        if len(flow_vectors) < 3:
-            return 0.5  # Default moderate smoothness
-        
-        # Calculate velocities (magnitude of flow vectors)
-        velocities = []
-        for vx, vy in flow_vectors:
-            magnitude = math.sqrt(vx * vx + vy * vy)
-            velocities.append(magnitude)
-        
-        if len(velocities) < 3:
-            return 0.5
-        
-        # Calculate accelerations (change in velocity)
-        accelerations = []
-        for i in range(1, len(velocities)):
-            accel = velocities[i] - velocities[i - 1]
-            accelerations.append(accel)
-        
-        if not accelerations:
-            return 0.5
-        
-        # Calculate variance of accelerations
-        mean_accel = sum(accelerations) / len(accelerations)
-        variance = sum((a - mean_accel) ** 2 for a in accelerations) / len(accelerations)
-        
-        # Normalize variance to smoothness score
-        normalization_factor = self.config.smoothness_normalization_factor
-        smoothness = math.exp(-variance / normalization_factor)
-        
-        return max(0.0, min(1.0, smoothness))
+        smoothness, _ = _smoothness_and_variance(
+            flow_data.flow_magnitudes(),
+            self.config.smoothness_normalization_factor
+        )
+        return smoothness
     
     def calculate_speed_variance(
         self,
@@ -527,25 +837,16 @@ class RealtimeAnalyzer:
         Returns:
             Speed variance
         """
-        flow_vectors = flow_data.flow_vectors
-        
-        if len(flow_vectors) < 2:
-            return 0.0
-        
-        # Calculate magnitudes
-        magnitudes = [math.sqrt(vx*vx + vy*vy) for vx, vy in flow_vectors]
-        
-        if not magnitudes:
-            return 0.0
-        
-        mean_mag = sum(magnitudes) / len(magnitudes)
-        variance = sum((m - mean_mag) ** 2 for m in magnitudes) / len(magnitudes)
-        
+        _, variance = _smoothness_and_variance(
+            flow_data.flow_magnitudes(),
+            self.config.smoothness_normalization_factor
+        )
         return variance
     
     def detect_subject(
         self,
-        frame: np.ndarray
+        frame: np.ndarray,
+        gray: Optional[np.ndarray] = None
     ) -> Optional[BBox]:
         """
         Detect subject in a single frame.
@@ -555,13 +856,15 @@ class RealtimeAnalyzer:
         
         Args:
             frame: Frame to analyze (BGR format)
+            gray: The same frame already converted to grayscale
             
         Returns:
             Detected subject BBox or None
         """
         # Simple center-weighted detection using edge density
         # This is a placeholder - production would use YOLO
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if gray is None:
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
         edges = cv2.Canny(gray, 50, 150)
         
         h, w = edges.shape
@@ -570,6 +873,9 @@ class RealtimeAnalyzer:
         grid_h, grid_w = 3, 3
         cell_h, cell_w = h // grid_h, w // grid_w
         
+        # Summed-area table: each cell's edge sum is four lookups
+        sat = cv2.integral(edges)
+        
         max_density = 0
         best_cell = (1, 1)  # Default to center
         
@@ -577,8 +883,8 @@ class RealtimeAnalyzer:
             for j in range(grid_w):
                 y1, y2 = i * cell_h, (i + 1) * cell_h
                 x1, x2 = j * cell_w, (j + 1) * cell_w
-                cell = edges[y1:y2, x1:x2]
-                density = np.sum(cell) / (cell_h * cell_w)
+                cell_sum = int(sat[y2, x2] - sat[y1, x2] - sat[y2, x1] + sat[y1, x1])
+                density = cell_sum / (cell_h * cell_w)
                 
                 # Weight center cells higher
                 center_weight = 1.0 + 0.5 * (1.0 - abs(i - 1) / 1.5) * (1.0 - abs(j - 1) / 1.5)
@@ -603,7 +909,8 @@ class RealtimeAnalyzer:
     
     def update_subject_tracking(
         self,
-        frames: list[np.ndarray]
+        frames: Sequence[np.ndarray],
+        gray_frames: Optional[Sequence[np.ndarray]] = None
     ) -> tuple[Optional[BBox], float, bool]:
         """
         Update subject tracking state across frames.
@@ -612,16 +919,28 @@ class RealtimeAnalyzer:
         
         Args:
             frames: List of frames to analyze
+            gray_frames: The same frames already converted to grayscale
             
         Returns:
             Tuple of (current_bbox, occupancy, subject_lost)
         """
-        if not frames:
+        if len(frames) == 0:
             return None, 0.0, self._subject_lost
         
         # Detect subject in last frame
-        current_bbox = self.detect_subject(frames[-1])
+        current_bbox = self.detect_subject(
+            frames[-1],
+            gray_frames[-1] if gray_frames is not None else None
+        )
         
+        with self._state_lock:
+            return self._update_subject_state(current_bbox)
+    
+    def _update_subject_state(
+        self,
+        current_bbox: Optional[BBox]
+    ) -> tuple[Optional[BBox], float, bool]:
+        """Apply one detection to the tracking state; caller holds _state_lock."""
         if current_bbox is not None:
             self._last_subject_bbox = current_bbox
             self._frames_without_subject = 0
@@ -648,13 +967,16 @@ class RealtimeAnalyzer:
     
     def analyze_buffer(
         self,
-        frames: list[np.ndarray],
+        frames: Sequence[np.ndarray],
         fps: float = 30.0
     ) -> RealtimeAnalysisResult:
         """
         Analyze a buffer of frames and return analysis result.
         
-        This is the main entry point for realtime analysis.
+        Blocking front end of the pipeline: the decoded frames are queued at
+        the decode stage (which only resizes them) and this waits for the
+        result. Buffers of fewer than 5 frames (Property 1) give a
+        low-confidence result.
         
         Args:
             frames: List of 5-10 consecutive frames (BGR format)
@@ -663,21 +985,22 @@ class RealtimeAnalyzer:
         Returns:
             RealtimeAnalysisResult with all indicators
         """
-        start_time = time.time()
-        
-        # Validate buffer size (Property 1: 5-10 frames)
-        if len(frames) < 5:
-            # Return low-confidence result for insufficient frames
-            return RealtimeAnalysisResult(
-                avg_speed_px_frame=0.0,
-                speed_variance=0.0,
-                motion_smoothness=0.5,
-                primary_direction_deg=0.0,
-                confidence=0.0,
-                analysis_latency_ms=0.0,
-            )
-        
-        # Resize frames if needed
+        return self._submit(frames, False, 5, True).result()
+    
+    def _insufficient_frames_result(self, frame_count: int = 0) -> RealtimeAnalysisResult:
+        """Get the low-confidence result for a buffer with too few frames."""
+        return RealtimeAnalysisResult(
+            avg_speed_px_frame=0.0,
+            speed_variance=0.0,
+            motion_smoothness=0.5,
+            primary_direction_deg=0.0,
+            confidence=0.0,
+            analysis_latency_ms=0.0,
+            frame_count=frame_count,
+        )
+    
+    def _resize_frames(self, frames: Sequence[np.ndarray]) -> list[np.ndarray]:
+        """Resize frames to the target resolution where needed."""
         resized_frames = []
         for frame in frames:
             if frame.shape[:2] != self.config.target_resolution[::-1]:
@@ -687,21 +1010,47 @@ class RealtimeAnalyzer:
                     interpolation=cv2.INTER_LINEAR
                 )
             resized_frames.append(frame)
+        return resized_frames
+    
+    @staticmethod
+    def _to_gray(frames: Sequence[np.ndarray]) -> list[np.ndarray]:
+        """Convert BGR frames to grayscale."""
+        return [cv2.cvtColor(f, cv2.COLOR_BGR2GRAY) for f in frames]
+    
+    def _finish_analysis(
+        self,
+        resized_frames: list[np.ndarray],
+        gray_frames: list[np.ndarray],
+        flow_data: OpticalFlowData,
+        start_time: float
+    ) -> RealtimeAnalysisResult:
+        """
+        Run the heuristic stage on a buffer whose optical flow is computed.
         
-        # Compute optical flow with adaptive degradation
-        flow_data, flow_latency_ms = self.compute_optical_flow_fast(resized_frames)
-        
-        # Calculate motion smoothness
-        motion_smoothness = self.calculate_motion_smoothness(flow_data)
-        
-        # Calculate speed variance
-        speed_variance = self.calculate_speed_variance(flow_data)
+        Args:
+            resized_frames: Frames at the target resolution
+            gray_frames: resized_frames converted to grayscale
+            flow_data: Optical flow computed from resized_frames
+            start_time: time.time() when analysis of the buffer began
+            
+        Returns:
+            RealtimeAnalysisResult with all indicators
+        """
+        # Calculate motion smoothness and speed variance in one pass
+        motion_smoothness, speed_variance = _smoothness_and_variance(
+            flow_data.flow_magnitudes(),
+            self.config.smoothness_normalization_factor
+        )
         
         # Update subject tracking
-        subject_bbox, subject_occupancy, subject_lost = self.update_subject_tracking(resized_frames)
+        subject_bbox, subject_occupancy, subject_lost = self.update_subject_tracking(
+            resized_frames, gray_frames
+        )
 
         # Calculate environment features
-        env_features = self.calculate_environment_features(resized_frames[-1])  # Use latest frame
+        env_features = self.calculate_environment_features(
+            resized_frames[-1], gray_frames[-1]  # Use latest frame
+        )
 
         # Calculate total latency
         total_latency_ms = (time.time() - start_time) * 1000
@@ -710,7 +1059,7 @@ class RealtimeAnalyzer:
 
         # Calculate confidence based on data quality
         confidence = self._calculate_confidence(
-            len(frames),
+            len(resized_frames),
             len(flow_data.flow_vectors),
             subject_bbox is not None
         )
@@ -731,8 +1080,181 @@ class RealtimeAnalyzer:
             composition_score=env_features.get('composition_score', 0.5),
             analysis_latency_ms=total_latency_ms,
             confidence=confidence,
+            frame_count=len(resized_frames),
         )
     
+    def submit_frame_buffer(
+        self,
+        base64_frames: list[str],
+        fps: float = 30.0,
+        min_frames: int = 5,
+        block: bool = True
+    ) -> Future:
+        """
+        Queue a buffer of Base64-encoded JPEG frames for pipelined analysis.
+        
+        Decoding, optical flow and heuristics run on separate worker threads
+        connected by bounded queues, so while one buffer's flow is computing
+        the next is being decoded and the previous one's heuristics finish.
+        
+        Args:
+            base64_frames: List of Base64-encoded JPEG strings
+            fps: Frames per second of the source video
+            min_frames: Fewest decoded frames to analyze (at least 5); shorter
+                buffers resolve to the low-confidence insufficient result
+            block: Wait while the decode queue is full; otherwise raise
+                queue.Full
+            
+        Returns:
+            Future resolving to the buffer's RealtimeAnalysisResult
+        """
+        return self._submit(base64_frames, True, min_frames, block)
+    
+    def analyze_frame_buffer(
+        self,
+        base64_frames: list[str],
+        fps: float = 30.0,
+        min_frames: int = 5
+    ) -> RealtimeAnalysisResult:
+        """
+        Analyze a buffer of Base64-encoded JPEG frames through the pipeline.
+        
+        Blocking counterpart of submit_frame_buffer().
+        
+        Args:
+            base64_frames: List of Base64-encoded JPEG strings
+            fps: Frames per second of the source video
+            min_frames: Fewest decoded frames to analyze (at least 5)
+            
+        Returns:
+            RealtimeAnalysisResult with all indicators
+        """
+        return self.submit_frame_buffer(base64_frames, fps, min_frames).result()
+    
+    async def analyze_frame_buffer_async(
+        self,
+        base64_frames: list[str],
+        fps: float = 30.0,
+        min_frames: int = 5
+    ) -> RealtimeAnalysisResult:
+        """
+        Analyze a buffer of Base64-encoded JPEG frames from async code.
+        
+        Neither waiting for room in the decode queue nor waiting for the
+        result blocks the event loop.
+        
+        Args:
+            base64_frames: List of Base64-encoded JPEG strings
+            fps: Frames per second of the source video
+            min_frames: Fewest decoded frames to analyze (at least 5)
+            
+        Returns:
+            RealtimeAnalysisResult with all indicators
+        """
+        try:
+            future = self.submit_frame_buffer(base64_frames, fps, min_frames, block=False)
+        except queue.Full:
+            future = await asyncio.to_thread(
+                self.submit_frame_buffer, base64_frames, fps, min_frames
+            )
+        return await asyncio.wrap_future(future)
+    
+    def _submit(
+        self,
+        frames: Sequence,
+        encoded: bool,
+        min_frames: int,
+        block: bool
+    ) -> Future:
+        """Queue decoded or Base64-encoded frames at the decode stage."""
+        pipeline = self._ensure_pipeline()
+        future = Future()
+        item = (future, frames, encoded, min_frames)
+        if block:
+            if not pipeline.put(pipeline.decode_queue, item):
+                _abandon(future)
+        else:
+            pipeline.put_nowait(pipeline.decode_queue, item)
+        return future
+    
+    def start_pipeline(self) -> None:
+        """Start the decode, flow and heuristic worker threads if not running."""
+        self._ensure_pipeline()
+    
+    def _ensure_pipeline(self) -> "_AnalysisPipeline":
+        """Get the running pipeline, starting its worker threads if needed."""
+        with self._pipeline_lock:
+            # A pipeline also stops itself if a worker dies
+            if self._pipeline is None or self._pipeline.stopped.is_set():
+                self._pipeline = _AnalysisPipeline(self.config.pipeline_queue_size)
+                # Workers hold only a weak reference, so they exit once the
+                # analyzer is garbage collected
+                self._pipeline.start(weakref.ref(self), [
+                    ("realtime-decode", self._pipeline.decode_queue, "_decode_stage"),
+                    ("realtime-flow", self._pipeline.flow_queue, "_flow_stage"),
+                    ("realtime-heuristics", self._pipeline.heuristic_queue, "_heuristic_stage"),
+                ])
+            return self._pipeline
+    
+    def stop_pipeline(self, wait: bool = True) -> None:
+        """
+        Stop the pipeline workers and fail buffers still queued.
+        
+        Buffers being processed when the pipeline stops fail with
+        RuntimeError. A later submit starts a new pipeline.
+        
+        Args:
+            wait: Join the worker threads; otherwise they exit on their own
+                within PIPELINE_POLL_S of finishing their current buffer
+        """
+        with self._pipeline_lock:
+            pipeline, self._pipeline = self._pipeline, None
+        if pipeline is not None:
+            pipeline.stop(wait)
+    
+    def _decode_stage(self, pipeline: "_AnalysisPipeline", item: tuple) -> None:
+        """Pipeline stage 1: decode and resize submitted buffers."""
+        future, frames, encoded, min_frames = item
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            if encoded:
+                frames = self.decode_frame_buffer(frames)
+            start_time = time.time()
+            # Property 1: buffers hold at least 5 frames
+            if len(frames) < max(min_frames, 5):
+                future.set_result(self._insufficient_frames_result(len(frames)))
+                return
+            resized_frames = self._resize_frames(frames)
+            item = (future, resized_frames, self._to_gray(resized_frames), start_time)
+        except Exception as e:
+            future.set_exception(e)
+            return
+        if not pipeline.put(pipeline.flow_queue, item):
+            _abandon(future)
+    
+    def _flow_stage(self, pipeline: "_AnalysisPipeline", item: tuple) -> None:
+        """Pipeline stage 2: compute optical flow for decoded buffers."""
+        future, frames, gray_frames, start_time = item
+        try:
+            flow_data, _ = self.compute_optical_flow_fast(frames, gray_frames)
+        except Exception as e:
+            future.set_exception(e)
+            return
+        item = (future, frames, gray_frames, flow_data, start_time)
+        if not pipeline.put(pipeline.heuristic_queue, item):
+            _abandon(future)
+    
+    def _heuristic_stage(self, pipeline: "_AnalysisPipeline", item: tuple) -> None:
+        """Pipeline stage 3: heuristics, subject tracking and environment features."""
+        future, frames, gray_frames, flow_data, start_time = item
+        try:
+            future.set_result(
+                self._finish_analysis(frames, gray_frames, flow_data, start_time)
+            )
+        except Exception as e:
+            future.set_exception(e)
+    
     def _calculate_confidence(
         self,
         frame_count: int,
@@ -775,30 +1297,38 @@ class RealtimeAnalyzer:
         return max(0.0, min(1.0, confidence))
     
     def reset(self) -> None:
-        """Reset analyzer state."""
+        """Reset analyzer state, stopping the pipeline so no buffer in flight sees it."""
+        self.stop_pipeline()
         self._frame_buffer.clear()
         self._last_analysis_time = 0.0
         self._last_latency_ms = 0.0
         self._smoothing_filter.reset()
-        self._last_subject_bbox = None
-        self._frames_without_subject = 0
-        self._subject_lost = False
-        self._degraded_mode = False
-        self._latency_history.clear()
+        with self._state_lock:
+            self._last_subject_bbox = None
+            self._frames_without_subject = 0
+            self._subject_lost = False
+            self._degraded_mode = False
+            self._latency_history.clear()
 
-    def calculate_environment_features(self, frame: np.ndarray) -> dict[str, any]:
+    def calculate_environment_features(
+        self,
+        frame: np.ndarray,
+        gray: Optional[np.ndarray] = None
+    ) -> dict[str, any]:
         """
         Calculate environment features from a single frame.
 
         Args:
             frame: BGR frame image
+            gray: The same frame already converted to grayscale
 
         Returns:
             Dictionary containing environment feature measurements
         """
         try:
             # Convert to different color spaces for analysis
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            if gray is None:
+                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
             hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
             lab = cv2.cvtColor(frame, cv2.COLOR_BGR2LAB)
 
@@ -60,28 +60,17 @@ class RealtimeService:
         """
         start_time = time.time()
         
-        # Decode frames
-        logger.info(f"Decoding {len(base64_frames)} frames...")
-        frames = self._analyzer.decode_frame_buffer(base64_frames)
-        
-        if len(frames) < self.config.min_frames_for_analysis:
-            logger.warning(f"Insufficient frames: {len(frames)} < {self.config.min_frames_for_analysis}")
-            return RealtimeAnalysisResult(
-                avg_speed_px_frame=0.0,
-                speed_variance=0.0,
-                motion_smoothness=0.5,
-                primary_direction_deg=0.0,
-                confidence=0.0,
-                analysis_latency_ms=0.0,
-            ), None
-        
-        decode_time = time.time() - start_time
-        logger.info(f"Decoded {len(frames)} frames in {decode_time*1000:.1f}ms")
+        # Decode and analyze on the analyzer's pipeline threads
+        logger.info(f"Analyzing {len(base64_frames)} frames...")
+        min_frames = self.config.min_frames_for_analysis
+        result = await self._analyzer.analyze_frame_buffer_async(
+            base64_frames, fps, min_frames=min_frames
+        )
+        analysis_time = time.time() - start_time
         
-        # Analyze frames
-        analysis_start = time.time()
-        result = self._analyzer.analyze_buffer(frames, fps)
-        analysis_time = time.time() - analysis_start
+        if result.frame_count < min_frames:
+            logger.warning(f"Insufficient frames: {result.frame_count} < {min_frames}")
+            return result, None
         
         logger.info(
             f"Analysis complete: speed={result.avg_speed_px_frame:.1f}, "
@@ -173,8 +173,9 @@ class PersistentSessionManager:
             self._heartbeat_tasks[session_id].cancel()
             del self._heartbeat_tasks[session_id]
         
-        # Remove session
-        del self._sessions[session_id]
+        # Remove session and stop its analyzer's pipeline threads
+        session_data = self._sessions.pop(session_id)
+        session_data.analyzer.stop_pipeline(wait=False)
         logger.info(f"Deleted session {session_id}")
     
     def add_client(
@@ -58,7 +58,7 @@ class MotionStateMachine:
             motion_rules_config: Configuration for motion type inference
         """
         self.config = config or MotionStateMachineConfig()
-        self._inferrer = MotionTypeInferrer(motion_rules_config)
+        self._inferrer = MotionTypeInferrer.from_config_cached(motion_rules_config)
         
         # Current state
         self._current_state: MotionType = MotionType.STATIC
@@ -66,6 +66,9 @@ class RealtimeAnalysisResult:
 
     # Confidence
     confidence: float = 0.5
+
+    # Frames the indicators were computed from (after decoding)
+    frame_count: int = 0
     
     def to_dict(self) -> dict:
         """Convert to dictionary for JSON serialization."""
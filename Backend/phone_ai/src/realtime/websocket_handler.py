@@ -18,6 +18,11 @@ import cv2
 import numpy as np
 from fastapi import WebSocket, WebSocketDisconnect
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from .analyzer import RealtimeAnalyzer, RealtimeAnalyzerConfig
 from .advice_engine import AdviceEngine, AdviceEngineConfig
 from .task_manager import TaskManager, TaskManagerConfig
@@ -39,6 +44,13 @@ from .task_manager import TaskExecutionContext
 logger = logging.getLogger(__name__)
 
 
+def _dumps_message(payload: dict) -> str:
+    """Serialize a message as compact UTF-8 JSON, like WebSocket.send_json."""
+    if orjson is not None:
+        return orjson.dumps(payload).decode()
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
+
+
 @dataclass
 class WebSocketHandlerConfig:
     """Configuration for WebSocket handler."""
@@ -57,6 +69,60 @@ class WebSocketHandlerConfig:
     
     # Advice delivery timeout (Requirement 7.5)
     advice_delivery_timeout_ms: float = 100.0
+    
+    # Broadcasts to larger sessions are sent in batches of this many
+    # clients, yielding to the event loop in between
+    broadcast_batch_size: int = 50
+
+
+class ClientChannel:
+    """
+    Outbound message queue for one WebSocket client.
+    
+    Broadcasts enqueue pre-serialized messages and a relay task drains them
+    to the socket, so a slow client only delays its own messages. When the
+    queue is full the oldest message is dropped.
+    """
+    
+    def __init__(self, websocket: WebSocket, maxsize: int = 32):
+        self.websocket = websocket
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=maxsize)
+        self._relay_task: Optional[asyncio.Task] = None
+    
+    def put(self, text: str) -> bool:
+        """
+        Queue a JSON text message for the client.
+        
+        Args:
+            text: Serialized message
+            
+        Returns:
+            False if an older message had to be dropped to make room
+        """
+        if self._relay_task is None:
+            # Started lazily so channels can be created outside a running loop
+            self._relay_task = asyncio.create_task(self._relay())
+        
+        dropped = self.queue.full()
+        if dropped:
+            self.queue.get_nowait()
+        self.queue.put_nowait(text)
+        return not dropped
+    
+    async def _relay(self) -> None:
+        """Send queued messages until the socket fails or the channel closes."""
+        while True:
+            text = await self.queue.get()
+            try:
+                await self.websocket.send_text(text)
+            except Exception as e:
+                logger.error(f"Error sending message: {e}")
+                return
+    
+    def close(self) -> None:
+        """Stop relaying; queued messages are discarded."""
+        if self._relay_task is not None:
+            self._relay_task.cancel()
 
 
 class SessionManager:
@@ -71,13 +137,23 @@ class SessionManager:
     - 9.5: Heartbeat mechanism
     """
     
-    def __init__(self):
+    def __init__(self, client_queue_size: int = 32):
         self._sessions: dict[str, SessionState] = {}
         self._clients: dict[str, set[WebSocket]] = {}  # session_id -> set of websockets
+        self._channels: dict[WebSocket, ClientChannel] = {}  # websocket -> outbound queue
+        self._client_queue_size = client_queue_size
         self._analyzers: dict[str, RealtimeAnalyzer] = {}
         self._advice_engines: dict[str, AdviceEngine] = {}
         self._task_managers: dict[str, TaskManager] = {}  # session_id -> TaskManager
         self._heartbeat_tasks: dict[str, asyncio.Task] = {}
+        # Called with (session_id, client count) whenever a session or its
+        # clients change, and with a count of None once it is deleted
+        self.on_clients_changed: Optional[Callable[[str, Optional[int]], None]] = None
+    
+    def _notify_clients_changed(self, session_id: str, count: Optional[int]) -> None:
+        """Report a session's local client count to the registered listener."""
+        if self.on_clients_changed is not None:
+            self.on_clients_changed(session_id, count)
     
     def create_session(self, session_id: str) -> SessionState:
         """
@@ -102,6 +178,7 @@ class SessionManager:
         )
         
         logger.info(f"Created session {session_id}")
+        self._notify_clients_changed(session_id, 0)
         return session
     
     def get_session(self, session_id: str) -> Optional[SessionState]:
@@ -118,34 +195,50 @@ class SessionManager:
             
             # Close all client connections
             for ws in list(self._clients.get(session_id, [])):
+                channel = self._channels.pop(ws, None)
+                if channel is not None:
+                    channel.close()
                 asyncio.create_task(ws.close())
             
             # Clean up
             del self._sessions[session_id]
             self._clients.pop(session_id, None)
-            self._analyzers.pop(session_id, None)
+            analyzer = self._analyzers.pop(session_id, None)
+            if analyzer is not None:
+                analyzer.stop_pipeline(wait=False)
             self._advice_engines.pop(session_id, None)
             self._task_managers.pop(session_id, None)
             
             logger.info(f"Deleted session {session_id}")
+            self._notify_clients_changed(session_id, None)
     
     def add_client(self, session_id: str, websocket: WebSocket) -> None:
         """Add a client to a session."""
         if session_id not in self._clients:
             self._clients[session_id] = set()
         self._clients[session_id].add(websocket)
+        self._channels[websocket] = ClientChannel(websocket, self._client_queue_size)
         logger.info(f"Client joined session {session_id}, total: {len(self._clients[session_id])}")
+        self._notify_clients_changed(session_id, len(self._clients[session_id]))
     
     def remove_client(self, session_id: str, websocket: WebSocket) -> None:
         """Remove a client from a session."""
         if session_id in self._clients:
             self._clients[session_id].discard(websocket)
+            channel = self._channels.pop(websocket, None)
+            if channel is not None:
+                channel.close()
             logger.info(f"Client left session {session_id}, remaining: {len(self._clients[session_id])}")
+            self._notify_clients_changed(session_id, len(self._clients[session_id]))
     
     def get_clients(self, session_id: str) -> set[WebSocket]:
         """Get all clients in a session."""
         return self._clients.get(session_id, set())
     
+    def get_channel(self, websocket: WebSocket) -> Optional[ClientChannel]:
+        """Get the outbound message channel for a client."""
+        return self._channels.get(websocket)
+    
     def get_analyzer(self, session_id: str) -> Optional[RealtimeAnalyzer]:
         """Get analyzer for a session."""
         return self._analyzers.get(session_id)
@@ -344,22 +437,21 @@ class RealtimeWebSocketHandler:
             await self._send_error(websocket, "SESSION_EXPIRED")
             return
         
-        # Decode frames
-        frames = analyzer.decode_frame_buffer(frames_b64)
+        # Decode and analyze on the analyzer's pipeline threads
+        min_frames = self.config.min_frame_buffer_size
+        analysis_result = await analyzer.analyze_frame_buffer_async(
+            frames_b64, fps, min_frames=min_frames
+        )
         
-        if len(frames) < self.config.min_frame_buffer_size:
+        if analysis_result.frame_count < min_frames:
             await self._send_message(websocket, {
                 "type": "frame_ack",
-                "frame_count": len(frames),
+                "frame_count": analysis_result.frame_count,
                 "status": "insufficient_frames",
                 "timestamp": int(time.time() * 1000)
             })
             return
         
-        # Run analysis
-        start_time = time.time()
-        analysis_result = analyzer.analyze_buffer(frames, fps)
-        
         # Update session metrics
         session.update_latency(analysis_result.analysis_latency_ms)
         
@@ -373,7 +465,7 @@ class RealtimeWebSocketHandler:
         # Send acknowledgment
         await self._send_message(websocket, {
             "type": "frame_ack",
-            "frame_count": len(frames),
+            "frame_count": analysis_result.frame_count,
             "analysis_latency_ms": analysis_result.analysis_latency_ms,
             "timestamp": int(time.time() * 1000)
         })
@@ -389,7 +481,7 @@ class RealtimeWebSocketHandler:
         self,
         session_id: str,
         advice_list: list[AdvicePayload]
-    ) -> None:
+    ) -> int:
         """
         Broadcast advice to all clients in a session.
         
@@ -398,20 +490,58 @@ class RealtimeWebSocketHandler:
         Args:
             session_id: Session identifier
             advice_list: List of advice payloads
+            
+        Returns:
+            Number of clients the advice was queued for
         """
-        clients = self.session_manager.get_clients(session_id)
+        clients = self._connected_clients(session_id)
+        if not clients or not advice_list:
+            return 0
+        
+        # Serialize each message once instead of once per client
+        messages = [_dumps_message(advice.to_dict()) for advice in advice_list]
+        return await self._broadcast_texts(clients, messages)
+    
+    def _connected_clients(self, session_id: str) -> list[WebSocket]:
+        """Get a snapshot of the connected clients in a session."""
+        return [
+            client for client in self.session_manager.get_clients(session_id)
+            if client.client_state.name == "CONNECTED"
+        ]
+    
+    async def _broadcast_texts(
+        self,
+        clients: list[WebSocket],
+        messages: list[str]
+    ) -> int:
+        """
+        Queue pre-serialized messages for many clients.
         
-        for advice in advice_list:
-            payload = advice.to_dict()
-            
-            # Send to all clients concurrently
-            tasks = []
-            for client in clients:
-                if client.client_state.name == "CONNECTED":
-                    tasks.append(self._send_message(client, payload))
+        Messages go to each client's ClientChannel, whose relay task sends
+        them in order, so the broadcast never waits on a slow client. Large
+        sessions are handled in batches of config.broadcast_batch_size,
+        yielding to the event loop between batches.
+        
+        Args:
+            clients: Connected WebSocket clients
+            messages: JSON text messages
             
-            if tasks:
-                await asyncio.gather(*tasks, return_exceptions=True)
+        Returns:
+            Number of clients the messages were queued for
+        """
+        batch_size = max(1, self.config.broadcast_batch_size)
+        queued = 0
+        for start in range(0, len(clients), batch_size):
+            if start:
+                await asyncio.sleep(0)
+            for client in clients[start:start + batch_size]:
+                channel = self.session_manager.get_channel(client)
+                if channel is None:
+                    continue
+                for text in messages:
+                    channel.put(text)
+                queued += 1
+        return queued
 
     async def _broadcast_telemetry(
         self,
@@ -425,7 +555,9 @@ class RealtimeWebSocketHandler:
             session_id: Session identifier
             analysis_result: Analysis result to broadcast
         """
-        clients = self.session_manager.get_clients(session_id)
+        clients = self._connected_clients(session_id)
+        if not clients:
+            return
 
         telemetry_payload = {
             "type": "telemetry",
@@ -438,13 +570,7 @@ class RealtimeWebSocketHandler:
             "timestamp": int(time.time() * 1000)
         }
 
-        tasks = []
-        for client in clients:
-            if client.client_state.name == "CONNECTED":
-                tasks.append(self._send_message(client, telemetry_payload))
-
-        if tasks:
-            await asyncio.gather(*tasks, return_exceptions=True)
+        await self._broadcast_texts(clients, [_dumps_message(telemetry_payload)])
 
     async def _handle_environment_scan_request(
         self,
@@ -564,7 +690,9 @@ class RealtimeWebSocketHandler:
             session_id: Session identifier
             analysis: Environment analysis result
         """
-        clients = self.session_manager.get_clients(session_id)
+        clients = self._connected_clients(session_id)
+        if not clients:
+            return
 
         payload = {
             "type": "environment",
@@ -572,13 +700,7 @@ class RealtimeWebSocketHandler:
             "timestamp": int(time.time() * 1000)
         }
 
-        tasks = []
-        for client in clients:
-            if client.client_state.name == "CONNECTED":
-                tasks.append(self._send_message(client, payload))
-
-        if tasks:
-            await asyncio.gather(*tasks, return_exceptions=True)
+        await self._broadcast_texts(clients, [_dumps_message(payload)])
 
     async def _broadcast_task_update(
         self,
@@ -592,7 +714,9 @@ class RealtimeWebSocketHandler:
             session_id: Session identifier
             context: Task execution context
         """
-        clients = self.session_manager.get_clients(session_id)
+        clients = self._connected_clients(session_id)
+        if not clients:
+            return
 
         task = context.task
         payload = {
@@ -610,13 +734,7 @@ class RealtimeWebSocketHandler:
             "timestamp": int(time.time() * 1000)
         }
 
-        tasks = []
-        for client in clients:
-            if client.client_state.name == "CONNECTED":
-                tasks.append(self._send_message(client, payload))
-
-        if tasks:
-            await asyncio.gather(*tasks, return_exceptions=True)
+        await self._broadcast_texts(clients, [_dumps_message(payload)])
     
     async def _heartbeat_loop(
         self,
@@ -779,3 +897,15 @@ def create_websocket_handler(
         session_manager=get_session_manager(),
         config=config
     )
+
+
+# Global WebSocket handler instance
+_websocket_handler: Optional[RealtimeWebSocketHandler] = None
+
+
+def get_websocket_handler() -> RealtimeWebSocketHandler:
+    """Get the global WebSocket handler bound to the global session manager."""
+    global _websocket_handler
+    if _websocket_handler is None:
+        _websocket_handler = create_websocket_handler()
+    return _websocket_handler
@@ -3,9 +3,14 @@
 JSON Schema definitions and validation utilities.
 """
 
+from src.schemas.metadata_model import (
+    MetadataOutputModel,
+    is_valid_metadata_output,
+)
 from src.schemas.validator import (
     SchemaValidator,
     SchemaValidationError,
+    get_schema_validator,
     validate_metadata_output,
     load_metadata_schema,
 )
@@ -13,6 +18,9 @@ from src.schemas.validator import (
 __all__ = [
     "SchemaValidator",
     "SchemaValidationError",
+    "get_schema_validator",
     "validate_metadata_output",
     "load_metadata_schema",
+    "MetadataOutputModel",
+    "is_valid_metadata_output",
 ]
@@ -0,0 +1,82 @@
+"""
+Compiled metadata model for fast output validation.
+
+Mirrors metadata_schema.json as a pydantic model so a MetadataOutput can be
+checked directly from its attributes, without building the intermediate
+dict or walking the schema in pure Python.
+"""
+from typing import Annotated, Any
+
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+
+from src.models.enums import MotionType, SpeedProfile, SuggestedScale
+
+
+UnitFloat = Annotated[float, Field(ge=0, le=1)]
+
+
+class _StrictModel(BaseModel):
+    """Base model reading attributes of the synthesizer dataclasses."""
+
+    model_config = ConfigDict(strict=True, from_attributes=True)
+
+
+class _BBoxModel(_StrictModel):
+    x: UnitFloat
+    y: UnitFloat
+    w: UnitFloat
+    h: UnitFloat
+
+
+class _MotionParamsModel(_StrictModel):
+    # metadata_schema.json uses the draft-4 form `"exclusiveMinimum": true`,
+    # which Draft7Validator reads as a numeric bound of 1
+    duration_s: Annotated[float, Field(gt=1)]
+    frame_pct_change: UnitFloat
+    speed_profile: SpeedProfile
+    motion_smoothness: UnitFloat
+
+
+class _FramingModel(_StrictModel):
+    subject_bbox: _BBoxModel
+    subject_occupancy: UnitFloat
+    suggested_scale: SuggestedScale
+
+
+class MetadataOutputModel(_StrictModel):
+    """
+    Pydantic mirror of the metadata output schema.
+
+    Field names follow the MetadataOutput dataclass rather than the JSON
+    layout, so instances are validated straight from the dataclass.
+    """
+
+    time_range: tuple[Annotated[float, Field(ge=0)], Annotated[float, Field(ge=0)]]
+    motion_type: MotionType
+    motion_params: _MotionParamsModel
+    framing: _FramingModel
+    beat_alignment_score: UnitFloat
+    confidence: UnitFloat
+    explainability: Annotated[str, Field(max_length=500)]
+
+
+def is_valid_metadata_output(metadata: Any) -> bool:
+    """
+    Check a MetadataOutput against the compiled metadata model.
+
+    Strict mode only accepts values the JSON Schema also accepts, so a
+    True result never disagrees with the schema validator. A False result
+    may be a false negative (e.g. a tuple given as a list); callers should
+    fall back to the schema validator for the authoritative error list.
+
+    Args:
+        metadata: MetadataOutput instance to check
+
+    Returns:
+        True if the metadata passes the compiled model
+    """
+    try:
+        MetadataOutputModel.model_validate(metadata)
+    except ValidationError:
+        return False
+    return True
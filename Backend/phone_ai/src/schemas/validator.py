@@ -192,6 +192,26 @@ class SchemaValidator:
         return len(errors) == 0, errors
 
 
+# Singleton instance
+_schema_validator: Optional[SchemaValidator] = None
+
+
+def get_schema_validator() -> SchemaValidator:
+    """
+    Get the shared schema validator instance.
+    
+    The validator is read-only after loading, so one instance can be
+    shared by all agents instead of re-compiling schemas per owner.
+    
+    Returns:
+        The process-wide SchemaValidator
+    """
+    global _schema_validator
+    if _schema_validator is None:
+        _schema_validator = SchemaValidator()
+    return _schema_validator
+
+
 def validate_metadata_output(data: dict[str, Any]) -> tuple[bool, list[str]]:
     """
     Convenience function to validate metadata output.
@@ -202,8 +222,7 @@ def validate_metadata_output(data: dict[str, Any]) -> tuple[bool, list[str]]:
     Returns:
         Tuple of (is_valid, list of error messages)
     """
-    validator = SchemaValidator()
-    return validator.validate_metadata(data)
+    return get_schema_validator().validate_metadata(data)
 
 
 def load_metadata_schema() -> dict:
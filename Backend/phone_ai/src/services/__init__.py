@@ -38,6 +38,12 @@ from src.services.vector_db import (
     FAISSNotAvailableError,
     IndexNotInitializedError,
     create_vector_db,
+    normalize_embeddings,
+)
+
+from src.services.result_cache import (
+    ResultCache,
+    get_result_cache,
 )
 
 __all__ = [
@@ -70,4 +76,8 @@ __all__ = [
     "FAISSNotAvailableError",
     "IndexNotInitializedError",
     "create_vector_db",
+    "normalize_embeddings",
+    # Result Cache
+    "ResultCache",
+    "get_result_cache",
 ]
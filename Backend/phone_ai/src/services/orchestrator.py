@@ -28,7 +28,7 @@ from src.models.data_types import (
     UploaderOutput,
 )
 from src.models.enums import TaskStatus
-from src.schemas.validator import SchemaValidator, SchemaValidationError
+from src.schemas.validator import SchemaValidationError, get_schema_validator
 
 # Use TYPE_CHECKING to avoid circular imports
 if TYPE_CHECKING:
@@ -137,7 +137,7 @@ class Orchestrator:
             instruction_generator: Optional pre-configured Instruction Generator Agent
         """
         self.config = config or PipelineConfig()
-        self.schema_validator = SchemaValidator()
+        self.schema_validator = get_schema_validator()
         
         # Initialize agents
         self._uploader = uploader
@@ -0,0 +1,131 @@
+"""
+Redis Result Cache for the Video Shooting Assistant.
+
+Caches serialized API responses for completed analyses. A completed
+analysis never changes, so polling clients can be answered from Redis
+instead of querying the database on every request.
+"""
+import logging
+from typing import Optional
+
+try:
+    import redis
+    import redis.asyncio as aioredis
+except ImportError:
+    redis = None
+    aioredis = None
+
+from configs.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+def analysis_cache_key(video_id: str) -> str:
+    """Cache key for the GET /api/analysis/{video_id} response."""
+    return f"analysis:{video_id}"
+
+
+def suggestions_cache_key(video_id: str) -> str:
+    """Cache key for the GET /api/suggestions/{video_id} response."""
+    return f"suggestions:{video_id}"
+
+
+class ResultCache:
+    """
+    Cache-aside store for completed analysis responses.
+
+    Every operation degrades to a cache miss (or a no-op) when redis is not
+    installed or the server is unreachable, so callers can always fall back
+    to the database.
+    """
+
+    def __init__(self, url: Optional[str] = None, ttl_s: Optional[int] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            url: Redis URL (defaults to settings.redis.url)
+            ttl_s: Entry lifetime in seconds (defaults to settings.redis.result_cache_ttl_s)
+        """
+        self.url = url or settings.redis.url
+        self.ttl_s = ttl_s if ttl_s is not None else settings.redis.result_cache_ttl_s
+        self._client = None
+
+    @property
+    def enabled(self) -> bool:
+        """Whether caching is possible (redis installed and TTL positive)."""
+        return aioredis is not None and self.ttl_s > 0
+
+    def _get_client(self):
+        """Lazily create the async Redis client (connections are pooled)."""
+        if self._client is None:
+            self._client = aioredis.from_url(
+                self.url,
+                socket_connect_timeout=0.5,
+                socket_timeout=0.5,
+            )
+        return self._client
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """
+        Get a cached response body.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached JSON bytes, or None on a miss or Redis error
+        """
+        if not self.enabled:
+            return None
+        try:
+            return await self._get_client().get(key)
+        except redis.RedisError as e:
+            logger.warning(f"Result cache get failed for {key}: {e}")
+            return None
+
+    async def set(self, key: str, value: bytes) -> None:
+        """
+        Cache a response body for ttl_s seconds.
+
+        Args:
+            key: Cache key
+            value: JSON bytes
+        """
+        if not self.enabled:
+            return
+        try:
+            await self._get_client().set(key, value, ex=self.ttl_s)
+        except redis.RedisError as e:
+            logger.warning(f"Result cache set failed for {key}: {e}")
+
+    def invalidate_video(self, video_id: str) -> None:
+        """
+        Drop all cached responses for a video.
+
+        Synchronous so it can be called from Celery workers when a result
+        is (re)written.
+
+        Args:
+            video_id: Video identifier
+        """
+        if not self.enabled:
+            return
+        try:
+            client = redis.Redis.from_url(self.url, socket_connect_timeout=0.5)
+            with client:
+                client.delete(analysis_cache_key(video_id), suggestions_cache_key(video_id))
+        except redis.RedisError as e:
+            logger.warning(f"Result cache invalidation failed for {video_id}: {e}")
+
+
+# Global result cache instance
+_result_cache: Optional[ResultCache] = None
+
+
+def get_result_cache() -> ResultCache:
+    """Get the global result cache instance."""
+    global _result_cache
+    if _result_cache is None:
+        _result_cache = ResultCache()
+    return _result_cache
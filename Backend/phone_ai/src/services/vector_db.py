@@ -21,13 +21,38 @@ except ImportError:
 logger = logging.getLogger(__name__)
 
 
+def normalize_embeddings(vectors: np.ndarray, copy: bool = True) -> np.ndarray:
+    """
+    L2-normalize embedding rows so inner product equals cosine similarity.
+    
+    Args:
+        vectors: Vectors of shape (n, dimension)
+        copy: If False and vectors is already a C-contiguous float32 array,
+            normalize it in place instead of copying
+            
+    Returns:
+        Normalized float32 array (zero vectors stay zero)
+    """
+    if copy:
+        vectors = np.array(vectors, dtype=np.float32, order="C")
+    else:
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    # faiss' SIMD kernel normalizes in place without the norm and
+    # division temporaries
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
 @dataclass
 class VectorDBConfig:
     """Configuration for the vector database."""
     dimension: int = 2048  # Default embedding dimension (ResNet50)
-    index_type: str = "flat"  # "flat" for exact search, "ivf" for approximate
+    index_type: str = "flat"  # "flat" for exact, "ivf"/"ivfpq" for approximate
     nlist: int = 100  # Number of clusters for IVF index
     nprobe: int = 10  # Number of clusters to search
+    pq_m: int = 64  # Sub-quantizers per vector for IVFPQ (must divide dimension)
+    pq_nbits: int = 8  # Bits per sub-quantizer code for IVFPQ
+    storage_dtype: str = "float32"  # "float32", "float16" or "int8" (scalar-quantized flat/ivf)
     index_path: Optional[str] = None  # Path to save/load index
     metadata_path: Optional[str] = None  # Path to save/load metadata
 
@@ -116,6 +141,16 @@ class IndexNotInitializedError(VectorDBError):
     pass
 
 
+# Index types built on an inverted file (have nprobe and need a direct map)
+_IVF_INDEX_TYPES = ("ivf", "ivfpq")
+
+# FAISS scalar quantizers for reduced-precision storage dtypes
+_SCALAR_QUANTIZERS = {
+    "int8": "SQ8",  # 1 byte per dimension, ranges learned in training
+    "float16": "SQfp16",  # 2 bytes per dimension, no training needed
+}
+
+
 class VectorDB:
     """
     FAISS-based vector database for video embedding storage and retrieval.
@@ -125,6 +160,10 @@ class VectorDB:
     - Cosine similarity search
     - Filtering by motion_type and subject_type
     - Persistence (save/load index and metadata)
+    
+    IVF and int8 indexes are trained automatically: until enough vectors
+    have been added to train on, they are kept (and searched exactly) in a
+    flat staging index, then moved into the trained index in insertion order.
     """
     
     def __init__(self, config: Optional[VectorDBConfig] = None):
@@ -141,6 +180,7 @@ class VectorDB:
         
         self.config = config or VectorDBConfig()
         self._index: Optional[faiss.Index] = None
+        self._staging: Optional[faiss.Index] = None
         self._metadata: list[VideoMetadata] = []
         self._id_to_idx: dict[str, int] = {}
         
@@ -151,18 +191,56 @@ class VectorDB:
         """Initialize the FAISS index based on configuration."""
         dimension = self.config.dimension
         
-        if self.config.index_type == "flat":
+        storage_dtype = self.config.storage_dtype
+        if storage_dtype != "float32" and storage_dtype not in _SCALAR_QUANTIZERS:
+            raise VectorDBError(f"Unknown storage dtype: {storage_dtype}")
+        scalar_quantizer = _SCALAR_QUANTIZERS.get(storage_dtype)
+        if scalar_quantizer and self.config.index_type not in ("flat", "ivf"):
+            raise VectorDBError(
+                f"{storage_dtype} storage is not supported for index type: "
+                f"{self.config.index_type}"
+            )
+        
+        if self.config.index_type == "flat" and scalar_quantizer:
+            # Exhaustive search over scalar-quantized vectors, decoded to
+            # float32 inside the distance kernel
+            self._index = faiss.index_factory(
+                dimension, scalar_quantizer, faiss.METRIC_INNER_PRODUCT
+            )
+        elif self.config.index_type == "flat":
             # Exact search using inner product (for normalized vectors = cosine similarity)
             self._index = faiss.IndexFlatIP(dimension)
+        elif self.config.index_type == "ivf" and scalar_quantizer:
+            self._index = faiss.index_factory(
+                dimension,
+                f"IVF{self.config.nlist},{scalar_quantizer}",
+                faiss.METRIC_INNER_PRODUCT,
+            )
         elif self.config.index_type == "ivf":
             # Approximate search using IVF
             quantizer = faiss.IndexFlatIP(dimension)
             self._index = faiss.IndexIVFFlat(
                 quantizer, dimension, self.config.nlist, faiss.METRIC_INNER_PRODUCT
             )
+        elif self.config.index_type == "ivfpq":
+            # Approximate search on product-quantized codes (pq_m bytes per
+            # vector at 8 bits instead of 4 * dimension)
+            if dimension % self.config.pq_m != 0:
+                raise VectorDBError(
+                    f"pq_m ({self.config.pq_m}) must divide dimension ({dimension})"
+                )
+            self._index = faiss.index_factory(
+                dimension,
+                f"IVF{self.config.nlist},PQ{self.config.pq_m}x{self.config.pq_nbits}",
+                faiss.METRIC_INNER_PRODUCT,
+            )
         else:
             raise VectorDBError(f"Unknown index type: {self.config.index_type}")
         
+        if self.config.index_type in _IVF_INDEX_TYPES:
+            faiss.extract_index_ivf(self._index).nprobe = self.config.nprobe
+        self._staging = None if self._index.is_trained else faiss.IndexFlatIP(dimension)
+        
         logger.info(f"Initialized FAISS index: type={self.config.index_type}, dim={dimension}")
 
     
@@ -178,26 +256,69 @@ class VectorDB:
         """Return the number of vectors in the index."""
         if self._index is None:
             return 0
-        return self._index.ntotal
+        return self._active_index.ntotal
     
-    def _normalize_vectors(self, vectors: np.ndarray) -> np.ndarray:
+    @property
+    def _active_index(self) -> "faiss.Index":
+        """Index currently holding the vectors (staging until trained)."""
+        return self._staging if self._staging is not None else self._index
+    
+    def _train_threshold(self) -> int:
+        """
+        Number of staged vectors needed before auto-training.
+        
+        IVF wants ~30 points per cluster; PQ additionally needs enough
+        points per sub-quantizer codebook (faiss recommends 39 per centroid),
+        and int8 storage needs enough points to estimate per-dimension ranges.
+        
+        Returns:
+            Minimum training set size for the configured index
+        """
+        threshold = 256 if self.config.storage_dtype == "int8" else 0
+        if self.config.index_type in _IVF_INDEX_TYPES:
+            threshold = max(threshold, 30 * self.config.nlist)
+        if self.config.index_type == "ivfpq":
+            threshold = max(threshold, 39 * (1 << self.config.pq_nbits))
+        return threshold
+    
+    def _add_vectors(self, vectors: np.ndarray) -> None:
+        """
+        Add normalized vectors, training the index once enough are staged.
+        
+        Args:
+            vectors: Normalized float32 vectors of shape (n, dimension)
+        """
+        if self._staging is None:
+            self._index.add(vectors)
+            return
+        
+        self._staging.add(vectors)
+        if self._staging.ntotal >= self._train_threshold():
+            staged = self._staging.reconstruct_n(0, self._staging.ntotal)
+            logger.info(f"Training index with {len(staged)} staged vectors")
+            self._index.train(staged)
+            self._index.add(staged)
+            self._staging = None
+    
+    def _normalize_vectors(self, vectors: np.ndarray, normalized: bool = False) -> np.ndarray:
         """
         Normalize vectors for cosine similarity.
         
         Args:
             vectors: Input vectors of shape (n, dimension)
+            normalized: Whether the caller already L2-normalized the rows
             
         Returns:
-            Normalized vectors
+            Normalized float32 vectors (zero vectors stay zero)
         """
-        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
-        # Avoid division by zero
-        norms = np.where(norms == 0, 1, norms)
-        return vectors / norms
+        if normalized:
+            return np.ascontiguousarray(vectors, dtype=np.float32)
+        # Copy so callers' arrays are left untouched
+        return normalize_embeddings(vectors)
     
     def train(self, vectors: np.ndarray) -> None:
         """
-        Train the index (required for IVF indexes).
+        Train the index (required for IVF and int8 indexes).
         
         Args:
             vectors: Training vectors of shape (n, dimension)
@@ -205,7 +326,7 @@ class VectorDB:
         if self._index is None:
             raise IndexNotInitializedError("Index not initialized")
         
-        if self.config.index_type == "flat":
+        if self.config.index_type == "flat" and self.config.storage_dtype != "int8":
             # Flat index doesn't need training
             return
         
@@ -215,6 +336,12 @@ class VectorDB:
         logger.info(f"Training index with {len(vectors)} vectors")
         self._index.train(vectors)
         logger.info("Index training complete")
+        
+        # Move anything staged so far into the trained index
+        if self._staging is not None:
+            if self._staging.ntotal:
+                self._index.add(self._staging.reconstruct_n(0, self._staging.ntotal))
+            self._staging = None
     
     def add(
         self,
@@ -233,42 +360,15 @@ class VectorDB:
         Returns:
             Index position of the added vector
         """
-        if self._index is None:
-            raise IndexNotInitializedError("Index not initialized")
-        
-        # Check if video already exists
-        if video_id in self._id_to_idx:
-            logger.warning(f"Video {video_id} already exists, skipping")
-            return self._id_to_idx[video_id]
-        
-        # Prepare embedding
         embedding = np.asarray(embedding, dtype=np.float32).reshape(1, -1)
-        
-        if embedding.shape[1] != self.config.dimension:
-            raise VectorDBError(
-                f"Embedding dimension mismatch: expected {self.config.dimension}, "
-                f"got {embedding.shape[1]}"
-            )
-        
-        # Normalize for cosine similarity
-        embedding = self._normalize_vectors(embedding)
-        
-        # Add to index
-        idx = self._index.ntotal
-        self._index.add(embedding)
-        
-        # Store metadata
-        self._metadata.append(metadata)
-        self._id_to_idx[video_id] = idx
-        
-        logger.debug(f"Added video {video_id} at index {idx}")
-        return idx
+        return self.add_batch([video_id], embedding, [metadata])[0]
     
     def add_batch(
         self,
         video_ids: list[str],
         embeddings: np.ndarray,
         metadata_list: list[VideoMetadata],
+        normalized: bool = False,
     ) -> list[int]:
         """
         Add multiple video embeddings to the index.
@@ -277,18 +377,53 @@ class VectorDB:
             video_ids: List of unique identifiers
             embeddings: Embedding vectors of shape (n, dimension)
             metadata_list: List of associated metadata
+            normalized: Whether the embeddings are already L2-normalized
+                (e.g. via normalize_embeddings); skips the normalizing copy
             
         Returns:
             List of index positions
         """
+        if self._index is None:
+            raise IndexNotInitializedError("Index not initialized")
+        
         if len(video_ids) != len(embeddings) or len(video_ids) != len(metadata_list):
             raise VectorDBError("Mismatched lengths for video_ids, embeddings, and metadata")
         
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if embeddings.ndim != 2 or embeddings.shape[1] != self.config.dimension:
+            raise VectorDBError(
+                f"Embedding dimension mismatch: expected {self.config.dimension}, "
+                f"got {embeddings.shape[-1] if embeddings.ndim else 0}"
+            )
+        
+        # Assign positions; existing (or repeated) ids keep their first position
+        start = self.size
+        new_ids: dict[str, int] = {}
+        new_rows = []
         indices = []
-        for video_id, embedding, metadata in zip(video_ids, embeddings, metadata_list):
-            idx = self.add(video_id, embedding, metadata)
+        for row, video_id in enumerate(video_ids):
+            idx = self._id_to_idx.get(video_id, new_ids.get(video_id))
+            if idx is not None:
+                logger.warning(f"Video {video_id} already exists, skipping")
+            else:
+                idx = new_ids[video_id] = start + len(new_rows)
+                new_rows.append(row)
             indices.append(idx)
         
+        if not new_rows:
+            return indices
+        
+        if len(new_rows) != len(video_ids):
+            embeddings = embeddings[new_rows]
+        
+        # Normalize for cosine similarity and add in a single FAISS call
+        self._add_vectors(self._normalize_vectors(embeddings, normalized))
+        
+        # Store metadata
+        self._metadata.extend(metadata_list[row] for row in new_rows)
+        self._id_to_idx.update(new_ids)
+        
+        logger.debug(f"Added {len(new_rows)} videos at indices {start}-{start + len(new_rows) - 1}")
         return indices
 
     
@@ -297,6 +432,8 @@ class VectorDB:
         query_embedding: np.ndarray,
         top_k: int = 5,
         filters: Optional[RetrievalFilters] = None,
+        normalized: bool = False,
+        exclude_ids: Optional[set[str]] = None,
     ) -> list[SearchResult]:
         """
         Search for similar videos using cosine similarity.
@@ -305,6 +442,9 @@ class VectorDB:
             query_embedding: Query vector of shape (dimension,)
             top_k: Number of results to return
             filters: Optional filters for motion_type, subject_type
+            normalized: Whether the query is already L2-normalized
+            exclude_ids: Video ids to leave out of the results (e.g. the
+                query video itself); still up to top_k results are returned
             
         Returns:
             List of SearchResult objects sorted by similarity (descending)
@@ -312,7 +452,8 @@ class VectorDB:
         if self._index is None:
             raise IndexNotInitializedError("Index not initialized")
         
-        if self._index.ntotal == 0:
+        index = self._active_index
+        if index.ntotal == 0:
             return []
         
         # Prepare query
@@ -325,19 +466,19 @@ class VectorDB:
             )
         
         # Normalize for cosine similarity
-        query = self._normalize_vectors(query)
-        
-        # Set nprobe for IVF index
-        if self.config.index_type == "ivf":
-            self._index.nprobe = self.config.nprobe
+        query = self._normalize_vectors(query, normalized)
         
-        # Search more than top_k to account for filtering
-        search_k = min(top_k * 3, self._index.ntotal) if filters else top_k
+        # Search more than top_k to account for filtering; each excluded id
+        # can take at most one candidate slot
+        search_k = min(top_k * 3, index.ntotal) if filters else top_k
+        if exclude_ids:
+            search_k = min(search_k + len(exclude_ids), index.ntotal)
         
-        # Perform search
-        scores, indices = self._index.search(query, search_k)
-        scores = scores[0]  # Remove batch dimension
-        indices = indices[0]
+        # Perform search (nprobe is set on the IVF index at init/load)
+        scores, indices = index.search(query, search_k)
+        # Remove batch dimension; plain lists iterate faster than arrays
+        scores = scores[0].tolist()
+        indices = indices[0].tolist()
         
         # Build results with filtering
         results = []
@@ -355,6 +496,9 @@ class VectorDB:
             
             metadata = self._metadata[idx]
             
+            if exclude_ids and metadata.video_id in exclude_ids:
+                continue
+            
             # Apply filters
             if filters and not filters.matches(metadata):
                 continue
@@ -435,8 +579,8 @@ class VectorDB:
         Path(index_path).parent.mkdir(parents=True, exist_ok=True)
         Path(metadata_path).parent.mkdir(parents=True, exist_ok=True)
         
-        # Save FAISS index
-        faiss.write_index(self._index, index_path)
+        # Save FAISS index (the staging index if not trained yet)
+        faiss.write_index(self._active_index, index_path)
         logger.info(f"Saved FAISS index to {index_path}")
         
         # Save metadata
@@ -448,6 +592,10 @@ class VectorDB:
                 "index_type": self.config.index_type,
                 "nlist": self.config.nlist,
                 "nprobe": self.config.nprobe,
+                "pq_m": self.config.pq_m,
+                "pq_nbits": self.config.pq_nbits,
+                "storage_dtype": self.config.storage_dtype,
+                "staged": self._staging is not None,
             }
         }
         with open(metadata_path, "w", encoding="utf-8") as f:
@@ -473,10 +621,6 @@ class VectorDB:
         if not os.path.exists(metadata_path):
             raise VectorDBError(f"Metadata file not found: {metadata_path}")
         
-        # Load FAISS index
-        self._index = faiss.read_index(index_path)
-        logger.info(f"Loaded FAISS index from {index_path}")
-        
         # Load metadata
         with open(metadata_path, "r", encoding="utf-8") as f:
             metadata_data = json.load(f)
@@ -490,6 +634,22 @@ class VectorDB:
         self.config.index_type = saved_config.get("index_type", self.config.index_type)
         self.config.nlist = saved_config.get("nlist", self.config.nlist)
         self.config.nprobe = saved_config.get("nprobe", self.config.nprobe)
+        self.config.pq_m = saved_config.get("pq_m", self.config.pq_m)
+        self.config.pq_nbits = saved_config.get("pq_nbits", self.config.pq_nbits)
+        self.config.storage_dtype = saved_config.get("storage_dtype", "float32")
+        
+        # Load FAISS index
+        index = faiss.read_index(index_path)
+        if saved_config.get("staged"):
+            # Saved before training: keep staging, start a fresh IVF index
+            self._init_index()
+            self._staging = index
+        else:
+            self._index = index
+            self._staging = None
+            if self.config.index_type in _IVF_INDEX_TYPES:
+                faiss.extract_index_ivf(index).nprobe = self.config.nprobe
+        logger.info(f"Loaded FAISS index from {index_path}")
         
         logger.info(f"Loaded {len(self._metadata)} video entries from {metadata_path}")
     
@@ -509,25 +669,34 @@ class VectorDB:
         if self._index is None:
             raise IndexNotInitializedError("Index not initialized")
         
-        # Collect valid entries
-        valid_entries = []
-        for video_id, idx in list(self._id_to_idx.items()):
-            metadata = self._metadata[idx]
-            if metadata.video_id != "__removed__":
-                # Get the embedding from the index
-                embedding = self._index.reconstruct(idx)
-                valid_entries.append((video_id, embedding, metadata))
+        index = self._active_index
+        if index is self._index and self.config.index_type in _IVF_INDEX_TYPES:
+            # IVF indexes need an id -> list map to reconstruct by position
+            faiss.extract_index_ivf(index).make_direct_map()
+        
+        # Collect valid entries (in index order)
+        positions = sorted(
+            idx for idx in self._id_to_idx.values()
+            if self._metadata[idx].video_id != "__removed__"
+        )
+        metadata_list = [self._metadata[idx] for idx in positions]
+        video_ids = [metadata.video_id for metadata in metadata_list]
+        
+        # Reconstruct the surviving embeddings into one contiguous matrix
+        embeddings = np.empty((len(positions), self.config.dimension), dtype=np.float32)
+        if positions:
+            index.reconstruct_batch(np.asarray(positions, dtype=np.int64), embeddings)
         
         # Reinitialize
         self._init_index()
         self._metadata = []
         self._id_to_idx = {}
         
-        # Re-add valid entries
-        for video_id, embedding, metadata in valid_entries:
-            self.add(video_id, embedding, metadata)
+        # Re-add valid entries in a single batch
+        if positions:
+            self.add_batch(video_ids, embeddings, metadata_list)
         
-        logger.info(f"Rebuilt index with {len(valid_entries)} entries")
+        logger.info(f"Rebuilt index with {len(positions)} entries")
 
 
 def create_vector_db(config: Optional[VectorDBConfig] = None) -> VectorDB:
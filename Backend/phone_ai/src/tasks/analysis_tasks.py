@@ -252,6 +252,10 @@ def _store_analysis_result(video_id: str, result: dict) -> None:
                 task.instruction_card = result.get("instruction_card")
                 task.error_message = result.get("error")
                 session.commit()
+        
+        # Drop any cached responses so readers see the new result
+        from src.services.result_cache import get_result_cache
+        get_result_cache().invalidate_video(video_id)
                 
     except Exception as e:
         logger.error(f"Failed to store analysis result: {e}")
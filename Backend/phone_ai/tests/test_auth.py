@@ -0,0 +1,147 @@
+"""
+Tests for authentication and rate limiting.
+"""
+import types
+
+import pytest
+
+from src.api import auth
+from src.api.auth import RateLimiter
+
+
+class FakeClock:
+    """Controllable stand-in for the time module used by src.api.auth."""
+
+    def __init__(self, now: float):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Freeze auth's clock at the start of a rate-limit window (t=600s)."""
+    fake = FakeClock(600.0)
+    monkeypatch.setattr(auth, "time", types.SimpleNamespace(time=fake.time))
+    return fake
+
+
+class TestRateLimiter:
+    """Tests for the in-memory sliding window rate limiter."""
+
+    def test_limit_per_window(self, clock):
+        limiter = RateLimiter(requests_per_minute=3)
+        results = [limiter.is_allowed("user:1") for _ in range(4)]
+        assert results == [(True, 2), (True, 1), (True, 0), (False, 0)]
+        # Other keys have their own budget
+        assert limiter.is_allowed("user:2") == (True, 2)
+
+    def test_window_rollover_weights_previous_window(self, clock):
+        limiter = RateLimiter(requests_per_minute=3)
+        for _ in range(3):
+            limiter.is_allowed("user:1")
+
+        # Halfway into the next window the previous 3 requests count as 1.5
+        clock.now = 690.0
+        assert limiter.is_allowed("user:1")[0]
+        assert limiter.is_allowed("user:1")[0]
+        assert not limiter.is_allowed("user:1")[0]
+
+        # Two windows later the old requests no longer count at all
+        clock.now = 780.0
+        assert limiter.is_allowed("user:1") == (True, 2)
+
+    async def test_retry_after_next_window(self, clock):
+        limiter = RateLimiter(requests_per_minute=3)
+        for _ in range(3):
+            await limiter.check("user:1")
+
+        # The full current window has to slide out: allowed just after t=660
+        assert await limiter.check("user:1") == (False, 0, 61)
+
+    async def test_retry_after_within_window(self, clock):
+        limiter = RateLimiter(requests_per_minute=4)
+        clock.now = 590.0
+        for _ in range(4):
+            await limiter.check("user:1")
+
+        clock.now = 630.0
+        assert (await limiter.check("user:1"))[0]
+        assert (await limiter.check("user:1"))[0]
+        # Estimate is 4 * 0.5 + 2 = 4; it drops below 4 right after t=630
+        allowed, _, retry_after = await limiter.check("user:1")
+        assert not allowed
+        assert retry_after == 1
+
+        clock.now += retry_after
+        assert (await limiter.check("user:1"))[0]
+
+    def test_retry_after_unknown_key(self, clock):
+        assert RateLimiter().get_retry_after("user:unknown") == 0
+
+    def test_sweep_evicts_idle_keys(self, clock):
+        limiter = RateLimiter(requests_per_minute=3)
+        limiter.is_allowed("idle")
+        clock.now = 720.0
+        limiter.is_allowed("recent")
+
+        # At t=780 "idle" was last seen two windows ago, "recent" one ago
+        clock.now = 780.0
+        assert limiter.sweep() == 1
+        assert set(limiter._windows) == {"recent"}
+
+    def test_sweep_runs_periodically(self, clock, monkeypatch):
+        monkeypatch.setattr(auth, "_SWEEP_INTERVAL", 2)
+        limiter = RateLimiter(requests_per_minute=3)
+        limiter.is_allowed("idle")
+
+        clock.now = 780.0
+        limiter.is_allowed("active")
+        assert set(limiter._windows) == {"active"}
+
+
+@pytest.fixture
+def token_state(monkeypatch):
+    """Start each token test with an empty decode cache and denylist."""
+    auth._decode_token.cache_clear()
+    monkeypatch.setattr(auth, "_revoked_tokens", {})
+    yield
+    auth._decode_token.cache_clear()
+
+
+class TestTokens:
+    """Tests for cached token verification and revocation."""
+
+    def test_verify_token_caches_decode(self, token_state):
+        token = auth.create_access_token({"sub": "user-1", "username": "alice"})
+        assert auth.verify_token(token).user_id == "user-1"
+        assert auth.verify_token(token).username == "alice"
+        assert auth._decode_token.cache_info().hits == 1
+
+    def test_revoked_token_rejected_when_cached(self, token_state):
+        token = auth.create_access_token({"sub": "user-1", "username": "alice"})
+        auth.verify_token(token)
+
+        assert auth.revoke_token(token)
+        with pytest.raises(auth.HTTPException) as exc_info:
+            auth.verify_token(token)
+        assert exc_info.value.status_code == 401
+        assert "revoked" in exc_info.value.detail
+        assert auth._decode_token.cache_info().hits >= 1
+
+    def test_expired_token_rejected_when_cached(self, token_state, monkeypatch):
+        token = auth.create_access_token(
+            {"sub": "user-1", "username": "alice"},
+            expires_delta=auth.timedelta(seconds=5),
+        )
+        auth.verify_token(token)
+
+        expires_at = auth._decode_token(token)[1]
+        fake = FakeClock(expires_at + 1)
+        monkeypatch.setattr(auth, "time", types.SimpleNamespace(time=fake.time))
+        with pytest.raises(auth.HTTPException) as exc_info:
+            auth.verify_token(token)
+        assert exc_info.value.status_code == 401
+        assert "expired" in exc_info.value.detail
+        assert auth._decode_token.cache_info().hits >= 2
@@ -233,6 +233,7 @@ class TestProcess(TestHeuristicAnalyzerAgent):
         assert result.video_id == "test-001"
         assert result.time_range == (0.0, 10.0)
         assert result.is_valid()
+        assert result.validated
     
     @pytest.mark.asyncio
     async def test_process_all_indicators_in_range(self, agent, sample_feature_output):
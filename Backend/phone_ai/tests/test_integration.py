@@ -8,6 +8,8 @@ Requirements covered:
 - 7.1: Trigger agents in sequence
 """
 import asyncio
+import io
+import json
 import os
 import tempfile
 import pytest
@@ -520,6 +522,30 @@ class TestPipelineResultSerialization:
         
         result_dict = result.to_dict()
         assert result_dict["error"] == "Test error message"
+    
+    def test_pipeline_result_write_json(
+        self,
+        mock_uploader_output,
+        mock_feature_output,
+        mock_heuristic_output,
+        mock_metadata_output,
+        mock_instruction_card,
+    ):
+        """Test that the streamed JSON matches to_dict()."""
+        result = PipelineResult(
+            video_id="test-video-001",
+            uploader_output=mock_uploader_output,
+            feature_output=mock_feature_output,
+            heuristic_output=mock_heuristic_output,
+            metadata_output=mock_metadata_output,
+            instruction_card=mock_instruction_card,
+            error="partial",
+        )
+        
+        buffer = io.BytesIO()
+        result.write_json(buffer)
+        
+        assert json.loads(buffer.getvalue()) == result.to_dict()
 
 
 # ============================================================================
@@ -1,23 +1,33 @@
 """
 Tests for the Metadata Synthesizer Agent.
 """
+import dataclasses
 import json
+import numpy as np
 import pytest
 
 from src.models.data_types import (
     BBox,
     ExifData,
+    FramingData,
     HeuristicOutput,
     MetadataOutput,
+    MotionParams,
 )
 from src.models.enums import MotionType, SpeedProfile, SuggestedScale
+from src.schemas.metadata_model import is_valid_metadata_output
 from src.schemas.validator import (
     SchemaValidator,
     validate_metadata_output,
     load_metadata_schema,
 )
 from src.agents.motion_rules import (
+    MOTION_TYPE_CODES,
+    SPEED_PROFILE_CODES,
+    SUGGESTED_SCALE_CODES,
+    MotionRulesConfig,
     MotionTypeInferrer,
+    infer_motion_batch,
     infer_motion_type_from_heuristics,
 )
 from src.agents.prompt_templates import (
@@ -26,9 +36,12 @@ from src.agents.prompt_templates import (
     parse_llm_response,
 )
 from src.agents.metadata_synthesizer import (
+    MetadataGenerationPipeline,
     MetadataSynthesizerAgent,
     MetadataSynthesizerConfig,
+    create_metadata_pipeline,
 )
+from src.services.llm_client import LLMConfig, MockLLMClient
 
 
 @pytest.fixture
@@ -125,6 +138,23 @@ class TestSchemaValidation:
         is_valid, errors = validator.validate_metadata(valid)
         assert is_valid, f"Errors: {errors}"
 
+    def test_compiled_model_agrees_with_schema(self, validator):
+        metadata = MetadataOutput(
+            time_range=(0.0, 10.0),
+            motion_type=MotionType.PAN,
+            motion_params=MotionParams(10.0, 0.15, SpeedProfile.LINEAR, 0.75),
+            framing=FramingData(BBox(0.2, 0.2, 0.4, 0.4), 0.35, SuggestedScale.MEDIUM),
+            beat_alignment_score=0.6,
+            confidence=0.85,
+            explainability="测试说明。",
+        )
+        assert is_valid_metadata_output(metadata)
+        assert validator.validate_metadata(metadata.to_dict())[0]
+
+        metadata.confidence = 1.5
+        assert not is_valid_metadata_output(metadata)
+        assert not validator.validate_metadata(metadata.to_dict())[0]
+
 
 class TestMotionTypeInference:
     def test_static_shot(self, static_heuristic):
@@ -142,17 +172,69 @@ class TestMotionTypeInference:
         assert inferrer.infer_suggested_scale(0.15) == SuggestedScale.MEDIUM
         assert inferrer.infer_suggested_scale(0.05) == SuggestedScale.WIDE
 
+    def test_cached_inferrer_is_shared(self):
+        assert MotionTypeInferrer.from_config_cached() is MotionTypeInferrer.from_config_cached()
+        custom = MotionRulesConfig(static_threshold=8.0)
+        inferrer = MotionTypeInferrer.from_config_cached(custom)
+        assert inferrer is MotionTypeInferrer.from_config_cached(MotionRulesConfig(static_threshold=8.0))
+        assert inferrer.config.static_threshold == 8.0
+
+    def test_batch_matches_scalar(self, sample_heuristic, static_heuristic, handheld_heuristic):
+        heuristics = [sample_heuristic, static_heuristic, handheld_heuristic] * 2
+        directions = [None, None, None, 0.0, 95.0, 180.0]
+        mt, sp, sc, conf = infer_motion_batch(
+            np.array([h.avg_motion_px_per_s for h in heuristics]),
+            np.array([h.frame_pct_change for h in heuristics]),
+            np.array([h.motion_smoothness for h in heuristics]),
+            np.array([h.subject_occupancy for h in heuristics]),
+            np.array([np.nan if d is None else d for d in directions]),
+        )
+        for i, (h, d) in enumerate(zip(heuristics, directions)):
+            expected = infer_motion_type_from_heuristics(h, d)
+            assert MOTION_TYPE_CODES[mt[i]] == expected[0]
+            assert SPEED_PROFILE_CODES[sp[i]] == expected[1]
+            assert SUGGESTED_SCALE_CODES[sc[i]] == expected[2]
+            assert conf[i] == pytest.approx(expected[3])
+
 
 class TestPromptTemplates:
     def test_few_shot_prompt(self, sample_heuristic, sample_exif):
         prompt = build_few_shot_prompt(sample_heuristic, sample_exif, num_examples=3)
         assert "avg_motion_px_per_s" in prompt
 
+    def test_prompt_accepts_numpy_values(self, sample_heuristic, sample_exif):
+        heuristic = dataclasses.replace(
+            sample_heuristic,
+            avg_motion_px_per_s=np.float64(sample_heuristic.avg_motion_px_per_s),
+            frame_pct_change=np.float64(sample_heuristic.frame_pct_change),
+        )
+        prompt = build_few_shot_prompt(heuristic, sample_exif, num_examples=1)
+        assert "avg_motion_px_per_s" in prompt
+
     def test_parse_json_response(self):
         response = '{"motion": {"type": "static"}, "confidence": 0.9}'
         result = parse_llm_response(response)
         assert result["motion"]["type"] == "static"
 
+    def test_parse_code_block_response(self):
+        response = '说明如下：\n```json\n{"motion": {"type": "pan"}}\n```\n以上。'
+        assert parse_llm_response(response)["motion"]["type"] == "pan"
+
+    def test_parse_embedded_object_with_braces_in_strings(self):
+        response = 'Result: {"explainability": "a } b \\" {", "confidence": 0.8} done'
+        result = parse_llm_response(response)
+        assert result["confidence"] == 0.8
+        assert result["explainability"] == 'a } b " {'
+
+    def test_parse_truncated_object_fails(self):
+        # The inner fragment must not be mistaken for the metadata
+        with pytest.raises(ValueError):
+            parse_llm_response('{"outer": {"inner": 1}')
+
+    def test_parse_skips_non_json_braces(self):
+        response = 'Template {name} filled: {"confidence": 0.6}'
+        assert parse_llm_response(response)["confidence"] == 0.6
+
 
 class TestMetadataGenerationPipeline:
     @pytest.mark.asyncio
@@ -193,6 +275,74 @@ class TestMetadataGenerationPipeline:
         assert metadata is not None
         assert 0.0 <= metadata.confidence <= 1.0
 
+    def test_run_sync_reuses_loop(self, sample_heuristic):
+        pipeline = create_metadata_pipeline(use_llm=False)
+        first = pipeline.run_sync(sample_heuristic)
+        loop = pipeline._thread_state.loop
+        second = pipeline.run_sync(sample_heuristic)
+        assert pipeline._thread_state.loop is loop
+        assert first.motion_type == second.motion_type
+
+    @pytest.mark.asyncio
+    async def test_response_cache_skips_llm(self, sample_heuristic):
+        client = MockLLMClient(LLMConfig())
+        pipeline = MetadataGenerationPipeline(llm_client=client)
+        first = await pipeline.run(sample_heuristic)
+        other_clip = HeuristicOutput(
+            video_id="test_video_002", time_range=(20.0, 32.0),
+            avg_motion_px_per_s=50.01, frame_pct_change=0.15,
+            motion_smoothness=0.75, subject_occupancy=0.35,
+            beat_alignment_score=0.6,
+        )
+        second = await pipeline.run(other_clip)
+        assert client.call_count == 1
+        assert second.explainability == first.explainability
+        assert second.time_range == (20.0, 32.0)
+        assert second.motion_params.duration_s == 12.0
+
+    @pytest.mark.asyncio
+    async def test_response_cache_skips_rule_fallback(self, sample_heuristic):
+        # An unparseable answer falls back to rules and must not be cached
+        client = MockLLMClient(LLMConfig(), responses={"": "not json"})
+        pipeline = MetadataGenerationPipeline(llm_client=client)
+        first = await pipeline.run(sample_heuristic)
+        client.responses = {}
+        second = await pipeline.run(sample_heuristic)
+        assert client.call_count == 2
+        assert second.explainability != first.explainability
+
+    @pytest.mark.asyncio
+    async def test_response_cache_returns_copies(self, sample_heuristic):
+        pipeline = MetadataGenerationPipeline(llm_client=MockLLMClient(LLMConfig()))
+        first = await pipeline.run(sample_heuristic)
+        first.explainability = "changed"
+        first.framing.subject_bbox.x = 0.9
+        second = await pipeline.run(sample_heuristic)
+        assert second.explainability != "changed"
+        assert second.framing.subject_bbox.x != 0.9
+
+    def test_run_batch_keeps_order(self, sample_heuristic, handheld_heuristic):
+        client = MockLLMClient(LLMConfig())
+        pipeline = MetadataGenerationPipeline(
+            config=MetadataSynthesizerConfig(response_cache_size=0, batch_size=2),
+            llm_client=client,
+        )
+        clips = [sample_heuristic, handheld_heuristic, sample_heuristic]
+        results = pipeline.run_batch_sync(clips)
+        assert client.call_count == 3
+        assert [r.time_range for r in results] == [c.time_range for c in clips]
+        with pytest.raises(ValueError):
+            pipeline.run_batch_sync(clips, primary_directions=[0.0])
+
+    @pytest.mark.asyncio
+    async def test_confident_rules_skip_llm(self, static_heuristic):
+        client = MockLLMClient(LLMConfig())
+        pipeline = MetadataGenerationPipeline(llm_client=client)
+        result = await pipeline.run(static_heuristic)
+        assert client.call_count == 0
+        assert result.motion_type == MotionType.STATIC
+        assert result.explainability
+
 
 class TestConfidenceScore:
     @pytest.mark.asyncio
@@ -1,17 +1,26 @@
 """
 Unit tests for core data models and enums.
 """
+import json
+import time
+import uuid
+
 import pytest
+from src.models.database import _uuid7
 from src.models.enums import MotionType, SpeedProfile, SuggestedScale
 from src.models.data_types import (
     BBox,
     ExifData,
+    FeatureOutput,
     HeuristicOutput,
+    OpticalFlowData,
     MotionParams,
     FramingData,
     MetadataOutput,
     AdvancedParams,
     InstructionCard,
+    SubjectTrackingData,
+    normalize_bbox_array,
 )
 
 
@@ -70,6 +79,71 @@ class TestBBox:
             BBox.from_list([0.1, 0.2, 0.3])
 
 
+class TestSubjectTrackingData:
+    """Tests for SubjectTrackingData dataclass."""
+    
+    def test_bbox_array(self):
+        """Test packing the bbox sequence into an (N, 4) array."""
+        tracking = SubjectTrackingData(bbox_sequence=[
+            BBox(x=0.1, y=0.2, w=0.3, h=0.4),
+            BBox(x=0.5, y=0.5, w=0.2, h=0.2),
+        ])
+        boxes = tracking.bbox_array()
+        assert boxes.shape == (2, 4)
+        assert boxes.tolist() == [[0.1, 0.2, 0.3, 0.4], [0.5, 0.5, 0.2, 0.2]]
+    
+    def test_bbox_array_empty(self):
+        """Test an empty bbox sequence gives a (0, 4) array."""
+        assert SubjectTrackingData().bbox_array().shape == (0, 4)
+    
+    def test_normalize_bbox_array_matches_normalize(self):
+        """Test the vectorized normalization agrees with BBox.normalize."""
+        bboxes = [
+            BBox(x=-0.1, y=0.2, w=1.5, h=0.4),
+            BBox(x=0.8, y=1.2, w=0.3, h=-0.4),
+            BBox(x=0.1, y=0.2, w=0.3, h=0.4),
+        ]
+        boxes = SubjectTrackingData(bbox_sequence=bboxes).bbox_array()
+        normalized = normalize_bbox_array(boxes).tolist()
+        for row, bbox in zip(normalized, bboxes):
+            assert row == pytest.approx(bbox.normalize().to_list())
+    
+    def test_valid_bbox_mask_matches_is_valid(self):
+        """Test the vectorized validity mask agrees with BBox.is_valid."""
+        bboxes = [
+            BBox(x=0.1, y=0.2, w=0.3, h=0.4),
+            BBox(x=-0.1, y=0.2, w=0.3, h=0.4),
+            BBox(x=0.8, y=0.2, w=0.3, h=0.4),
+            BBox(x=0.1, y=0.8, w=0.3, h=0.4),
+        ]
+        mask = SubjectTrackingData(bbox_sequence=bboxes).valid_bbox_mask()
+        assert mask.tolist() == [bbox.is_valid() for bbox in bboxes]
+
+
+class TestOpticalFlowData:
+    """Tests for OpticalFlowData dataclass."""
+    
+    def test_equality(self):
+        """Test equal flow data compares equal despite the array field."""
+        flow = OpticalFlowData(1.0, 0.0, [(1, 2), (3, 4)])
+        assert flow == OpticalFlowData(1.0, 0.0, [(1, 2), (3, 4)])
+        assert flow != OpticalFlowData(1.0, 0.0, [(1, 2), (3, 5)])
+        assert flow != OpticalFlowData(2.0, 0.0, [(1, 2), (3, 4)])
+        assert OpticalFlowData(1.0, 0.0) == OpticalFlowData(1.0, 0.0)
+    
+    def test_feature_output_equality(self):
+        """Test outputs holding flow data compare without raising."""
+        def build(vectors):
+            return FeatureOutput(
+                video_id="test-001",
+                optical_flow=OpticalFlowData(1.0, 0.0, vectors),
+                subject_tracking=SubjectTrackingData(),
+            )
+        
+        assert build([(1, 2)]) == build([(1, 2)])
+        assert build([(1, 2)]) != build([(2, 1)])
+
+
 class TestEnums:
     """Tests for enum types."""
     
@@ -109,6 +183,45 @@ class TestHeuristicOutput:
         )
         assert output.is_valid()
     
+    def test_is_valid_remembers_pass(self):
+        """Test a passing check is recorded and a failing one is not."""
+        output = HeuristicOutput(
+            video_id="test-001",
+            time_range=(0.0, 10.0),
+            avg_motion_px_per_s=50.0,
+            frame_pct_change=1.5,
+            motion_smoothness=0.75,
+            subject_occupancy=0.35,
+            beat_alignment_score=0.8,
+        )
+        assert not output.is_valid()
+        assert not output.validated
+        
+        output.frame_pct_change = 0.15
+        assert output.is_valid()
+        assert output.validated
+    
+    def test_mutation_invalidates_remembered_pass(self):
+        """Test assigning a field after a passing check re-runs it."""
+        output = HeuristicOutput(
+            video_id="test-001",
+            time_range=(0.0, 10.0),
+            avg_motion_px_per_s=50.0,
+            frame_pct_change=0.15,
+            motion_smoothness=0.75,
+            subject_occupancy=0.35,
+            beat_alignment_score=0.8,
+        )
+        assert output.is_valid()
+        
+        output.motion_smoothness = 2.0
+        assert not output.validated
+        assert not output.is_valid()
+        
+        output.motion_smoothness = 0.5
+        output.time_range = (5.0, 1.0)
+        assert not output.is_valid()
+    
     def test_invalid_frame_pct_change(self):
         """Test invalid frame_pct_change."""
         output = HeuristicOutput(
@@ -169,3 +282,48 @@ class TestInstructionCard:
             ),
         )
         assert not card.is_complete()
+
+
+class TestMetadataOutput:
+    """Tests for MetadataOutput dataclass."""
+    
+    def test_to_json_round_trip(self):
+        """Test JSON output parses back to to_dict() and keeps non-ASCII text."""
+        metadata = MetadataOutput(
+            time_range=(0.0, 5.0),
+            motion_type=MotionType.DOLLY_IN,
+            motion_params=MotionParams(
+                duration_s=5.0,
+                frame_pct_change=0.2,
+                speed_profile=SpeedProfile.EASE_IN_OUT,
+                motion_smoothness=0.8,
+            ),
+            framing=FramingData(
+                subject_bbox=BBox(x=0.1, y=0.2, w=0.3, h=0.4),
+                subject_occupancy=0.12,
+                suggested_scale=SuggestedScale.MEDIUM,
+            ),
+            beat_alignment_score=0.5,
+            confidence=0.9,
+            explainability="镜头缓慢推进",
+        )
+        text = metadata.to_json()
+        assert "镜头缓慢推进" in text
+        assert json.loads(text) == metadata.to_dict()
+
+
+class TestUUID7:
+    """Tests for the time-ordered primary key generator."""
+    
+    def test_version_and_variant(self):
+        """Test generated IDs are RFC 9562 version 7 UUIDs."""
+        value = _uuid7()
+        assert value.version == 7
+        assert value.variant == uuid.RFC_4122
+    
+    def test_ordered_by_creation_time(self):
+        """Test IDs from later milliseconds sort after earlier ones."""
+        first = _uuid7()
+        time.sleep(0.002)
+        second = _uuid7()
+        assert first < second
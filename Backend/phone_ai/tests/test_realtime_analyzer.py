@@ -134,6 +134,23 @@ class TestRealtimeAnalyzerUnit:
         assert decoded.shape[1] == 100
         assert decoded.shape[2] == 3
     
+    def test_decode_base64_jpeg_reduced(self):
+        """Test large JPEGs are scaled down while decoding."""
+        import base64
+        import cv2
+        
+        analyzer = RealtimeAnalyzer()
+        
+        # 4x the default 320x240 target resolution
+        test_frame = np.zeros((960, 1280, 3), dtype=np.uint8)
+        _, jpeg_bytes = cv2.imencode('.jpg', test_frame)
+        b64_string = base64.b64encode(jpeg_bytes).decode('utf-8')
+        
+        decoded = analyzer.decode_base64_jpeg(b64_string)
+        
+        assert decoded is not None
+        assert decoded.shape == (240, 320, 3)
+    
     def test_decode_invalid_base64(self):
         """Test handling of invalid Base64 input."""
         analyzer = RealtimeAnalyzer()
@@ -162,6 +179,59 @@ class TestRealtimeAnalyzerUnit:
         assert timestamps[0] == 0.0
         assert abs(timestamps[1] - 0.033) < 0.001
     
+    def test_frame_buffer_evicts_oldest(self):
+        """Test the ring buffer keeps the newest frames in order once full."""
+        buffer = FrameBuffer(capacity=3)
+        
+        for i in range(5):
+            buffer.add_frame(np.full((4, 4, 3), i, dtype=np.uint8), i * 0.5)
+        
+        assert buffer.size() == 3
+        assert [int(f[0, 0, 0]) for f in buffer.get_frames()] == [2, 3, 4]
+        assert buffer.get_timestamps().tolist() == [1.0, 1.5, 2.0]
+    
+    def test_frame_buffer_taken_frames_stay_stable(self):
+        """Test frames taken from the ring are unchanged by later adds."""
+        buffer = FrameBuffer(capacity=3)
+        for i in range(3):
+            buffer.add_frame(np.full((4, 4, 3), i, dtype=np.uint8), float(i))
+        
+        frames = buffer.get_frames()
+        timestamps = buffer.get_timestamps()
+        for i in range(3, 6):
+            buffer.add_frame(np.full((4, 4, 3), i, dtype=np.uint8), float(i))
+        
+        assert [int(f[0, 0, 0]) for f in frames] == [0, 1, 2]
+        assert timestamps.tolist() == [0.0, 1.0, 2.0]
+    
+    def test_buffer_for_analysis_survives_later_frames(self):
+        """Test the analysis buffer is not overwritten by frames added later."""
+        analyzer = RealtimeAnalyzer()
+        frames_in = [np.full((240, 320, 3), i, dtype=np.uint8) for i in range(10)]
+        analyzer.add_frames_to_buffer(frames_in, fps=30.0, start_timestamp=0.0)
+        
+        frames, timestamps = analyzer.get_buffer_for_analysis()
+        analyzer.add_frames_to_buffer(
+            [np.full((240, 320, 3), 99, dtype=np.uint8)], fps=30.0, start_timestamp=1.0
+        )
+        
+        assert int(frames[0, 0, 0, 0]) == 0
+        assert timestamps[0] == 0.0
+    
+    def test_frame_buffer_snapshot_view(self):
+        """Test snapshot(copy=False) is a view that later frames overwrite."""
+        buffer = FrameBuffer(capacity=3)
+        buffer.add_frame(np.zeros((4, 4, 3), dtype=np.uint8), 0.0)
+        buffer.add_frame(np.ones((4, 4, 3), dtype=np.uint8), 0.5)
+        
+        view, _ = buffer.snapshot(copy=False)
+        copied, _ = buffer.snapshot()
+        buffer.add_frame(np.full((4, 4, 3), 7, dtype=np.uint8), 1.0)
+        buffer.add_frame(np.full((4, 4, 3), 8, dtype=np.uint8), 1.5)
+        
+        assert int(view[0, 0, 0, 0]) == 8
+        assert int(copied[0, 0, 0, 0]) == 0
+    
     def test_buffer_ready_check(self):
         """Test buffer readiness check (5-10 frames required)."""
         analyzer = RealtimeAnalyzer()
@@ -211,6 +281,120 @@ class TestRealtimeAnalyzerUnit:
         assert result.analysis_latency_ms > 0.0
         assert 0.0 <= result.motion_smoothness <= 1.0
     
+    def test_pipeline_matches_analyze_buffer(self):
+        """Test the threaded pipeline gives the same indicators as analyze_buffer."""
+        import base64
+        import cv2
+        
+        frames = []
+        for i in range(8):
+            frame = np.zeros((240, 320, 3), dtype=np.uint8)
+            frame[50:150, 50+i*5:150+i*5] = [128, 128, 128]
+            frames.append(frame)
+        frames_b64 = [
+            base64.b64encode(cv2.imencode('.jpg', f)[1]).decode('utf-8')
+            for f in frames
+        ]
+        
+        expected = RealtimeAnalyzer().analyze_buffer(
+            RealtimeAnalyzer().decode_frame_buffer(frames_b64), fps=30.0
+        )
+        
+        analyzer = RealtimeAnalyzer()
+        try:
+            futures = [analyzer.submit_frame_buffer(frames_b64) for _ in range(3)]
+            results = [f.result(timeout=10) for f in futures]
+            short = analyzer.analyze_frame_buffer(frames_b64[:3])
+        finally:
+            analyzer.stop_pipeline()
+        
+        for result in results:
+            assert result.avg_speed_px_frame == pytest.approx(expected.avg_speed_px_frame)
+            assert result.motion_smoothness == pytest.approx(expected.motion_smoothness)
+            assert result.confidence == pytest.approx(expected.confidence)
+        assert short.confidence == 0.0
+        assert short.frame_count == 3
+        assert analyzer._pipeline is None
+    
+    @pytest.mark.asyncio
+    async def test_async_analysis_uses_pipeline(self):
+        """Test async callers get pipeline results, including frame counts."""
+        import base64
+        import cv2
+        
+        frames_b64 = [
+            base64.b64encode(cv2.imencode('.jpg', generate_test_frame(i))[1]).decode('utf-8')
+            for i in range(6)
+        ]
+        analyzer = RealtimeAnalyzer()
+        try:
+            result = await analyzer.analyze_frame_buffer_async(frames_b64)
+            assert analyzer._pipeline is not None
+            short = await analyzer.analyze_frame_buffer_async(frames_b64, min_frames=8)
+        finally:
+            analyzer.stop_pipeline()
+        
+        assert result.frame_count == 6
+        assert result.confidence > 0.0
+        assert short.frame_count == 6
+        assert short.confidence == 0.0
+    
+    def test_pipeline_stops_with_session(self):
+        """Test deleting a session stops its analyzer's worker threads."""
+        from src.realtime.websocket_handler import SessionManager
+        
+        session_manager = SessionManager()
+        session_manager.create_session("PIPE-001")
+        analyzer = session_manager.get_analyzer("PIPE-001")
+        analyzer.start_pipeline()
+        threads = list(analyzer._pipeline.threads)
+        
+        session_manager.delete_session("PIPE-001")
+        for thread in threads:
+            thread.join(timeout=2)
+            assert not thread.is_alive()
+    
+    def test_pipeline_exits_when_analyzer_dropped(self):
+        """Test worker threads do not keep a dropped analyzer alive."""
+        import gc
+        
+        analyzer = RealtimeAnalyzer()
+        analyzer.analyze_buffer([generate_test_frame(i) for i in range(5)])
+        threads = list(analyzer._pipeline.threads)
+        
+        del analyzer
+        gc.collect()
+        for thread in threads:
+            thread.join(timeout=2)
+            assert not thread.is_alive()
+    
+    def test_stop_fails_queued_buffers(self):
+        """Test buffers still queued when the pipeline stops fail instead of hanging."""
+        import threading
+        
+        analyzer = RealtimeAnalyzer()
+        entered = threading.Event()
+        release = threading.Event()
+        compute = analyzer.compute_optical_flow_fast
+        
+        def slow_flow(frames, gray_frames=None):
+            entered.set()
+            release.wait(timeout=5)
+            return compute(frames, gray_frames)
+        
+        # Hold the first buffer in the flow stage so the others queue up
+        analyzer.compute_optical_flow_fast = slow_flow
+        frames = [generate_test_frame(i) for i in range(5)]
+        futures = [analyzer._submit(frames, False, 5, False)]
+        assert entered.wait(timeout=5)
+        futures += [analyzer._submit(frames, False, 5, False) for _ in range(2)]
+        
+        analyzer.stop_pipeline(wait=False)
+        release.set()
+        for future in futures:
+            with pytest.raises(RuntimeError):
+                future.result(timeout=2)
+    
     def test_adaptive_degradation(self):
         """Test that analyzer can switch to degraded mode."""
         config = RealtimeAnalyzerConfig(
@@ -261,10 +445,13 @@ class TestRealtimeAnalyzerUnit:
         analyzer._degraded_mode = True
         analyzer._subject_lost = True
         
+        analyzer.start_pipeline()
+        
         # Reset
         analyzer.reset()
         
         # Verify state is cleared
+        assert analyzer._pipeline is None
         assert analyzer._frame_buffer.size() == 0
         assert analyzer._last_analysis_time == 0.0
         assert not analyzer._degraded_mode
@@ -289,6 +476,21 @@ class TestRealtimeAnalyzerUnit:
         assert flow_data.avg_speed_px_s > 0
         assert len(flow_data.flow_vectors) > 0
     
+    def test_optical_flow_farneback_direction(self):
+        """Test the primary direction is the vector mean of the flow."""
+        analyzer = RealtimeAnalyzer()
+        
+        # Rectangle moving straight down (image y axis)
+        frames = []
+        for i in range(6):
+            frame = np.zeros((120, 160, 3), dtype=np.uint8)
+            frame[30+i*5:70+i*5, 60:100] = [200, 200, 200]
+            frames.append(frame)
+        
+        flow_data = analyzer.compute_optical_flow_farneback(frames)
+        
+        assert flow_data.primary_direction_deg == pytest.approx(90.0, abs=5.0)
+    
     def test_optical_flow_lucas_kanade(self):
         """Test Lucas-Kanade optical flow computation."""
         analyzer = RealtimeAnalyzer()
@@ -33,6 +33,7 @@ from src.realtime.websocket_handler import (
     RealtimeWebSocketHandler,
     WebSocketHandlerConfig,
 )
+from src.realtime.advice_backplane import AdviceBackplane, advice_channel, clients_key
 from src.realtime.session_manager import (
     PersistentSessionManager,
     SessionConfig,
@@ -84,6 +85,43 @@ def advice_engine():
     return AdviceEngine()
 
 
+class FakeRedis:
+    """In-memory stand-in for the async Redis client used by the backplane."""
+
+    def __init__(self):
+        self.hashes: dict[str, dict[str, int]] = {}
+        self.published: list[tuple[str, str]] = []
+        self._ops: list = []
+
+    def pipeline(self, transaction: bool = True):
+        self._ops = []
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def hset(self, key, field, value):
+        self._ops.append(lambda: self.hashes.setdefault(key, {}).__setitem__(field, value))
+
+    def hdel(self, key, field):
+        self._ops.append(lambda: self.hashes.get(key, {}).pop(field, None))
+
+    def hvals(self, key):
+        self._ops.append(lambda: [str(v).encode() for v in self.hashes.get(key, {}).values()])
+
+    def expire(self, key, seconds):
+        self._ops.append(lambda: True)
+
+    def publish(self, channel, message):
+        self._ops.append(lambda: self.published.append((channel, message)) or 1)
+
+    async def execute(self):
+        return [op() for op in self._ops]
+
+
 @pytest.fixture
 def session_manager():
     """Create a SessionManager instance."""
@@ -808,6 +846,89 @@ class TestWebSocketIntegration:
         
         # Clean up
         manager.delete_session(session_id)
+    
+    @pytest.mark.asyncio
+    async def test_advice_backplane_dispatch(self):
+        """
+        Test that published advice is fanned out to the session's local clients.
+        """
+        session_manager = SessionManager()
+        handler = RealtimeWebSocketHandler(session_manager)
+        session_id = "PUBSUB-001"
+        session_manager.create_session(session_id)
+        
+        mock_ws = MagicMock()
+        mock_ws.client_state.name = "CONNECTED"
+        mock_ws.send_text = AsyncMock()
+        mock_ws.close = AsyncMock()
+        session_manager.add_client(session_id, mock_ws)
+        
+        advice = AdvicePayload(
+            priority=AdvicePriority.WARNING,
+            category=AdviceCategory.STABILITY,
+            message="Hold steady",
+        )
+        
+        # Disabled backplane broadcasts locally
+        backplane = AdviceBackplane(handler, enabled=False)
+        assert await backplane.publish(session_id, [advice]) == 1
+        
+        # Messages from other workers reach local clients unchanged
+        text = json.dumps(advice.to_dict())
+        assert await backplane._dispatch(
+            advice_channel(session_id).encode(), text.encode()
+        ) == 1
+        assert await backplane._dispatch(b"advice:UNKNOWN", text.encode()) == 0
+        
+        await asyncio.sleep(0)
+        assert mock_ws.send_text.await_count == 2
+        assert json.loads(mock_ws.send_text.await_args.args[0])["message"] == "Hold steady"
+        
+        # Unknown sessions are reported as such
+        assert await backplane.publish("UNKNOWN", [advice]) is None
+        
+        # Clean up
+        session_manager.delete_session(session_id)
+    
+    @pytest.mark.asyncio
+    async def test_advice_backplane_counts_reported_clients(self):
+        """
+        Test that publishing reports clients across workers, not workers.
+        """
+        session_manager = SessionManager()
+        handler = RealtimeWebSocketHandler(session_manager)
+        backplane = AdviceBackplane(handler, enabled=True)
+        fake = FakeRedis()
+        backplane._client = fake
+        session_id = "PUBSUB-002"
+        
+        # Session and client changes are reported under this worker's id
+        session_manager.create_session(session_id)
+        clients = [MagicMock(), MagicMock()]
+        for ws in clients:
+            ws.close = AsyncMock()
+            session_manager.add_client(session_id, ws)
+        session_manager.remove_client(session_id, clients[1])
+        await backplane._report_task
+        assert fake.hashes[clients_key(session_id)] == {backplane.worker_id: 1}
+        
+        # Another worker hosting three clients of the same session
+        fake.hashes[clients_key(session_id)]["other-worker"] = 3
+        advice = AdvicePayload(
+            priority=AdvicePriority.INFO,
+            category=AdviceCategory.COMPOSITION,
+            message="Center the subject",
+        )
+        assert await backplane.publish(session_id, [advice]) == 4
+        assert fake.published[-1][0] == advice_channel(session_id)
+        
+        # No worker reports the session
+        assert await backplane.publish("UNKNOWN", [advice]) is None
+        
+        # Deleting the session withdraws this worker's report
+        session_manager.delete_session(session_id)
+        await backplane._report_task
+        assert fake.hashes[clients_key(session_id)] == {"other-worker": 3}
 
 
 # ============================================================================
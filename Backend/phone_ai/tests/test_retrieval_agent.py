@@ -10,10 +10,12 @@ from src.services.vector_db import (
     VideoMetadata,
     RetrievalFilters,
     SearchResult,
+    normalize_embeddings,
 )
 from src.agents.retrieval_agent import (
     RetrievalAgent,
     RetrievalAgentConfig,
+    RunningAggregator,
     create_retrieval_agent,
 )
 
@@ -120,6 +122,107 @@ class TestVectorDB:
         
         # Remove non-existent
         assert db.remove("nonexistent") is False
+    
+    def test_ivfpq_trains_after_staging(self, tmp_path):
+        """Test that IVFPQ stages vectors exactly, then trains itself."""
+        config = VectorDBConfig(
+            dimension=32, index_type="ivfpq", nlist=4, nprobe=4, pq_m=8, pq_nbits=4
+        )
+        db = VectorDB(config)
+        assert not db.is_trained
+        
+        rng = np.random.default_rng(0)
+        embeddings = rng.standard_normal((700, 32)).astype(np.float32)
+        for i in range(10):
+            db.add(f"video_{i}", embeddings[i], VideoMetadata(f"video_{i}", ""))
+        
+        # Still staged: exact search, and survives a save/load round trip
+        index_path = str(tmp_path / "index.faiss")
+        metadata_path = str(tmp_path / "metadata.json")
+        db.save(index_path, metadata_path)
+        loaded = VectorDB(VectorDBConfig(dimension=32))
+        loaded.load(index_path, metadata_path)
+        assert loaded.size == 10
+        assert loaded.search(embeddings[3], top_k=1)[0].video_id == "video_3"
+        
+        for i in range(10, 700):
+            db.add(f"video_{i}", embeddings[i], VideoMetadata(f"video_{i}", ""))
+        
+        assert db.is_trained
+        assert db.size == 700
+        assert db.search(embeddings[3], top_k=1)[0].video_id == "video_3"
+    
+    def test_int8_storage(self):
+        """Test scalar-quantized storage for flat indexes."""
+        config = VectorDBConfig(dimension=64, index_type="flat", storage_dtype="int8")
+        db = VectorDB(config)
+        
+        embeddings = np.random.default_rng(1).standard_normal((300, 64)).astype(np.float32)
+        db.add_batch(
+            [f"video_{i}" for i in range(300)],
+            embeddings,
+            [VideoMetadata(f"video_{i}", "") for i in range(300)],
+        )
+        
+        assert db.is_trained
+        assert db._index.sa_code_size() == 64  # one byte per dimension
+        assert db.search(embeddings[42], top_k=1)[0].video_id == "video_42"
+    
+    def test_float16_storage(self):
+        """Test half-precision storage, which needs no training."""
+        config = VectorDBConfig(dimension=64, index_type="flat", storage_dtype="float16")
+        db = VectorDB(config)
+        
+        embeddings = np.random.default_rng(6).standard_normal((10, 64)).astype(np.float32)
+        db.add_batch(
+            [f"video_{i}" for i in range(10)],
+            embeddings,
+            [VideoMetadata(f"video_{i}", "") for i in range(10)],
+        )
+        
+        assert db.is_trained
+        assert db._index.sa_code_size() == 128  # two bytes per dimension
+        result = db.search(embeddings[7], top_k=1)[0]
+        assert result.video_id == "video_7"
+        assert result.similarity_score == pytest.approx(1.0, abs=1e-3)
+    
+    @pytest.mark.parametrize("index_type", ["flat", "ivf"])
+    def test_rebuild_drops_removed(self, index_type):
+        """Test that rebuilding compacts the index and keeps the survivors."""
+        db = VectorDB(VectorDBConfig(dimension=16, index_type=index_type, nlist=4))
+        embeddings = np.random.default_rng(7).standard_normal((200, 16)).astype(np.float32)
+        db.add_batch(
+            [f"video_{i}" for i in range(200)],
+            embeddings,
+            [VideoMetadata(f"video_{i}", "") for i in range(200)],
+        )
+        db.remove("video_0")
+        db.remove("video_5")
+        
+        db.rebuild()
+        
+        assert db.size == 198
+        assert db.get_by_id("video_0") is None
+        assert db.get_by_id("video_6") is not None
+        assert db.search(embeddings[6], top_k=1)[0].video_id == "video_6"
+    
+    def test_prenormalized_embeddings(self):
+        """Test adding and searching with caller-normalized vectors."""
+        db = VectorDB(VectorDBConfig(dimension=32))
+        raw = np.random.default_rng(2).standard_normal((4, 32)).astype(np.float32)
+        embeddings = normalize_embeddings(raw)
+        
+        db.add_batch(
+            [f"video_{i}" for i in range(4)],
+            embeddings,
+            [VideoMetadata(f"video_{i}", "") for i in range(4)],
+            normalized=True,
+        )
+        
+        np.testing.assert_allclose(np.linalg.norm(embeddings, axis=1), 1.0, rtol=1e-5)
+        result = db.search(embeddings[2], top_k=1, normalized=True)[0]
+        assert result.video_id == "video_2"
+        assert result.similarity_score == pytest.approx(1.0, abs=1e-5)
 
 
 class TestRetrievalAgent:
@@ -177,6 +280,45 @@ class TestRetrievalAgent:
         assert idx == 0
         assert agent.index_size == 1
     
+    def test_index_video_from_frame_array(self):
+        """Test indexing from a float32 frame array (e.g. a buffer slice)."""
+        agent = RetrievalAgent(RetrievalAgentConfig(dimension=64, index_type="flat"))
+        buffer = np.random.default_rng(3).standard_normal((16, 64)).astype(np.float32)
+        
+        idx = agent.index_video_from_frames(
+            video_id="test_video",
+            video_path="/path/to/test.mp4",
+            frame_embeddings=buffer[:8],
+            aggregation="max",
+        )
+        
+        expected = buffer[:8].max(axis=0)
+        stored = agent.vector_db._index.reconstruct(idx)
+        np.testing.assert_allclose(stored, expected / np.linalg.norm(expected), rtol=1e-5)
+        with pytest.raises(ValueError):
+            agent.index_video_from_frames("empty", "", buffer[:0])
+    
+    @pytest.mark.parametrize("aggregation", ["mean", "max", "first", "last"])
+    def test_running_aggregator_matches_batch(self, aggregation):
+        """Test incremental aggregation against aggregating all frames."""
+        frames = np.random.default_rng(4).standard_normal((12, 32)).astype(np.float32)
+        running = RunningAggregator(32, aggregation)
+        
+        for frame in frames:
+            running.add(frame)
+        
+        assert len(running) == 12
+        expected = {
+            "mean": frames.mean(axis=0),
+            "max": frames.max(axis=0),
+            "first": frames[0],
+            "last": frames[-1],
+        }[aggregation]
+        np.testing.assert_allclose(running.value(), expected, rtol=1e-5, atol=1e-6)
+        running.reset()
+        with pytest.raises(ValueError):
+            running.value()
+    
     @pytest.mark.asyncio
     async def test_search(self):
         """Test searching for similar videos."""
@@ -205,6 +347,23 @@ class TestRetrievalAgent:
         assert result.query_video_id == "query_video"
         assert len(result.results) == 3
     
+    @pytest.mark.asyncio
+    async def test_search_excludes_query_video(self):
+        """Test that an indexed query video is skipped without losing results."""
+        agent = RetrievalAgent(RetrievalAgentConfig(dimension=32, index_type="flat"))
+        embeddings = np.random.default_rng(5).standard_normal((4, 32)).astype(np.float32)
+        for i, embedding in enumerate(embeddings):
+            agent.index_video(f"video_{i}", f"video_{i}.mp4", embedding)
+        
+        result = await agent.search(
+            query_embedding=embeddings[0],
+            query_video_id="video_0",
+            top_k=3,
+            min_similarity=-1.0,
+        )
+        
+        assert sorted(r.ref_video_id for r in result.results) == ["video_1", "video_2", "video_3"]
+    
     @pytest.mark.asyncio
     async def test_search_with_filter(self):
         """Test searching with motion_type filter."""
@@ -256,6 +415,23 @@ class TestRetrievalAgent:
         assert len(indices) == 5
         assert agent.index_size == 5
     
+    def test_index_batch_mixed_and_duplicates(self):
+        """Test batch indexing with frame embeddings and repeated ids."""
+        agent = RetrievalAgent(RetrievalAgentConfig(dimension=128, index_type="flat"))
+        frames = np.random.randn(6, 128).astype(np.float32)
+        
+        indices = agent.index_batch([
+            {"video_id": "a", "video_path": "a.mp4", "frame_embeddings": frames.tolist()},
+            {"video_id": "b", "video_path": "b.mp4", "embedding": frames[0]},
+            {"video_id": "a", "video_path": "a.mp4", "embedding": frames[1]},
+        ])
+        
+        assert indices == [0, 1, 0]
+        assert agent.index_size == 2
+        stored = agent.vector_db._index.reconstruct(0)
+        expected = frames.mean(axis=0)
+        np.testing.assert_allclose(stored, expected / np.linalg.norm(expected), rtol=1e-5)
+    
     def test_remove_video(self):
         """Test removing a video."""
         config = RetrievalAgentConfig(dimension=128)